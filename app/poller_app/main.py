@@ -1,7 +1,9 @@
 from poller import Poller
+from app.store.metrics import MetricsServer
 from app.web.config import config
 from starter import starter
 
 if __name__ == "__main__":
     poller = Poller(cfg=config)
-    starter(start_tasks=[poller.start], stop_tasks=[poller.stop])
+    metrics = MetricsServer(port=config.metrics.port)
+    starter(start_tasks=[poller.start, metrics.start], stop_tasks=[poller.stop, metrics.stop])
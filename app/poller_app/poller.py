@@ -3,11 +3,35 @@ import logging
 from asyncio import Task
 
 from constnant import get_update_timeout
+from app.store.metrics import Counter, Histogram
+from app.store.metrics.tracing import TraceContext, current_trace, now_us
+from app.store.rabbitMQ.broker import Broker
 from app.store.rabbitMQ.rabbitMQ import RabbitMQ
+from app.store.rabbitMQ.shards import shard_routing_key
 from app.store.tg_api.client import TgClient
 from app.store.tg_api.schemes import UpdateObj
 from app.web.config import ConfigEnv
 
+GET_UPDATES_SECONDS = Histogram(
+    "poller_get_updates_seconds",
+    "getUpdates long polling time",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 15, 20, 25, 30),
+)
+UPDATES = Counter("poller_updates_total", "Updates received from Telegram")
+
+
+def update_chat_id(upd: UpdateObj) -> int | None:
+    """
+    Чат обновления Telegram. У poll, poll_answer и my_chat_member чата нет.
+
+    :param upd: обновление
+    """
+    if upd.message:
+        return upd.message.chat.id
+    if upd.callback_query:
+        return upd.callback_query.message.chat.id
+    return None
+
 
 class Poller:
     """
@@ -18,20 +42,22 @@ class Poller:
     - _task: объект asyncio.Task для запуска опроса в фоновом режиме
     - TgClient: объект TgClient для работы с Telegram API
     - rabbitMQ: объект RabbitMQ для отправки сообщений в очередь
+    - shards: количество шардов worker (WORKER_PROCESSES), обновление уходит шарду своего чата
 
     Методы:
-    - __init__(self, cfg: ConfigEnv): конструктор класса
+    - __init__(self, cfg: ConfigEnv, timeout: int, broker: Broker | None): конструктор класса,
+      без broker сообщения отправляются в RabbitMQ
     - _poll(self): метод для опроса обновлений в Telegram и отправки их в RabbitMQ
     - start(self): метод для запуска опроса
     - stop(self): метод для остановки опроса и закрытия соединения с RabbitMQ
     """
 
-    def __init__(self, cfg: ConfigEnv, timeout: int = 20):
+    def __init__(self, cfg: ConfigEnv, timeout: int = 20, broker: Broker | None = None):
         self.logger = logging.getLogger("poller")
         logging.basicConfig(level=logging.INFO)
         self._task: Task | None = None
-        self.TgClient = TgClient(token=cfg.tg_token.tg_token)
-        self.rabbitMQ = RabbitMQ(
+        self.TgClient = TgClient(token=cfg.tg_token.tg_token, base_url=cfg.tg_token.api_url)
+        self.rabbitMQ = broker or RabbitMQ(
             host=cfg.rabbitmq.host,
             port=cfg.rabbitmq.port,
             user=cfg.rabbitmq.user,
@@ -39,6 +65,7 @@ class Poller:
         )
         self.is_stop = False
         self.timeout = timeout
+        self.shards = cfg.worker.processes if cfg.worker else 1
 
     async def _poll(self):
         """
@@ -47,11 +74,23 @@ class Poller:
         offset = 0
         while not self.is_stop:
             self.logger.info("Polling...")
-            res = await self.TgClient.get_updates_in_objects(offset=offset, timeout=self.timeout)
+            with GET_UPDATES_SECONDS.time():
+                res = await self.TgClient.get_updates_in_objects(
+                    offset=offset, timeout=self.timeout
+                )
+            received = now_us()
+            UPDATES.inc(len(res.result))
             for u in res.result:
                 offset = u.update_id + 1
                 upd = UpdateObj.Schema().dump(u)
-                await self.rabbitMQ.send_event(message=upd, routing_key="poller")
+                trace = current_trace.set(
+                    TraceContext(update_id=u.update_id, received=received, stage="poll_publish")
+                )
+                try:
+                    routing_key = shard_routing_key("poller", update_chat_id(u), self.shards)
+                    await self.rabbitMQ.send_event(message=upd, routing_key=routing_key)
+                finally:
+                    current_trace.reset(trace)
                 await asyncio.sleep(get_update_timeout)
 
     async def start(self):
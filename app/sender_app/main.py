@@ -1,7 +1,9 @@
 from sender import Sender
+from app.store.metrics import MetricsServer
 from app.web.config import config
 from starter import starter
 
 if __name__ == "__main__":
     sender = Sender(config)
-    starter(start_tasks=[sender.start], stop_tasks=[sender.stop])
+    metrics = MetricsServer(port=config.metrics.port)
+    starter(start_tasks=[sender.start, metrics.start], stop_tasks=[sender.stop, metrics.stop])
@@ -1,15 +1,21 @@
 import asyncio
 import logging
+import time
 from messages import keyboards
 
-import bson
-
 from app.store.tg_api.client import TgClient
 
 
+from app.store.metrics import Counter, Histogram
+from app.store.metrics.tracing import TraceContext, current_trace
+from app.store.rabbitMQ.broker import Broker, load_message
 from app.store.rabbitMQ.rabbitMQ import RabbitMQ
+from app.store.rabbitMQ.shards import shard_routing_key
 from app.web.config import ConfigEnv
 
+UPDATE_SECONDS = Histogram("sender_update_seconds", "Sender update handling time", ("type",))
+UPDATES = Counter("sender_updates_total", "Sender handled updates", ("type", "status"))
+
 
 class Sender:
     """
@@ -23,33 +29,40 @@ class Sender:
     - tg_client: объект TgClient для работы с Telegram API
     - rabbitMQ: объект RabbitMQ для отправки сообщений в очередь
     - routing_key_worker: ключ маршрутизации для работников
+    - worker_shards: количество шардов worker, сообщение уходит шарду своего чата
     - routing_key_sender: ключ маршрутизации для отправителя
     - queue_name: имя очереди для отправки сообщений
 
     Методы:
-    - __init__(self, cfg: ConfigEnv, concurrent_workers: int = 1): конструктор класса
+    - __init__(self, cfg: ConfigEnv, concurrent_workers: int = 1, broker: Broker | None = None):
+      конструктор класса
     - on_message(self, message): метод-обработчик для получения сообщений из очереди
     - start(self): метод для запуска отправителя
     - stop(self): метод для остановки отправителя
     - _worker_rabbit(self): метод для запуска работника для получения сообщений из очереди
     - handle_update(self, upd: dict): метод для обработки обновлений из Telegram
-    - check_poll(self, upd: dict): метод для проверки результатов опроса
+    - check_poll(self, upd: dict): метод для проверки результатов опроса, отправленного
+      до подсчета голосов в воркере (голоса теперь считает воркер по обновлениям poll)
+    - send_to_worker(self, message: dict): метод для отправки сообщения шарду worker его чата
     """
 
-    def __init__(self, cfg: ConfigEnv, concurrent_workers: int = 1):
+    def __init__(self, cfg: ConfigEnv, concurrent_workers: int = 1, broker: Broker | None = None):
         """
         Конструктор класса Sender.
 
         Параметры:
         - cfg: объект ConfigEnv с конфигурационными параметрами
         - concurrent_workers: количество одновременных работников
+        - broker: брокер сообщений, по умолчанию RabbitMQ
         """
         self.cfg = cfg
         self.concurrent_workers = concurrent_workers
         self._tasks = []
         self.logger = logging.getLogger("sender")
-        self.tg_client = TgClient(token=self.cfg.tg_token.tg_token)
-        self.rabbitMQ = RabbitMQ(
+        self.tg_client = TgClient(
+            token=self.cfg.tg_token.tg_token, base_url=self.cfg.tg_token.api_url
+        )
+        self.rabbitMQ = broker or RabbitMQ(
             host=self.cfg.rabbitmq.host,
             port=self.cfg.rabbitmq.port,
             user=self.cfg.rabbitmq.user,
@@ -58,6 +71,7 @@ class Sender:
         self.routing_key_worker = "worker"
         self.routing_key_sender = "sender"
         self.queue_name = "tg_bot_sender"
+        self.worker_shards = self.cfg.worker.processes if self.cfg.worker else 1
 
     async def on_message(self, message):
         """
@@ -66,8 +80,22 @@ class Sender:
         Параметры:
         - message: объект aio-pika.Message с полученным сообщением
         """
-        upd = bson.loads(message.body)
-        await self.handle_update(upd)
+        upd = load_message(message)
+        type_, started, status = str(upd.get("type_")), time.perf_counter(), "error"
+        if (trace := TraceContext.from_headers(message.headers)) is not None:
+            trace.mark("sender_queue")
+            trace.stage = "sender"
+        token = current_trace.set(trace)
+        try:
+            await self.handle_update(upd)
+            status = "ok"
+        finally:
+            UPDATE_SECONDS.labels(type_).observe(time.perf_counter() - started)
+            UPDATES.labels(type_, status).inc()
+            current_trace.reset(token)
+        if trace is not None:
+            trace.mark("send")
+            trace.finish()
         await message.ack()
 
     async def start(self):
@@ -138,7 +166,7 @@ class Sender:
                     chat_id=upd["chat_id"], message_id=upd["keyboard_message_id"]
                 )
                 message = {"type_": "pick_leader", "chat_id": upd["chat_id"]}
-                await self.rabbitMQ.send_event(message=message, routing_key=self.routing_key_worker)
+                await self.send_to_worker(message)
             case "callback_alert":
                 """
                 Обработка callback alert.
@@ -158,25 +186,32 @@ class Sender:
                     anonymous=upd["anonymous"],
                     period=upd.get("period", 10),
                 )
-                upd["type_"] = "send_poll_answer"
-                upd["poll_message_id"] = poll.result.message_id
-                upd["poll_id"] = poll.result.poll.id
-                await self.rabbitMQ.send_event(
-                    message={
-                        "type_": "poll_id",
-                        "poll_id": poll.result.poll.id,
-                        "chat_id": upd["chat_id"],
-                    },
-                    routing_key=self.routing_key_worker,
-                )
-                await self.rabbitMQ.send_event(
-                    message=upd,
-                    routing_key=self.routing_key_sender,
-                    delay=(upd.get("period", 10) + 2) * 1000,
+                message_poll_id = {
+                    "type_": "poll_id",
+                    "poll_id": poll.result.poll.id,
+                    "chat_id": upd["chat_id"],
+                    "message_id": poll.result.message_id,
+                    "period": upd.get("period", 10),
+                    "anonymous": upd["anonymous"],
+                }
+                if "word" in upd:
+                    message_poll_id["word"] = upd["word"]
+                await self.send_to_worker(message_poll_id)
+            case "stop_poll":
+                """
+                Досрочное закрытие опроса, итог которого уже известен воркеру.
+                """
+                response = await self.tg_client.stop_poll(
+                    chat_id=upd["chat_id"], message_id=upd["message_id"]
                 )
+                if not response.ok:
+                    self.logger.warning(
+                        f"stop_poll chat_id={upd['chat_id']} "
+                        f"error={response.error_code} {response.description}"
+                    )
             case "send_poll_answer":
                 """
-                Проверка ответов на опрос.
+                Проверка ответов на опрос, отправленный до подсчета голосов в воркере.
                 """
                 await self.check_poll(upd)
             case _:
@@ -219,8 +254,17 @@ class Sender:
             "poll_result": res_poll,
             "word": word,
             "poll_type": poll.result.poll.is_anonymous,
+            "yes": yes,
+            "no": no,
         }
 
-        await self.rabbitMQ.send_event(
-            message=message_poll_result, routing_key=self.routing_key_worker
+        await self.send_to_worker(message_poll_result)
+
+    async def send_to_worker(self, message: dict):
+        """
+        Отправка сообщения worker, который обрабатывает чат сообщения.
+        """
+        routing_key = shard_routing_key(
+            self.routing_key_worker, message["chat_id"], self.worker_shards
         )
+        await self.rabbitMQ.send_event(message=message, routing_key=routing_key)
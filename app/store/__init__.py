@@ -1,5 +1,9 @@
+import asyncio
 import typing
+from datetime import timedelta
 from app.store.database.database import Database
+from app.store.rabbitMQ.rabbitMQ import RabbitMQ
+from app.store.words_game.archive import GameArchiver
 
 
 if typing.TYPE_CHECKING:
@@ -13,8 +17,36 @@ class Store:
         self.admins = AdminAccessor(app)
 
 
+async def broker_context(app: "Application"):
+    """
+    Подключение к брокеру в фоне: админка работает и без RabbitMQ,
+    worker догонит изменения настроек периодической сверкой версии.
+    """
+    if app.rabbitMQ is None:
+        yield
+        return
+    connecting = asyncio.create_task(app.rabbitMQ.connect())
+    yield
+    connecting.cancel()
+    await app.rabbitMQ.disconnect()
+
+
 def setup_store(app: "Application"):
     app.database = Database(app)
     app.on_startup.append(app.database.connect)
     app.on_cleanup.append(app.database.disconnect)
+    # BROKER=memory: брокер общий с worker, его передает main.py
+    if app.config.broker.kind != "memory":
+        app.rabbitMQ = RabbitMQ(app)
+    app.cleanup_ctx.append(broker_context)
+    # ARCHIVE_AFTER_DAYS: фоновый перенос завершенных игр в архив после подключения к базе
+    if (archive := app.config.archive) is not None and archive.after_days is not None:
+        archiver = GameArchiver(
+            app.database,
+            after=timedelta(days=archive.after_days),
+            batch_size=archive.batch_size,
+            interval=archive.interval,
+        )
+        app.on_startup.append(archiver.start)
+        app.on_cleanup.insert(0, archiver.stop)
     app.store = Store(app)
@@ -1,11 +1,14 @@
 import logging
-from typing import TYPE_CHECKING, Optional
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
 )
 
-from sqlalchemy import URL
+from sqlalchemy import URL, Row, event
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -15,10 +18,47 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.store.database import DB
+from app.store.database.upsert import upsert
+from app.store.metrics import Counter, Histogram
+from app.store.metrics.tracing import current_trace
+
+DB_QUERY_SECONDS = Histogram("db_query_seconds", "Database query time", ("method",))
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Failed database queries", ("method",))
+
+# счетчик запросов в рамках одного обработанного сообщения, см. Worker.on_message
+db_round_trips: ContextVar[list[int] | None] = ContextVar("db_round_trips", default=None)
 
 if TYPE_CHECKING:
     from app.web.app import Application
-    from app.web.config import ConfigEnv
+    from app.web.config import ConfigEnv, DatabaseConfig
+
+
+def database_url(db: "DatabaseConfig", driver: str | None = None) -> URL:
+    """
+    URL базы данных из настроек: PostgreSQL или файл SQLite (без файла - база в памяти).
+
+    :param db: настройки базы данных
+    :param driver: драйвер вместо указанного в настройках, например синхронный для тестов
+    :return: URL
+    """
+    driver = driver or db.driver
+    if driver.startswith("sqlite"):
+        return URL.create(drivername=driver, database=db.database)
+    return URL.create(
+        drivername=driver,
+        host=db.host,
+        database=db.database,
+        username=db.user,
+        password=db.password,
+        port=db.port,
+    )
+
+
+def _sqlite_pragmas(dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
 
 
 class Database:
@@ -29,23 +69,10 @@ class Database:
     ):
         if app:
             self.app = app
-            self.URL_DB = URL.create(
-                drivername="postgresql+asyncpg",
-                host=app.config.database.host,
-                database=app.config.database.database,
-                username=app.config.database.user,
-                password=app.config.database.password,
-                port=app.config.database.port,
-            )
+            self.URL_DB = database_url(app.config.database)
         elif cfg:
-            self.URL_DB = URL.create(
-                drivername="postgresql+asyncpg",
-                host=cfg.database.host,
-                database=cfg.database.database,
-                username=cfg.database.user,
-                password=cfg.database.password,
-                port=cfg.database.port,
-            )
+            self.URL_DB = database_url(cfg.database)
+        self.dialect = self.URL_DB.get_backend_name()
         self.engine_: AsyncEngine | None = None
         self.db_: DeclarativeBase | None = None
         self.session: AsyncSession | async_scoped_session | sessionmaker | async_sessionmaker | None = (
@@ -55,36 +82,140 @@ class Database:
 
     async def connect(self, *_: list, **__: dict) -> None:
         self.db_ = DB
-        self.engine_ = create_async_engine(self.URL_DB, future=True, echo=False)
+        if self.dialect == "sqlite":
+            await self._connect_sqlite()
+        else:
+            self.engine_ = create_async_engine(self.URL_DB, future=True, echo=False)
         self.session = async_sessionmaker(
             bind=self.engine_,
             expire_on_commit=False,
             autoflush=True,
         )
 
+    async def _connect_sqlite(self) -> None:
+        """
+        SQLite для одного узла и тестов: миграции alembic написаны под PostgreSQL,
+        поэтому схема создается по моделям. База в памяти живет в одном соединении.
+        """
+        memory = self.URL_DB.database in (None, "", ":memory:")
+        self.engine_ = create_async_engine(
+            self.URL_DB, future=True, echo=False, poolclass=StaticPool if memory else None
+        )
+        event.listen(self.engine_.sync_engine, "connect", _sqlite_pragmas)
+        async with self.engine_.begin() as conn:
+            await conn.run_sync(DB.metadata.create_all)
+
+    async def _release(self) -> None:
+        # PostgreSQL-соединения закрываются после каждого запроса, SQLite держит их в пуле
+        if self.dialect != "sqlite":
+            await self.engine_.dispose()
+
+    def upsert(self, model, values: dict | list[dict], index_elements: list | None = None, update=None):
+        """
+        INSERT ... ON CONFLICT на диалекте этой базы, см. app.store.database.upsert.
+        """
+        return upsert(self.dialect, model, values, index_elements=index_elements, update=update)
+
+    @staticmethod
+    def _observe(method: str, started: float, ok: bool) -> None:
+        elapsed = time.perf_counter() - started
+        DB_QUERY_SECONDS.labels(method).observe(elapsed)
+        if (trace := current_trace.get()) is not None:
+            trace.add_db(elapsed)
+        if not ok:
+            DB_QUERY_ERRORS.labels(method).inc()
+        if (round_trips := db_round_trips.get()) is not None:
+            round_trips[0] += 1
+
     async def execute_query(self, query):
-        async with self.session() as session:
-            res = await session.execute(query)
-            await session.commit()
-        await self.engine_.dispose()
+        started, ok = time.perf_counter(), False
+        try:
+            async with self.session() as session:
+                res = await session.execute(query)
+                await session.commit()
+            ok = True
+        finally:
+            self._observe("execute", started, ok)
+        await self._release()
         return res
 
+    async def execute_transaction(self, queries: list) -> list:
+        """
+        Несколько запросов в одной транзакции: при ошибке не применяется ни один.
+
+        :param queries: запросы в порядке выполнения
+        :return: результаты запросов
+        """
+        started, ok = time.perf_counter(), False
+        try:
+            async with self.session() as session:
+                results = [await session.execute(query) for query in queries]
+                await session.commit()
+            ok = True
+        finally:
+            self._observe("transaction", started, ok)
+        await self._release()
+        return results
+
+    async def execute_many(self, query, rows: list[dict]) -> None:
+        """
+        Один запрос для многих строк (executemany): драйвер отправляет строки пачкой,
+        а не отдельным запросом на каждую.
+
+        :param query: запрос, обычно insert(Model)
+        :param rows: значения строк
+        """
+        started, ok = time.perf_counter(), False
+        try:
+            async with self.session() as session:
+                await session.execute(query, rows)
+                await session.commit()
+            ok = True
+        finally:
+            self._observe("executemany", started, ok)
+        await self._release()
+
+    async def stream_query(self, query, chunk_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        Чтение большой выборки частями: в PostgreSQL через серверный курсор,
+        в памяти одновременно держится не больше chunk_size строк.
+
+        :param query: запрос
+        :param chunk_size: строк в одной части
+        :return: асинхронный итератор частей выборки
+        """
+        started, ok = time.perf_counter(), False
+        try:
+            async with self.session() as session:
+                result = await session.stream(query.execution_options(yield_per=chunk_size))
+                async for partition in result.partitions(chunk_size):
+                    yield partition
+            ok = True
+        finally:
+            self._observe("stream", started, ok)
+        await self._release()
+
     async def scalars_query(self, query, values_list: list | None):
-        async with self.session() as session:
-            res = await session.scalars(query, values_list)
-            await session.commit()
-        await self.engine_.dispose()
+        started, ok = time.perf_counter(), False
+        try:
+            async with self.session() as session:
+                res = await session.scalars(query, values_list)
+                await session.commit()
+            ok = True
+        finally:
+            self._observe("scalars", started, ok)
+        await self._release()
         return res
 
     async def add_query(self, model) -> None:
         async with self.session.begin() as session:
             session.add(model)
-        await self.engine_.dispose()
+        await self._release()
 
     async def add_all_query(self, lst_model: list) -> None:
         async with self.session.begin() as session:
             session.add_all(lst_model)
-        await self.engine_.dispose()
+        await self._release()
 
     async def disconnect(self, *_: list, **__: dict) -> None:
         try:
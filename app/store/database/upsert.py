@@ -0,0 +1,38 @@
+from typing import Callable
+
+from sqlalchemy import case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert(
+    dialect: str,
+    model,
+    values: dict | list[dict],
+    index_elements: list | None = None,
+    update: Callable[[object], dict] | None = None,
+) -> Insert:
+    """
+    INSERT ... ON CONFLICT для PostgreSQL и SQLite.
+
+    :param dialect: имя диалекта базы данных
+    :param model: модель
+    :param values: значения колонок, список - несколько строк одним запросом
+    :param index_elements: колонки уникального индекса, по которому определяется конфликт
+    :param update: функция (excluded) -> обновляемые колонки, без нее конфликт игнорируется
+    :return: запрос
+    """
+    insert = INSERTS[dialect](model)
+    query = insert.values(values) if isinstance(values, list) else insert.values(**values)
+    if update is None:
+        return query.on_conflict_do_nothing(index_elements=index_elements)
+    return query.on_conflict_do_update(index_elements=index_elements, set_=update(query.excluded))
+
+
+def greatest(left, right):
+    """
+    Большее из двух выражений: GREATEST есть в PostgreSQL, но не в SQLite.
+    """
+    return case((left >= right, left), else_=right)
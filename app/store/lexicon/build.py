@@ -0,0 +1,38 @@
+"""
+Сборка файла словаря существительных из списка слов.
+
+Запуск:
+    python -m app.store.lexicon.build words.txt lexicon.dawg
+
+Формат списка: одно слово в строке; через табуляцию может идти часть речи
+(noun или любая другая). Слово без части речи считается существительным.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from app.store.lexicon.dawg import Lexicon, build_dawg, read_word_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("words", type=Path)
+    parser.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    data = build_dawg(read_word_list(args.words))
+    tmp = args.output.with_suffix(args.output.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(args.output)
+
+    lexicon = Lexicon.open(args.output)
+    print(
+        f"{args.output}: {len(lexicon)} words, {len(lexicon.nodes) // 3} nodes, "
+        f"{len(data) / 1024:.0f} KiB, {time.perf_counter() - started:.1f}s"
+    )
+    lexicon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable
+
+MAGIC = b"LXD1"
+HEADER = struct.Struct("<4sIIII")
+
+NOT_WORD = 0
+NOUN = 1
+OTHER = 2
+
+
+def normalize_word(word: str) -> str:
+    """
+    Приведение слова к виду для поиска: нижний регистр, ё -> е.
+
+    :param word: слово
+    :return: нормализованное слово
+    """
+    return word.strip().lower().replace("ё", "е")
+
+
+def build_dawg(words: Iterable[tuple[str, bool]]) -> bytes:
+    """
+    Построение DAWG: префиксное дерево, в котором одинаковые поддеревья склеены в один узел.
+
+    Формат файла (little-endian uint32):
+    заголовок - MAGIC, корень, число узлов, число ребер, число слов;
+    узлы - (первое ребро, число ребер, флаг) для каждого узла;
+    ребра - (код символа, узел) отсортированы по символу внутри узла.
+
+    :param words: пары (слово, существительное ли)
+    :return: содержимое файла словаря
+    """
+    root: list = [NOT_WORD, {}]
+    count = 0
+    for word, is_noun in words:
+        if not (word := normalize_word(word)):
+            continue
+        node = root
+        for char in word:
+            node = node[1].setdefault(char, [NOT_WORD, {}])
+        if node[0] == NOT_WORD:
+            count += 1
+        if is_noun or node[0] == NOT_WORD:
+            node[0] = NOUN if is_noun else OTHER
+
+    nodes, edges = array("I"), array("I")
+    registry: dict[tuple, int] = {}
+
+    def register(node: list) -> int:
+        children = tuple((char, register(child)) for char, child in sorted(node[1].items()))
+        signature = (node[0], children)
+        if (number := registry.get(signature)) is None:
+            number = registry[signature] = len(nodes) // 3
+            nodes.extend((len(edges) // 2, len(children), node[0]))
+            for char, child in children:
+                edges.extend((ord(char), child))
+        return number
+
+    root_number = register(root)
+    if sys.byteorder == "big":
+        nodes.byteswap()
+        edges.byteswap()
+    header = HEADER.pack(MAGIC, root_number, len(nodes) // 3, len(edges) // 2, count)
+    return header + nodes.tobytes() + edges.tobytes()
+
+
+def read_word_list(path: str | Path) -> Iterable[tuple[str, bool]]:
+    """
+    Чтение списка слов: одно слово в строке, через табуляцию может идти часть речи.
+    Слово без части речи считается существительным, строки с # пропускаются.
+
+    :param path: путь к файлу
+    :return: пары (слово, существительное ли)
+    """
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not (line := line.strip()) or line.startswith("#"):
+                continue
+            word, _, pos = line.partition("\t")
+            yield word, pos.strip().lower() in ("", "noun")
+
+
+class Lexicon:
+    """
+    Словарь существительных из файла DAWG, отображенного в память.
+
+    Файл открывается через mmap, поэтому страницы словаря общие для всех процессов
+    воркеров на машине и не копируются в память каждого из них.
+
+    Методы:
+    open - открытие файла словаря.
+    get - поиск слова.
+    close - закрытие файла.
+    """
+
+    __slots__ = ("_mmap", "nodes", "edges", "root", "words")
+
+    def __init__(self, buffer: bytes | mmap.mmap):
+        magic, self.root, node_count, edge_count, self.words = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("not a lexicon file")
+        self._mmap = buffer if isinstance(buffer, mmap.mmap) else None
+        view = memoryview(buffer)[HEADER.size :]
+        edges_start = node_count * 12
+        nodes, edges = view[:edges_start], view[edges_start : edges_start + edge_count * 8]
+        if sys.byteorder == "big":
+            self.nodes, self.edges = array("I", nodes), array("I", edges)
+            self.nodes.byteswap()
+            self.edges.byteswap()
+        else:
+            self.nodes, self.edges = nodes.cast("I"), edges.cast("I")
+
+    @classmethod
+    def open(cls, path: str | Path) -> "Lexicon":
+        """
+        Открытие файла словаря.
+
+        :param path: путь к файлу
+        :return: словарь
+        """
+        with open(path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self.words
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is True
+
+    def get(self, word: str) -> bool | None:
+        """
+        Поиск слова.
+
+        :param word: слово
+        :return: True - существительное, False - другая часть речи, None - слова нет в словаре
+        """
+        nodes, edges, node = self.nodes, self.edges, self.root
+        for char in normalize_word(word):
+            code = ord(char)
+            lo = nodes[node * 3]
+            hi = lo + nodes[node * 3 + 1]
+            while lo < hi:
+                mid = (lo + hi) >> 1
+                label = edges[mid * 2]
+                if label < code:
+                    lo = mid + 1
+                elif label > code:
+                    hi = mid
+                else:
+                    node = edges[mid * 2 + 1]
+                    break
+            else:
+                return None
+        flag = nodes[node * 3 + 2]
+        return None if flag == NOT_WORD else flag == NOUN
+
+    def close(self) -> None:
+        for view in (self.nodes, self.edges):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
@@ -0,0 +1,3 @@
+from app.store.metrics.metrics import REGISTRY, Counter, Gauge, Histogram, Registry
+from app.store.metrics.server import MetricsServer, metrics_handler, setup_metrics_route
+from app.store.metrics.tracing import TraceContext, current_trace
@@ -0,0 +1,234 @@
+import time
+from bisect import bisect_left
+from typing import Iterable
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """
+    Набор метрик процесса и их вывод в текстовом формате Prometheus.
+
+    Методы:
+    register - добавление метрики.
+    expose - текст для ответа /metrics.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, "Metric"] = {}
+
+    def register(self, metric: "Metric") -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """
+    Базовый класс метрики с метками.
+    Дочерняя серия для набора значений меток создается один раз и кэшируется,
+    поэтому в горячем коде лучше сохранить результат labels() заранее.
+    """
+
+    type_ = ""
+    __slots__ = ("name", "help", "labelnames", "children")
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        labelnames: Iterable[str] = (),
+        registry: Registry | None = REGISTRY,
+    ):
+        self.name = name
+        self.help = help_
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple[str, ...], object] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        Серия метрики для значений меток в порядке labelnames.
+
+        :param values: значения меток
+        :return: дочерняя серия
+        """
+        try:
+            return self.children[values]
+        except KeyError:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+            child = self.children[values] = self._child()
+            return child
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Counter(Metric):
+    """
+    Монотонно растущий счетчик.
+    """
+
+    type_ = "counter"
+    __slots__ = ()
+
+    def _child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, tuple(map(str, values)))} "
+            f"{_format_value(child.value)}"
+            for values, child in self.children.items()
+        ]
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Gauge(Counter):
+    """
+    Значение, которое может расти и уменьшаться.
+    """
+
+    type_ = "gauge"
+    __slots__ = ()
+
+    def _child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: "_HistogramChild"):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class Histogram(Metric):
+    """
+    Распределение значений по корзинам. Корзины хранятся некумулятивно,
+    суммы для формата Prometheus считаются при выводе.
+    """
+
+    type_ = "histogram"
+    __slots__ = ("buckets",)
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        registry: Registry | None = REGISTRY,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_, labelnames, registry)
+
+    def _child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def samples(self) -> list[str]:
+        lines = []
+        for values, child in self.children.items():
+            values = tuple(map(str, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
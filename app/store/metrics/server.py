@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from typing import Callable
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, web
+
+from app.store.metrics.metrics import REGISTRY, Registry, _escape
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# upstreams: значение метки -> URL /metrics процесса, например номер шарда worker
+Upstreams = Callable[[], dict[str, str]]
+
+
+def merge_expositions(texts: dict[str | None, str], label: str) -> str:
+    """
+    Объединение вывода /metrics нескольких процессов: к каждой серии добавляется
+    метка процесса, серии одной метрики собираются под одним # HELP и # TYPE.
+
+    :param texts: значение метки -> текст /metrics процесса, None - серии без метки
+    :param label: имя метки процесса
+    :return: текст в формате Prometheus
+    """
+    headers: dict[str, dict[str, str]] = {}
+    samples: dict[str, list[str]] = {}
+    for value, text in texts.items():
+        name = None
+        extra = None if value is None else f'{label}="{_escape(value)}"'
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                _, kind, name, *_ = line.split(" ", 3)
+                headers.setdefault(name, {}).setdefault(kind, line)
+                samples.setdefault(name, [])
+            elif line and not line.startswith("#") and name is not None:
+                if extra is not None:
+                    series, _, sample = line.partition(" ")
+                    if "{" in series:
+                        series = series.replace("{", "{" + extra + ",", 1)
+                    else:
+                        series = f"{series}{{{extra}}}"
+                    line = f"{series} {sample}"
+                samples[name].append(line)
+    lines = []
+    for name, family in samples.items():
+        lines.extend(headers[name].get(kind) for kind in ("HELP", "TYPE") if kind in headers[name])
+        lines.extend(family)
+    return "\n".join(lines) + "\n"
+
+
+async def fetch_upstreams(upstreams: dict[str, str], timeout: float = 2.0) -> dict[str, str]:
+    """
+    Чтение /metrics процессов. Недоступный процесс пропускается:
+    он мог упасть и еще не перезапуститься.
+
+    :param upstreams: значение метки -> URL
+    :param timeout: время ожидания ответа, с
+    :return: значение метки -> текст /metrics
+    """
+
+    async def fetch(session: ClientSession, url: str) -> str | None:
+        try:
+            async with session.get(url) as response:
+                return await response.text() if response.status == 200 else None
+        except (ClientError, asyncio.TimeoutError):
+            return None
+
+    async with ClientSession(timeout=ClientTimeout(total=timeout)) as session:
+        texts = await asyncio.gather(*(fetch(session, url) for url in upstreams.values()))
+    return {value: text for value, text in zip(upstreams, texts) if text is not None}
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    registry: Registry = request.app.get("metrics_registry", REGISTRY)
+    body = registry.expose()
+    if (upstreams := request.app.get("metrics_upstreams")) is not None:
+        texts = {None: body, **await fetch_upstreams(upstreams())}
+        body = merge_expositions(texts, request.app["metrics_label"])
+    return web.Response(body=body.encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+def setup_metrics_route(app: web.Application) -> None:
+    app.router.add_get("/metrics", metrics_handler)
+
+
+class MetricsServer:
+    """
+    HTTP-сервер /metrics для отдельных процессов poller, worker и sender.
+    Если порт не указан, сервер не запускается.
+    С upstreams к метрикам процесса добавляются метрики дочерних процессов
+    с меткой label: так supervisor отдает метрики всех процессов worker.
+
+    Методы:
+    start - запуск сервера.
+    stop - остановка сервера.
+    """
+
+    def __init__(
+        self,
+        port: int | None,
+        host: str = "0.0.0.0",
+        registry: Registry = REGISTRY,
+        upstreams: Upstreams | None = None,
+        label: str = "shard",
+    ):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.upstreams = upstreams
+        self.label = label
+        self.runner: web.AppRunner | None = None
+        self.logger = logging.getLogger("metrics")
+
+    async def start(self) -> None:
+        if not self.port:
+            return
+        app = web.Application()
+        app["metrics_registry"] = self.registry
+        if self.upstreams is not None:
+            app["metrics_upstreams"] = self.upstreams
+            app["metrics_label"] = self.label
+        setup_metrics_route(app)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host=self.host, port=self.port).start()
+        self.logger.info(f"metrics on {self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,145 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.store.metrics.metrics import Histogram
+
+TRACE_HEADER = "x-trace"
+SLOW_TRACE_SECONDS = 2.0
+
+TRACE_STAGE_SECONDS = Histogram(
+    "trace_stage_seconds", "Update latency by stage, from getUpdates to sendMessage", ("stage",)
+)
+TRACE_TOTAL_SECONDS = Histogram(
+    "trace_total_seconds",
+    "Time from getUpdates to the first Telegram call for the update",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30),
+)
+TRACE_REPLY_SECONDS = Histogram(
+    "trace_reply_seconds",
+    "Time from getUpdates to each further Telegram call for the same update",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30),
+)
+
+# трасса обновления, которое сейчас обрабатывается, см. RabbitMQ.send_event
+current_trace: ContextVar["TraceContext | None"] = ContextVar("current_trace", default=None)
+
+logger = logging.getLogger("trace")
+
+
+def now_us() -> int:
+    """
+    Текущее время в микросекундах. В заголовках AMQP float передается
+    с одинарной точностью, поэтому время передается целым числом.
+    """
+    return time.time_ns() // 1000
+
+
+@dataclass(slots=True)
+class TraceContext:
+    """
+    Трасса обновления Telegram через poller, worker и sender.
+
+    :param update_id: id обновления
+    :param received: время получения обновления из getUpdates, мкс
+    :param spans: этапы [(название, время окончания этапа в мкс)]
+    :param db: время запросов к базе данных, мкс
+    :param stage: название этапа, который закончится следующей отправкой в RabbitMQ
+    :param reply: номер сообщения среди отправленных предыдущим этапом по этому обновлению
+    :param sent: отправлено сообщений с этой трассой
+    """
+
+    update_id: int
+    received: int = field(default_factory=now_us)
+    spans: list[tuple[str, int]] = field(default_factory=list)
+    db: int = 0
+    stage: str = "publish"
+    reply: int = 0
+    sent: int = 0
+
+    def mark(self, stage: str) -> None:
+        """
+        Окончание этапа.
+
+        :param stage: название этапа
+        """
+        self.spans.append((stage, now_us()))
+
+    def add_db(self, seconds: float) -> None:
+        self.db += int(seconds * 1e6)
+
+    def to_headers(self) -> dict:
+        """
+        Заголовки сообщения RabbitMQ, отправка закрывает текущий этап.
+        Каждое отправленное сообщение получает следующий номер reply.
+
+        :return: заголовки
+        """
+        spans = self.spans + [(self.stage, now_us())]
+        self.sent += 1
+        return {
+            TRACE_HEADER: {
+                "update_id": self.update_id,
+                "received": self.received,
+                "spans": [list(span) for span in spans],
+                "db": self.db,
+                "reply": self.sent - 1,
+            }
+        }
+
+    @classmethod
+    def from_headers(cls, headers: dict | None) -> "TraceContext | None":
+        """
+        Трасса из заголовков сообщения RabbitMQ.
+
+        :param headers: заголовки
+        :return: трасса или None, если сообщение без трассы
+        """
+        if not headers or not (trace := headers.get(TRACE_HEADER)):
+            return None
+        return cls(
+            update_id=trace["update_id"],
+            received=trace["received"],
+            spans=[(stage, at) for stage, at in trace["spans"]],
+            db=trace.get("db", 0),
+            reply=trace.get("reply", 0),
+        )
+
+    def breakdown(self) -> list[tuple[str, float]]:
+        """
+        Длительность этапов в секундах, считая от получения обновления.
+
+        :return: [(этап, секунды)]
+        """
+        result, previous = [], self.received
+        for stage, at in self.spans:
+            result.append((stage, (at - previous) / 1e6))
+            previous = at
+        return result
+
+    def finish(self, slow: float = SLOW_TRACE_SECONDS) -> float:
+        """
+        Учет этапов трассы в метриках, медленные трассы пишутся в лог.
+        Worker копирует трассу во все ответы на обновление, поэтому этапы и полное время
+        учитываются только по первому ответу, остальные - в trace_reply_seconds.
+
+        :param slow: порог медленной трассы, секунды
+        :return: полное время, секунды
+        """
+        total = ((self.spans[-1][1] if self.spans else now_us()) - self.received) / 1e6
+        if self.reply:
+            TRACE_REPLY_SECONDS.observe(total)
+            return total
+        breakdown = self.breakdown()
+        for stage, seconds in breakdown:
+            TRACE_STAGE_SECONDS.labels(stage).observe(seconds)
+        TRACE_STAGE_SECONDS.labels("db").observe(self.db / 1e6)
+        TRACE_TOTAL_SECONDS.observe(total)
+        if total >= slow:
+            spans = " ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in breakdown)
+            logger.warning(
+                f"slow update {self.update_id}: total={total * 1000:.1f}ms "
+                f"{spans} db={self.db / 1000:.1f}ms"
+            )
+        return total
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+import bson
+
+from app.store.metrics import Counter, Histogram
+from app.store.metrics.tracing import current_trace, now_us
+
+BROKER_PUBLISHED = Counter("broker_published_total", "Published messages", ("routing_key",))
+BROKER_QUEUE_LAG = Histogram(
+    "broker_queue_lag_seconds", "Time from publish (after x-delay) to consume", ("routing_key",)
+)
+
+OnMessage = Callable[[Any], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class MemoryMessage:
+    """
+    Сообщение MemoryBroker, повторяет нужную обработчикам часть aio_pika.IncomingMessage.
+
+    :param data: тело сообщения без сериализации
+    :param routing_key: роутинг ключ
+    :param headers: заголовки
+    :param redelivered: повторная доставка после ошибки обработчика
+    :param acked: сообщение подтверждено
+    """
+
+    data: dict
+    routing_key: str
+    headers: dict = field(default_factory=dict)
+    redelivered: bool = False
+    acked: bool = False
+
+    @property
+    def body(self) -> bytes:
+        return bson.dumps(self.data)
+
+    async def ack(self, **kwargs) -> None:
+        self.acked = True
+
+
+class Broker:
+    """
+    Брокер сообщений между poller, worker и sender.
+    Реализации: RabbitMQ - для отдельных процессов,
+    MemoryBroker - для монолита, тестов и бенчмарков.
+
+    Методы:
+
+    connect - подключение
+    disconnect - отключение
+    send_event - отправка сообщения
+    listen_events - прослушивание событий
+    """
+
+    async def connect(self) -> None:
+        raise NotImplementedError
+
+    async def disconnect(self) -> None:
+        raise NotImplementedError
+
+    async def send_event(self, message: Dict, routing_key: str, delay: int = 0) -> None:
+        raise NotImplementedError
+
+    async def listen_events(
+        self,
+        routing_key: list[str],
+        queue_name: str,
+        on_message_func: OnMessage | None = None,
+        exclusive: bool = False,
+    ) -> None:
+        """
+        Прослушивание событий до отмены задачи.
+        Очередь exclusive принадлежит одному потребителю и удаляется вместе с ним:
+        так каждый процесс получает свою копию широковещательных событий.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def make_headers(delay: int) -> dict:
+        """
+        Заголовки сообщения: задержка, время отправки и трасса обновления.
+        :param delay: задержка доставки, мс
+        """
+        headers = {"x-delay": delay, "x-published": now_us()}
+        if not delay and (trace := current_trace.get()) is not None:
+            # отложенные сообщения - таймеры, а не ответ на обновление, трасса в них не идет
+            headers.update(trace.to_headers())
+        return headers
+
+    @staticmethod
+    def observe_lag(message) -> None:
+        """
+        Учет времени ожидания сообщения в очереди без учета x-delay.
+        :param message: полученное сообщение
+        """
+        headers = message.headers or {}
+        if (published := headers.get("x-published")) is not None:
+            lag = (now_us() - published) / 1e6 - (headers.get("x-delay") or 0) / 1000
+            BROKER_QUEUE_LAG.labels(message.routing_key).observe(max(lag, 0.0))
+
+
+def load_message(message) -> dict:
+    """
+    Тело сообщения любого брокера: MemoryBroker передает словарь без сериализации.
+    :param message: полученное сообщение
+    """
+    if isinstance(message, MemoryMessage):
+        return message.data
+    return bson.loads(message.body)
@@ -0,0 +1,147 @@
+import asyncio
+import dataclasses
+import logging
+from collections import defaultdict, deque
+from typing import Dict
+
+from app.store.metrics import Counter
+from app.store.rabbitMQ.broker import BROKER_PUBLISHED, Broker, MemoryMessage, OnMessage
+
+BROKER_UNROUTED_DROPPED = Counter(
+    "broker_unrouted_dropped_total",
+    "Messages without a bound queue dropped by the in-memory broker",
+    ("routing_key",),
+)
+
+
+class MemoryBroker(Broker):
+    """
+    Брокер в памяти процесса для монолита, тестов и бенчмарков:
+    без сети, сериализации и записи на диск.
+
+    Как у RabbitMQ с exchange x-delayed-message: сообщение по роутинг ключу попадает во все
+    привязанные к нему очереди, x-delay откладывает доставку, потребители одной очереди
+    забирают сообщения по одному. Сообщение, обработчик которого упал, доставляется
+    повторно один раз. Сообщения, отправленные до привязки очереди, ждут ее, но не больше
+    max_unrouted на роутинг ключ: если очередь так и не появилась (шард не запущен,
+    никто не слушает события настроек), более старые сообщения теряются.
+
+    Тело сообщения не копируется, отправитель не должен менять словарь после отправки.
+    """
+
+    def __init__(self, max_unrouted: int = 1000):
+        """
+        :param max_unrouted: сообщений без очереди, которые ждут привязки, на роутинг ключ
+        """
+        self.queues: dict[str, asyncio.Queue[MemoryMessage]] = {}
+        self.bindings: dict[str, set[str]] = defaultdict(set)
+        self.max_unrouted = max_unrouted
+        self.unrouted: dict[str, deque[MemoryMessage]] = defaultdict(deque)
+        self.timers: dict[int, asyncio.TimerHandle] = {}
+        self.logger = logging.getLogger("broker")
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        """
+        Отмена отложенных сообщений, как при остановке процесса.
+        """
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers.clear()
+
+    async def send_event(self, message: Dict, routing_key: str, delay: int = 0) -> None:
+        """
+        Отправка сообщения
+        :param message: словарь с сообщением
+        :param routing_key: роутинг ключ
+        :param delay: задержка доставки, мс
+        """
+        incoming = MemoryMessage(
+            data=message, routing_key=routing_key, headers=self.make_headers(delay)
+        )
+        BROKER_PUBLISHED.labels(routing_key).inc()
+        if delay:
+            loop = asyncio.get_running_loop()
+            self.timers[id(incoming)] = loop.call_later(delay / 1000, self._fire, incoming)
+        else:
+            self._route(incoming)
+
+    def _fire(self, message: MemoryMessage) -> None:
+        self.timers.pop(id(message), None)
+        self._route(message)
+
+    def _route(self, message: MemoryMessage) -> None:
+        if not (queues := self.bindings.get(message.routing_key)):
+            waiting = self.unrouted[message.routing_key]
+            if len(waiting) >= self.max_unrouted:
+                waiting.popleft()
+                BROKER_UNROUTED_DROPPED.labels(message.routing_key).inc()
+            waiting.append(message)
+            return
+        for queue_name in queues:
+            self.queues[queue_name].put_nowait(dataclasses.replace(message))
+
+    def bind(self, queue_name: str, routing_key: list[str]) -> asyncio.Queue:
+        """
+        Создание очереди и привязка ее к роутинг ключам.
+        :param queue_name: имя очереди
+        :param routing_key: роутинг ключи
+        """
+        queue = self.queues.setdefault(queue_name, asyncio.Queue())
+        for key in routing_key:
+            self.bindings[key].add(queue_name)
+            for message in self.unrouted.pop(key, ()):
+                queue.put_nowait(message)
+        return queue
+
+    def unbind(self, queue_name: str) -> None:
+        """
+        Удаление очереди вместе с привязками.
+        :param queue_name: имя очереди
+        """
+        self.queues.pop(queue_name, None)
+        for queues in self.bindings.values():
+            queues.discard(queue_name)
+
+    async def listen_events(
+        self,
+        routing_key: list[str],
+        queue_name: str,
+        on_message_func: OnMessage | None = None,
+        exclusive: bool = False,
+    ) -> None:
+        """
+        Прослушивание событий до отмены задачи
+        :param routing_key: роутинг ключ
+        :param queue_name: имя очереди
+        :param on_message_func: функция, которая будет вызвана при получении сообщения
+        :param exclusive: очередь удаляется после отмены задачи
+        """
+        queue = self.bind(queue_name, routing_key)
+        try:
+            while True:
+                message = await queue.get()
+                await self.deliver(queue, message, on_message_func)
+        finally:
+            if exclusive:
+                self.unbind(queue_name)
+
+    async def deliver(
+        self, queue: asyncio.Queue, message: MemoryMessage, on_message_func: OnMessage
+    ) -> None:
+        self.observe_lag(message)
+        try:
+            await on_message_func(message)
+        except Exception as e:
+            if message.redelivered:
+                self.logger.exception(
+                    f"action=drop_message, routing_key={message.routing_key}", exc_info=e
+                )
+            else:
+                self.logger.warning(
+                    f"action=requeue_message, routing_key={message.routing_key}, {e!r}"
+                )
+                message.redelivered = True
+                queue.put_nowait(message)
@@ -8,12 +8,14 @@ import aiormq
 import bson
 from aio_pika import ExchangeType, Connection
 
+from app.store.rabbitMQ.broker import BROKER_PUBLISHED, Broker
+
 if TYPE_CHECKING:
     from app.web.app import Application
 logging.basicConfig(level=logging.INFO)
 
 
-class RabbitMQ:
+class RabbitMQ(Broker):
     """
     RabbitMQ client
     Методы:
@@ -101,20 +103,22 @@ class RabbitMQ:
             aio_pika.Message(
                 body=bson.dumps(message),
                 delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                headers={"x-delay": delay},
+                headers=self.make_headers(delay),
             ),
             routing_key=routing_key,
             mandatory=False,
         )
+        BROKER_PUBLISHED.labels(routing_key).inc()
 
     async def listen_events(
-        self, routing_key: list[str], queue_name: str, on_message_func=None
+        self, routing_key: list[str], queue_name: str, on_message_func=None, exclusive: bool = False
     ) -> None:
         """
         Прослушивание событий
         :param routing_key: роутинг ключ
         :param queue_name: имя очереди
         :param on_message_func: функция, которая будет вызвана при получении сообщения
+        :param exclusive: временная очередь этого соединения, удаляется при отключении
         """
         self.logger.info(
             f"action=listen_events, status=success, routing_key={routing_key}, queue_name={queue_name}"
@@ -133,12 +137,20 @@ class RabbitMQ:
 
             queue = await channel.declare_queue(
                 name=queue_name,
-                durable=True,
+                durable=not exclusive,
+                exclusive=exclusive,
+                auto_delete=exclusive,
             )
             for key in routing_key:
                 await queue.bind(auth_exchange, routing_key=key)
 
-            await queue.consume(on_message_func if on_message_func else self.on_message)
+            on_message_func = on_message_func if on_message_func else self.on_message
+
+            async def consume(message):
+                self.observe_lag(message)
+                return await on_message_func(message)
+
+            await queue.consume(consume)
 
             self.logger.info(" [*] Waiting for messages. To exit press CTRL+C")
             await asyncio.Future()
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+# суффикс роутинг ключа для сообщений без чата: их получают все шарды
+ALL_SHARDS = "all"
+
+
+def chat_shard(chat_id: int, shards: int) -> int:
+    """
+    Номер шарда чата. Остаток от деления в Python неотрицательный,
+    поэтому отрицательные id групп распределяются так же, как личные чаты.
+
+    :param chat_id: id чата Telegram
+    :param shards: количество шардов
+    """
+    return chat_id % shards
+
+
+def shard_routing_key(routing_key: str, chat_id: int | None, shards: int) -> str:
+    """
+    Роутинг ключ сообщения для worker с шардами: <ключ>.<номер шарда> или <ключ>.all,
+    если у сообщения нет чата (обновления poll и poll_answer). С одним шардом ключ не меняется.
+
+    :param routing_key: роутинг ключ без шарда, например poller
+    :param chat_id: id чата сообщения
+    :param shards: количество шардов
+    """
+    if shards <= 1:
+        return routing_key
+    if chat_id is None:
+        return f"{routing_key}.{ALL_SHARDS}"
+    return f"{routing_key}.{chat_shard(chat_id, shards)}"
+
+
+def base_routing_key(routing_key: str) -> str:
+    """
+    Роутинг ключ без номера шарда: poller.3 -> poller.
+    """
+    return routing_key.split(".", 1)[0]
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    """
+    Часть чатов, которые обрабатывает один процесс worker.
+
+    :param index: номер шарда
+    :param count: количество шардов, 1 - все чаты в одном процессе
+    """
+
+    index: int = 0
+    count: int = 1
+
+    def owns(self, chat_id: int) -> bool:
+        """
+        Чат обрабатывается этим шардом.
+
+        :param chat_id: id чата Telegram
+        """
+        return self.count <= 1 or chat_shard(chat_id, self.count) == self.index
+
+    def routing_keys(self, *keys: str) -> list[str]:
+        """
+        Роутинг ключи очереди шарда: свои сообщения и сообщения для всех шардов.
+
+        :param keys: роутинг ключи без шарда
+        """
+        if self.count <= 1:
+            return list(keys)
+        return [key for base in keys for key in (f"{base}.{self.index}", f"{base}.{ALL_SHARDS}")]
+
+    def queue_name(self, name: str) -> str:
+        """
+        Очередь шарда: у каждого шарда своя, с одним шардом - общая очередь name.
+
+        :param name: имя очереди без шарда
+        """
+        return name if self.count <= 1 else f"{name}_{self.index}"
@@ -1,28 +1,64 @@
 import logging
+import time
 
 import aiohttp
 
-from app.store.tg_api.schemes import GetUpdatesResponse, SendMessageResponse, PollResultSchema
+from app.store.metrics import Counter, Histogram
+from app.store.tg_api.schemes import GetUpdatesResponse, SendMessageResponse, StopPollResponse
+
+TG_REQUEST_SECONDS = Histogram("tg_api_request_seconds", "Bot API request time", ("method",))
+TG_RESPONSES = Counter(
+    "tg_api_responses_total", "Bot API responses by HTTP status", ("method", "status")
+)
+
+
+TG_API_URL = "https://api.telegram.org"
 
 
 class TgClient:
-    def __init__(self, token: str = ""):
+    def __init__(self, token: str = "", base_url: str | None = None):
         self.logger = logging.getLogger(__name__)
         self.token = token
+        self.base_url = (base_url or TG_API_URL).rstrip("/")
 
     def get_url(self, method: str):
-        return f"https://api.telegram.org/bot{self.token}/{method}"
+        return f"{self.base_url}/bot{self.token}/{method}"
+
+    async def _request(
+        self, method: str, payload: dict | None = None, params: dict | None = None
+    ) -> tuple[int, dict]:
+        """
+        Запрос к Bot API с учетом времени и статусов ответа (в том числе 429) в метриках.
+
+        :param method: метод Bot API
+        :param payload: тело POST-запроса, если не указано - GET
+        :param params: параметры строки запроса
+        :return: (HTTP-статус, ответ)
+        """
+        url = self.get_url(method)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            async with aiohttp.ClientSession() as session:
+                if payload is None:
+                    request = session.get(url, params=params)
+                else:
+                    request = session.post(url, json=payload)
+                async with request as resp:
+                    status = resp.status
+                    return resp.status, await resp.json()
+        finally:
+            TG_REQUEST_SECONDS.labels(method).observe(time.perf_counter() - started)
+            TG_RESPONSES.labels(method, status).inc()
 
     async def get_updates(self, offset: int | None = None, timeout: int = 0) -> dict:
-        url = self.get_url("getUpdates")
         params = {}
         if offset:
             params["offset"] = offset
         if timeout:
             params["timeout"] = timeout
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                return await resp.json()
+        _, res_dict = await self._request("getUpdates", params=params)
+        return res_dict
 
     async def get_updates_in_objects(
         self, offset: int | None = None, timeout: int = 0
@@ -36,34 +72,26 @@ class TgClient:
             logging.error(f"Failed to load schema {e}")
 
     async def get_me(self) -> dict:
-        url = self.get_url("getMe")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                return await resp.json()
+        _, res_dict = await self._request("getMe")
+        return res_dict
 
     async def send_message(
         self, chat_id: int, text: str, force_reply: bool = False
     ) -> SendMessageResponse:
-        url = self.get_url("sendMessage")
         payload = {
             "chat_id": chat_id,
             "text": text,
             "reply_markup": {"force_reply": force_reply, "selective": True},
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                res_dict = await resp.json()
-                return SendMessageResponse.Schema().load(res_dict)
+        _, res_dict = await self._request("sendMessage", payload=payload)
+        return SendMessageResponse.Schema().load(res_dict)
 
     async def send_keyboard(
         self, chat_id: int, text: str = "Pick on me", keyboard: dict = None
     ) -> SendMessageResponse:
-        url = self.get_url("sendMessage")
         payload = {"chat_id": chat_id, "text": text, "reply_markup": keyboard}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                res_dict = await resp.json()
-                return SendMessageResponse.Schema().load(res_dict)
+        _, res_dict = await self._request("sendMessage", payload=payload)
+        return SendMessageResponse.Schema().load(res_dict)
 
     async def send_poll(
         self,
@@ -73,7 +101,6 @@ class TgClient:
         anonymous: bool = False,
         period: int = 15,
     ) -> SendMessageResponse:
-        url = self.get_url("sendPoll")
         payload = {
             "chat_id": chat_id,
             "question": question,
@@ -85,34 +112,24 @@ class TgClient:
             },
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                res_dict = await resp.json()
-                return SendMessageResponse.Schema().load(res_dict)
+        _, res_dict = await self._request("sendPoll", payload=payload)
+        return SendMessageResponse.Schema().load(res_dict)
 
     async def remove_inline_keyboard(self, message_id: int, chat_id: int) -> SendMessageResponse:
-        url = self.get_url("editMessageReplyMarkup")
         payload = {
             "chat_id": chat_id,
             "message_id": message_id,
             "reply_markup": {"inline_keyboard": [[]]},
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                res_dict = await resp.json()
-                return SendMessageResponse.Schema().load(res_dict)
+        _, res_dict = await self._request("editMessageReplyMarkup", payload=payload)
+        return SendMessageResponse.Schema().load(res_dict)
 
-    async def stop_poll(self, chat_id: int, message_id: int) -> PollResultSchema:
-        url = self.get_url("stopPoll")
+    async def stop_poll(self, chat_id: int, message_id: int) -> StopPollResponse:
         payload = {"chat_id": chat_id, "message_id": message_id}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                res_dict = await resp.json()
-                return PollResultSchema.Schema().load(res_dict)
+        _, res_dict = await self._request("stopPoll", payload=payload)
+        return StopPollResponse.Schema().load(res_dict)
 
     async def send_callback_alert(self, callback_id: str, text: str) -> int:
-        url = self.get_url("answerCallbackQuery")
         payload = {"callback_query_id": callback_id, "text": text}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                return resp.status
+        status, _ = await self._request("answerCallbackQuery", payload=payload)
+        return status
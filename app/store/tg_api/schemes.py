@@ -136,6 +136,24 @@ class SendMessageResponse:
         unknown = EXCLUDE
 
 
+@dataclass
+class StopPollResponse:
+    """
+    Ответ stopPoll: при успехе result - закрытый опрос (Poll, а не Message),
+    при ошибке (429, 400 для уже закрытого опроса) - error_code и description.
+    """
+
+    ok: bool
+    result: Poll | None = None
+    error_code: int | None = None
+    description: str | None = None
+
+    Schema: ClassVar[Type[Schema]] = Schema
+
+    class Meta:
+        unknown = EXCLUDE
+
+
 @dataclass
 class PollResultSchema:
     ok: bool
@@ -1,10 +1,12 @@
 import logging
-from dataclasses import dataclass
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import select, insert, update, func, delete
-from sqlalchemy.dialects.postgresql import insert as psg_insert
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, insert, update, func, delete, Float, cast, literal
+
+from app.store.database.upsert import greatest
 
 from app.words_game.models import (
     GameSession,
@@ -14,8 +16,15 @@ from app.words_game.models import (
     UserGameSession,
     Words,
     WordsInGame,
+    WordVerdict,
     GameSettings,
+    PlayerStats,
+    GameEvent,
 )
+from app.store.words_game.bitmap import CityBitmap
+from app.store.words_game.events import GameEventRecord
+from app.store.words_game.write_behind import PointsDelta, UsedWord, WriteBehind
+from app.store.words_game.leaderboard import GLOBAL_CHAT, LeaderEntry, PlayerResult
 from random import choice, randint
 
 if TYPE_CHECKING:
@@ -25,7 +34,7 @@ if TYPE_CHECKING:
 @dataclass
 class WGAccessor:
     """
-    Класс для работы с базой данных игры "Города" и "Слова".
+    Класс для работы с базой данных игры "Города" и "Слова", реализация GameStore.
     Методы класса WGAccessor:
 
     select_active_session_by_id - получение активной игровой сессии по id пользователя или id чата.
@@ -40,8 +49,11 @@ class WGAccessor:
         Если не указана буква, выбирается случайная.
         Если не указано количество городов, выбирается все города, начинающиеся на указанную букву.
     get_city_by_name - получение города по имени.
+    get_city_names - получение списка (id, название) всех городов.
+    get_used_cities - получение битовой карты использованных в игре городов.
     check_city_in_used - проверка использовался ли город в игре.
     set_city_to_used - установка города как использованный в игре.
+    save_city_move - сохранение ходов игры в города одним UPDATE.
     get_city_list_by_session_id - получение списка городов, которые использовались в игре.
     add_user_to_team - добавление игрока в команду.
     update_team - обновление игрока в команде с указанным id, добавление указанного количества очков и раундов.
@@ -54,13 +66,91 @@ class WGAccessor:
     add_used_word - добавление слова в использованное в игре.
     get_player_list - получение списка игроков в игре.
     get_game_settings - получение настроек игры.
+    get_settings_version - получение версии настроек игры.
     set_player_poll_answer - установка ответа на опрос.
     check_not_anonim_poll - проверка результата опроса.
+    get_word_verdict - получение сохраненного итога голосований за слово.
+    save_word_verdict - сохранение итога голосования за слово.
     update_total_points_to_user - обновление очков игроков.
+    get_game_results - итоги игроков в игре для статистики.
+    save_player_stats - добавление итогов игры к статистике игроков.
+    get_leaderboard - строки рейтинга чата.
+    flush - выполнение отложенных записей.
+
+    Использованные города хранятся битовой картой в game_sessions.used_city_bitmap
+    и кэшируются в памяти (used_cities) до окончания игры.
+    Таблица used_cities пишется только при keep_city_history = True
+    и нужна для статистики с порядком названных городов.
+
+    Итоги голосований за слова хранятся в word_verdicts для чата, а при
+    share_verdicts = True и для всех чатов (chat_id = 0). Вердикт используется,
+    пока не истек verdict_ttl и доля голосов за решение не ниже verdict_min_confidence.
+
+    С write_behind очки и раунды игроков (update_team), слова игры (add_used_word)
+    и итоговые очки (update_total_points_to_user) пишутся отложенно пачкой.
+    Чтение очков игроков и слов игры не ждет записи: к строкам базы добавляются
+    еще не записанные изменения этой игры (WriteBehind.pending).
     """
 
     database: "Database"
     logger: logging.Logger = logging.getLogger("words_game")
+    keep_city_history: bool = False
+    used_cities: dict[int, CityBitmap] = field(default_factory=dict)
+    share_verdicts: bool = False
+    verdict_ttl: timedelta = timedelta(days=30)
+    verdict_min_confidence: float = 0.6
+    write_behind: WriteBehind | None = None
+
+    async def _write(self, *queries, game_id: int | None = None, effect=None) -> None:
+        """
+        Некритичная запись: отложенно при write_behind, иначе сразу одной транзакцией.
+
+        :param queries: запросы в порядке выполнения
+        :param game_id: игра, чтение которой должно видеть запись до flush
+        :param effect: изменение игры для чтения до flush
+        """
+        if self.write_behind is not None:
+            self.write_behind.add(*queries, key=game_id, effect=effect)
+        elif len(queries) == 1:
+            await self.database.execute_query(queries[0])
+        else:
+            await self.database.execute_transaction(list(queries))
+
+    def _reading(self):
+        return self.write_behind.reading() if self.write_behind is not None else nullcontext()
+
+    def _pending(self, game_id: int) -> list:
+        return self.write_behind.pending(game_id) if self.write_behind is not None else []
+
+    @staticmethod
+    def _add_points(point: int | None, pending: dict[int, PointsDelta], player_id: int):
+        if player_id not in pending:
+            return point
+        return (point or 0) + pending[player_id].point
+
+    def _pending_points(self, game_id: int) -> dict[int, PointsDelta]:
+        """
+        Сумма еще не записанных изменений очков и раундов игроков игры.
+
+        :param game_id: id игры
+        """
+        points: dict[int, PointsDelta] = {}
+        for delta in self._pending(game_id):
+            if isinstance(delta, PointsDelta):
+                prev = points.get(delta.player_id, PointsDelta(player_id=delta.player_id))
+                points[delta.player_id] = PointsDelta(
+                    player_id=delta.player_id,
+                    point=prev.point + delta.point,
+                    round_=prev.round_ + delta.round_,
+                )
+        return points
+
+    async def flush(self) -> None:
+        """
+        Выполнение отложенных записей при остановке процесса.
+        """
+        if self.write_behind is not None:
+            await self.write_behind.stop()
 
     async def get_session_by_id(
         self, user_id: int | None = None, chat_id: int | None = None, is_active: bool = True
@@ -121,7 +211,8 @@ class WGAccessor:
             poll_time=poll_time,
             anonymous_poll=anonymous_poll,
             life=life,
-        )
+            used_city_bitmap=b"",
+        ).returning(GameSession)
         res = await self.database.execute_query(query)
         return res.scalar()
 
@@ -158,6 +249,8 @@ class WGAccessor:
             .returning(GameSession)
         )
         res = await self.database.execute_query(query)
+        if not status:
+            self.used_cities.pop(game_id, None)
         return res.scalar_one_or_none()
 
     async def delete_game_session(self, chat_id: int) -> None:
@@ -172,19 +265,24 @@ class WGAccessor:
         return res.scalar()
 
     async def change_next_user_to_game_session(
-        self, game_id: int, user_id: int
+        self, game_id: int, user_id: int, next_letter: str | None = None
     ) -> GameSession | None:
         """
-        Изменение следующего пользователя в игровой сессии.
+        Изменение следующего пользователя в игровой сессии. Новая буква хода
+        пишется тем же UPDATE, отдельного запроса на ход не нужно.
 
         :param game_id: id игровой сессии
         :param user_id: id пользователя
+        :param next_letter: буква следующего слова, None - не меняется
         :return: обновленная игровая сессия
         """
+        values = {"next_user_id": user_id}
+        if next_letter:
+            values["next_start_letter"] = next_letter
         query = (
             update(GameSession)
             .where(GameSession.id == game_id, GameSession.is_active == True)
-            .values(next_user_id=user_id)
+            .values(**values)
             .returning(GameSession)
         )
 
@@ -199,8 +297,7 @@ class WGAccessor:
         :param username: имя пользователя
         :return: созданный пользователь
         """
-        query = psg_insert(User).values(id=user_id, username=username).returning(User)
-        query = query.on_conflict_do_nothing()
+        query = self.database.upsert(User, dict(id=user_id, username=username)).returning(User)
         res = (await self.database.execute_query(query)).scalar()
         if res:
             return res
@@ -273,6 +370,40 @@ class WGAccessor:
         city = res.scalar()
         return city
 
+    async def get_city_names(self) -> list[tuple[int, str]]:
+        """
+        Получение списка всех городов для построения индекса в памяти.
+
+        :return: список пар (id города, название)
+        """
+        query = select(City.id, City.name)
+        res = await self.database.execute_query(query)
+        return [(city_id, name) for city_id, name in res.all()]
+
+    async def get_used_cities(self, game_session_id: int) -> CityBitmap:
+        """
+        Получение битовой карты использованных в игре городов.
+        Читается из базы один раз, дальше берется из памяти.
+        Для игр, начатых до появления битовой карты, собирается из used_cities.
+
+        :param game_session_id: id игровой сессии
+        :return: битовая карта
+        """
+        if (bitmap := self.used_cities.get(game_session_id)) is None:
+            bitmap = await self._load_used_cities(game_session_id)
+            self.used_cities[game_session_id] = bitmap
+        return bitmap
+
+    async def _load_used_cities(self, game_session_id: int) -> CityBitmap:
+        query = select(GameSession.used_city_bitmap).where(GameSession.id == game_session_id)
+        data = (await self.database.execute_query(query)).scalar()
+        bitmap = CityBitmap(data)
+        if data is None:
+            query = select(UsedCity.city_id).where(UsedCity.game_session_id == game_session_id)
+            for city_id in (await self.database.execute_query(query)).scalars().all():
+                bitmap.add(city_id)
+        return bitmap
+
     async def check_city_in_used(self, city_id: int, game_session_id: int) -> bool:
         """
         Проверка использовался ли город в игре.
@@ -281,13 +412,7 @@ class WGAccessor:
         :param game_session_id: id игровой сессии
         :return: True, если город использовался, иначе False
         """
-        query = select(UsedCity).where(
-            UsedCity.city_id == city_id, UsedCity.game_session_id == game_session_id
-        )
-        res = await self.database.execute_query(query)
-        double_city = res.scalar_one_or_none()
-
-        return True if double_city else False
+        return city_id in await self.get_used_cities(game_session_id)
 
     async def set_city_to_used(self, city_id: int, game_session_id: int) -> None:
         """
@@ -296,10 +421,46 @@ class WGAccessor:
         :param city_id: id города
         :param game_session_id: id игровой сессии
         """
-        query = insert(UsedCity).values(city_id=city_id, game_session_id=game_session_id)
+        bitmap = await self.get_used_cities(game_session_id)
+        bitmap.add(city_id)
+        query = (
+            update(GameSession)
+            .where(GameSession.id == game_session_id)
+            .values(used_city_bitmap=bitmap.to_bytes())
+        )
         await self.database.execute_query(query)
+        if self.keep_city_history:
+            query = insert(UsedCity).values(city_id=city_id, game_session_id=game_session_id)
+            await self.database.execute_query(query)
         return
 
+    async def save_city_move(
+        self, game_session_id: int, next_letter: str | None, used: CityBitmap, city_ids: list[int]
+    ) -> None:
+        """
+        Сохранение ходов игры в города: следующая буква и битовая карта одним UPDATE.
+        Статус игры и опрос не трогаются, поэтому запись можно выполнять отложенно.
+
+        :param game_session_id: id игровой сессии
+        :param next_letter: следующая буква
+        :param used: битовая карта использованных городов
+        :param city_ids: id городов, названных с прошлого сохранения
+        """
+        query = (
+            update(GameSession)
+            .where(GameSession.id == game_session_id)
+            .values(
+                next_start_letter=next_letter if next_letter else GameSession.next_start_letter,
+                used_city_bitmap=used.to_bytes(),
+            )
+        )
+        await self.database.execute_query(query)
+        if self.keep_city_history and city_ids:
+            query = insert(UsedCity).values(
+                [{"city_id": city_id, "game_session_id": game_session_id} for city_id in city_ids]
+            )
+            await self.database.execute_query(query)
+
     async def get_city_list_by_session_id(self, game_session_id: int) -> list[City]:
         """
         Получение списка городов, которые использовались в игре.
@@ -307,6 +468,13 @@ class WGAccessor:
         :param game_session_id: id игровой сессии
         :return: список городов
         """
+        if not self.keep_city_history:
+            bitmap = self.used_cities.get(game_session_id)
+            if bitmap is None:
+                bitmap = await self._load_used_cities(game_session_id)
+            query = select(City).where(City.id.in_(list(bitmap))).order_by(City.id)
+            return list((await self.database.execute_query(query)).scalars().all())
+
         query = select(UsedCity).where(UsedCity.game_session_id == game_session_id)
 
         res = await self.database.execute_query(query)
@@ -322,10 +490,9 @@ class WGAccessor:
         :param life:
         :return:
         """
-        query = psg_insert(UserGameSession).values(
-            player_id=user_id, game_sessions_id=game_id, life=life
+        query = self.database.upsert(
+            UserGameSession, dict(player_id=user_id, game_sessions_id=game_id, life=life)
         )
-        query = query.on_conflict_do_nothing()
         await self.database.execute_query(query)
         return
 
@@ -352,7 +519,8 @@ class WGAccessor:
                 round_=UserGameSession.round_ + round_,
             )
         )
-        await self.database.execute_query(query)
+        effect = PointsDelta(player_id=user_id, point=point, round_=round_)
+        await self._write(query, game_id=game_session_id, effect=effect)
 
     async def get_team_by_game_id(
         self, game_session_id: int, player_id: int | None = None
@@ -416,9 +584,11 @@ class WGAccessor:
         :return: список слов
         """
         query = select(WordsInGame).where(WordsInGame.game_session_id == game_session_id)
-        res = await self.database.execute_query(query)
-        words_lst = res.scalars().all()
-        return [word.word.word for word in words_lst]
+        async with self._reading():
+            res = await self.database.execute_query(query)
+            pending = self._pending(game_session_id)
+        words_lst = [word.word.word for word in res.scalars().all()]
+        return words_lst + [word.word for word in pending if isinstance(word, UsedWord)]
 
     async def add_word(self, word: str) -> None:
         """
@@ -427,8 +597,7 @@ class WGAccessor:
         :param word:
         :return:
         """
-        query = psg_insert(Words).values(word=word.capitalize()).returning(Words)
-        query.on_conflict_do_nothing()
+        query = insert(Words).values(word=word.capitalize()).returning(Words)
         res = await self.database.execute_query(query)
         return res.scalar_one_or_none()
 
@@ -445,21 +614,20 @@ class WGAccessor:
 
     async def add_used_word(self, game_session_id: int, word: str) -> None:
         """
-        Добавление слова в использованное в игре.
+        Добавление слова в использованное в игре: слово добавляется в словарь,
+        если его там нет, и связывается с игрой без чтения его id.
 
         :param game_session_id: id игровой сессии
         :param word: слово
         :return:
         """
-        try:
-            word_id = await self.add_word(word)
-        except IntegrityError:
-            self.logger.error("Word already used")
-            word_id = None
-        if word_id is None:
-            word_id = await self.get_word_by_word(word)
-        query = insert(WordsInGame).values(word_id=word_id.id, game_session_id=game_session_id)
-        await self.database.execute_query(query)
+        word = word.capitalize()
+        add_word = self.database.upsert(Words, {"word": word}, index_elements=[Words.word])
+        add_used = insert(WordsInGame).from_select(
+            ["game_session_id", "word_id"],
+            select(literal(game_session_id), Words.id).where(Words.word == word),
+        )
+        await self._write(add_word, add_used, game_id=game_session_id, effect=UsedWord(word=word))
 
     async def get_player_list(self, game_session_id: int) -> list:
         """
@@ -469,19 +637,35 @@ class WGAccessor:
         :return: список игроков
         """
         query = select(UserGameSession).where(UserGameSession.game_sessions_id == game_session_id)
-        res = await self.database.execute_query(query)
-        players = [(player.player.username, player.point) for player in res.scalars().all()]
+        async with self._reading():
+            res = await self.database.execute_query(query)
+            pending = self._pending_points(game_session_id)
+        players = [
+            (player.player.username, self._add_points(player.point, pending, player.player_id))
+            for player in res.scalars().all()
+        ]
         return players
 
     async def get_game_settings(self):
         """
-        Получение настроек игры.
+        Получение настроек игры, строка настроек создается при первом запуске.
+        Строка читается заново: настройки меняются из админки без перезапуска worker.
 
         :return: настроек игры
         """
         query = select(GameSettings)
         res = await self.database.execute_query(query)
-        return res.scalar_one()
+        return res.scalars().first() or await GameSettings.get_instance(self.database.session)
+
+    async def get_settings_version(self) -> int:
+        """
+        Версия настроек игры: одно число вместо всей строки для периодической сверки.
+
+        :return: версия настроек, 0 если настроек еще нет
+        """
+        query = select(GameSettings.version)
+        res = await self.database.execute_query(query)
+        return res.scalars().first() or 0
 
     async def get_player(self, player_id: int, game_session_id: int) -> UserGameSession | None:
         """
@@ -494,8 +678,14 @@ class WGAccessor:
             UserGameSession.player_id == player_id,
             UserGameSession.game_sessions_id == game_session_id,
         )
-        res = await self.database.execute_query(query)
-        return res.scalar()
+        async with self._reading():
+            res = await self.database.execute_query(query)
+            pending = self._pending_points(game_session_id)
+        player = res.scalar()
+        if player is not None and player_id in pending:
+            player.point = (player.point or 0) + pending[player_id].point
+            player.round_ = (player.round_ or 0) + pending[player_id].round_
+        return player
 
     async def set_player_poll_answer(
         self, game_session_id: int, player_id: int, answer: bool
@@ -542,18 +732,212 @@ class WGAccessor:
         else:
             return False
 
+    async def get_word_verdict(self, word: str, chat_id: int) -> bool | None:
+        """
+        Получение сохраненного итога голосований за слово.
+        Вердикт чата важнее общего.
+
+        :param word: слово
+        :param chat_id: id чата
+        :return: True - слово принято, False - отклонено, None - вердикта нет
+        """
+        query = (
+            select(WordVerdict.accepted)
+            .where(
+                WordVerdict.word == word.capitalize(),
+                WordVerdict.chat_id.in_((chat_id, 0)),
+                WordVerdict.expires_at > datetime.now(timezone.utc),
+                WordVerdict.confidence >= self.verdict_min_confidence,
+            )
+            .order_by(WordVerdict.chat_id == 0)
+            .limit(1)
+        )
+        res = await self.database.execute_query(query)
+        return res.scalar_one_or_none()
+
+    async def save_word_verdict(self, word: str, chat_id: int, yes: int, no: int) -> None:
+        """
+        Сохранение итога голосования за слово.
+        Голоса складываются с прошлыми голосованиями, срок действия продлевается.
+
+        :param word: слово
+        :param chat_id: id чата
+        :param yes: голосов за
+        :param no: голосов против
+        :return:
+        """
+        if yes + no == 0:
+            return
+        expires_at = datetime.now(timezone.utc) + self.verdict_ttl
+        for scope in (chat_id, 0) if self.share_verdicts else (chat_id,):
+            query = self.database.upsert(
+                WordVerdict,
+                dict(
+                    word=word.capitalize(),
+                    chat_id=scope,
+                    accepted=yes > no,
+                    yes=yes,
+                    no=no,
+                    confidence=max(yes, no) / (yes + no),
+                    expires_at=expires_at,
+                ),
+                index_elements=[WordVerdict.word, WordVerdict.chat_id],
+                update=self._merge_verdict,
+            )
+            await self.database.execute_query(query)
+
+    @staticmethod
+    def _merge_verdict(excluded) -> dict:
+        total_yes = WordVerdict.yes + excluded.yes
+        total_no = WordVerdict.no + excluded.no
+        return {
+            "yes": total_yes,
+            "no": total_no,
+            "accepted": total_yes > total_no,
+            "confidence": cast(greatest(total_yes, total_no), Float) / (total_yes + total_no),
+            "expires_at": excluded.expires_at,
+        }
+
     async def update_total_points_to_user(self, game_id):
         """
-        Обновление очков игроков.
+        Обновление очков игроков одним UPDATE.
         :param game_id: id игры
         :return:
         """
-        query = select(UserGameSession).where(UserGameSession.game_sessions_id == game_id)
-        team_lst = (await self.database.execute_query(query)).scalars().all()
-        team = []
-        for user in team_lst:
-            player = user.player
-            player.total_point += user.point
-            team.append(player)
+        team = UserGameSession.game_sessions_id == game_id
+        points = (
+            select(func.sum(UserGameSession.point))
+            .where(team, UserGameSession.player_id == User.id)
+            .scalar_subquery()
+        )
+        query = (
+            update(User)
+            .where(User.id.in_(select(UserGameSession.player_id).where(team)))
+            .values(total_point=func.coalesce(User.total_point, 0) + func.coalesce(points, 0))
+            .execution_options(synchronize_session=False)
+        )
+        await self._write(query)
+
+    async def get_game_results(self, game_session_id: int) -> list[PlayerResult]:
+        """
+        Итоги игроков в игре: засчитанные слова - очки игрока в игре.
+
+        :param game_session_id: id игровой сессии
+        :return: итоги игроков без победителя и времени ответов
+        """
+        query = (
+            select(UserGameSession.player_id, User.username, UserGameSession.point)
+            .join(User, User.id == UserGameSession.player_id)
+            .where(UserGameSession.game_sessions_id == game_session_id)
+        )
+        async with self._reading():
+            res = await self.database.execute_query(query)
+            pending = self._pending_points(game_session_id)
+        return [
+            PlayerResult(
+                user_id=user_id,
+                username=username,
+                words=self._add_points(point, pending, user_id) or 0,
+            )
+            for user_id, username, point in res.all()
+        ]
+
+    async def save_player_stats(self, chat_id: int, results: list[PlayerResult]) -> None:
+        """
+        Добавление итогов игры к статистике игроков в чате и общей (chat_id = 0)
+        одним INSERT ... ON CONFLICT.
+
+        :param chat_id: id чата
+        :param results: итоги игроков
+        """
+        values = [
+            dict(
+                chat_id=scope,
+                user_id=result.user_id,
+                games=1,
+                wins=int(result.won),
+                words=result.words,
+                response_time=result.response_time,
+                answers=result.answers,
+            )
+            for scope in {chat_id, GLOBAL_CHAT}
+            for result in results
+        ]
+        query = self.database.upsert(
+            PlayerStats,
+            values,
+            index_elements=[PlayerStats.chat_id, PlayerStats.user_id],
+            update=self._merge_stats,
+        )
+        await self.database.execute_query(query)
+
+    @staticmethod
+    def _merge_stats(excluded) -> dict:
+        return {
+            column: getattr(PlayerStats, column) + getattr(excluded, column)
+            for column in ("games", "wins", "words", "response_time", "answers")
+        }
+
+    async def get_leaderboard(self, chat_id: int) -> list[LeaderEntry]:
+        """
+        Строки рейтинга чата для построения Leaderboard.
+
+        :param chat_id: id чата, 0 - общий рейтинг
+        :return: строки рейтинга без сортировки
+        """
+        query = (
+            select(
+                PlayerStats.user_id,
+                User.username,
+                PlayerStats.words,
+                PlayerStats.wins,
+                PlayerStats.games,
+            )
+            .join(User, User.id == PlayerStats.user_id)
+            .where(PlayerStats.chat_id == chat_id)
+        )
+        res = await self.database.execute_query(query)
+        return [LeaderEntry(*row) for row in res.all()]
+
+    async def add_game_events(self, events: list[GameEventRecord]) -> None:
+        """
+        Запись пачки событий журнала ходов одним executemany.
+
+        :param events: события
+        """
+        rows = [
+            dict(
+                game_session_id=event.game_id,
+                kind=event.kind,
+                created_at=event.created_at,
+                user_id=event.user_id,
+                data=event.data,
+            )
+            for event in events
+        ]
+        await self.database.execute_many(insert(GameEvent), rows)
 
-        await self.database.add_all_query(team)
+    async def get_game_events(self, game_session_id: int) -> list[GameEventRecord]:
+        """
+        События игры по порядку: пачки разных процессов worker пишутся независимо,
+        поэтому порядок - по времени события, затем по id.
+
+        :param game_session_id: id игры
+        :return: события
+        """
+        query = (
+            select(GameEvent)
+            .where(GameEvent.game_session_id == game_session_id)
+            .order_by(GameEvent.created_at, GameEvent.id)
+        )
+        res = await self.database.execute_query(query)
+        return [
+            GameEventRecord(
+                game_id=event.game_session_id,
+                kind=event.kind,
+                user_id=event.user_id,
+                data=event.data,
+                created_at=event.created_at,
+            )
+            for event in res.scalars().all()
+        ]
@@ -0,0 +1,148 @@
+"""
+Перенос завершенных игр из горячих таблиц в архивные (<таблица>_archive).
+
+Разовый перенос всех игр старше N дней:
+    python -m app.store.words_game.archive --days 30
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from app.store.database.database import Database
+from app.store.metrics import Counter
+from app.words_game.models import (
+    GameEvent,
+    GameSession,
+    UsedCity,
+    UserGameSession,
+    WordsInGame,
+    game_events_archive,
+    game_sessions_archive,
+    used_cities_archive,
+    user_game_sessions_archive,
+    words_in_game_archive,
+)
+
+GAMES_ARCHIVED = Counter("games_archived_total", "Finished games moved to archive tables")
+
+# (горячая таблица, архивная, колонка id игры); дочерние таблицы удаляются раньше игр
+MOVES = (
+    (UserGameSession.__table__, user_game_sessions_archive, "game_sessions_id"),
+    (WordsInGame.__table__, words_in_game_archive, "game_session_id"),
+    (UsedCity.__table__, used_cities_archive, "game_session_id"),
+    (GameEvent.__table__, game_events_archive, "game_session_id"),
+    (GameSession.__table__, game_sessions_archive, "id"),
+)
+
+
+@dataclass
+class GameArchiver:
+    """
+    Фоновый перенос завершенных игр в архив пачками по batch_size игр.
+
+    Пачка - одна транзакция: INSERT ... SELECT в архивные таблицы и DELETE из горячих,
+    поэтому игра не теряется и не оказывается в обеих таблицах. Завершенной считается
+    неактивная игра, созданная раньше чем after назад: время окончания игры не хранится.
+    Между пачками цикл уступает другим запросам, между проходами спит interval секунд.
+
+    :param database: база данных
+    :param after: возраст игры для переноса
+    :param batch_size: игр в одной транзакции
+    :param interval: пауза между проходами, с
+    """
+
+    database: Database
+    after: timedelta = timedelta(days=30)
+    batch_size: int = 500
+    interval: float = 600
+    logger: logging.Logger = logging.getLogger("archive")
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+    async def archive_batch(self) -> int:
+        """
+        Перенос одной пачки игр.
+
+        :return: перенесено игр
+        """
+        cutoff = datetime.now(timezone.utc) - self.after
+        query = (
+            select(GameSession.id)
+            .where(GameSession.is_active.is_(False), GameSession.created_at < cutoff)
+            .order_by(GameSession.id)
+            .limit(self.batch_size)
+        )
+        game_ids = (await self.database.execute_query(query)).scalars().all()
+        if not game_ids:
+            return 0
+        moves = [
+            archive.insert().from_select(
+                [column.name for column in table.columns],
+                select(table).where(table.c[key].in_(game_ids)),
+            )
+            for table, archive, key in MOVES
+        ]
+        deletes = [delete(table).where(table.c[key].in_(game_ids)) for table, _, key in MOVES]
+        await self.database.execute_transaction(moves + deletes)
+        GAMES_ARCHIVED.inc(len(game_ids))
+        return len(game_ids)
+
+    async def archive_all(self) -> int:
+        """
+        Перенос пачками, пока есть завершенные игры.
+
+        :return: перенесено игр
+        """
+        total = 0
+        while moved := await self.archive_batch():
+            total += moved
+            await asyncio.sleep(0)
+        if total:
+            self.logger.info(f"archived {total} games")
+        return total
+
+    async def start(self, *_: list, **__: dict) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self, *_: list, **__: dict) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.archive_all()
+            except Exception as e:
+                self.logger.error(f"archive failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+async def run(args) -> None:
+    # конфигурация читает обязательные переменные окружения, поэтому только при запуске из консоли
+    from app.web.config import config
+
+    database = Database(cfg=config)
+    await database.connect()
+    try:
+        archiver = GameArchiver(
+            database, after=timedelta(days=args.days), batch_size=args.batch_size
+        )
+        print(f"archived {await archiver.archive_all()} games")
+    finally:
+        await database.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from typing import Iterator
+
+
+class CityBitmap:
+    """
+    Битовая карта использованных городов игровой сессии.
+    Бит с номером id города выставлен, если город уже был назван.
+
+    Хранится в game_sessions.used_city_bitmap (bytea) и в памяти воркера.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes | None = None):
+        self.data = bytearray(data or b"")
+
+    def __contains__(self, city_id: int) -> bool:
+        byte = city_id >> 3
+        return byte < len(self.data) and bool(self.data[byte] >> (city_id & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for byte_num, byte in enumerate(self.data):
+            while byte:
+                low_bit = byte & -byte
+                yield (byte_num << 3) + low_bit.bit_length() - 1
+                byte ^= low_bit
+
+    def __len__(self) -> int:
+        return int.from_bytes(self.data, "little").bit_count()
+
+    def add(self, city_id: int) -> None:
+        """
+        Отметка города как использованного.
+
+        :param city_id: id города
+        """
+        byte = city_id >> 3
+        if byte >= len(self.data):
+            self.data.extend(bytes(byte + 1 - len(self.data)))
+        self.data[byte] |= 1 << (city_id & 7)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
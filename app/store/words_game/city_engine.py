@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from app.store.words_game.bitmap import CityBitmap
+from app.store.words_game.city_index import CityIndex
+from app.store.words_game.letter_graph import LEVELS, LetterGraph, LetterUsage
+
+if TYPE_CHECKING:
+    from app.store.words_game.store import GameStore
+
+
+@dataclass(slots=True)
+class CityGameState:
+    """
+    Состояние игры в города в памяти воркера.
+
+    :param game_id: id игровой сессии
+    :param chat_id: id чата
+    :param next_letter: буква следующего города
+    :param used: битовая карта использованных городов
+    :param usage: счетчики использованных городов по буквам
+    """
+
+    game_id: int
+    chat_id: int
+    next_letter: str | None = None
+    used: CityBitmap = field(default_factory=CityBitmap)
+    usage: LetterUsage = field(default_factory=LetterUsage)
+
+
+@dataclass
+class CityGameEngine:
+    """
+    Движок игры в города для одного игрока.
+
+    Держит индекс городов и состояние активных игр в памяти, поэтому ход бота
+    и проверка хода игрока не обращаются к базе. База читается только при первом
+    обращении к игре (например, после рестарта воркера). Ходы сохраняются
+    отложенно: фоновая задача пишет последнее состояние каждой измененной игры
+    одним UPDATE.
+
+    Ход бота выбирается по графу переходов между буквами (LetterGraph) с учетом
+    сложности, выбранной игроком.
+
+    С owns (несколько процессов worker) движок не читает и не держит в памяти игры
+    чатов другого процесса: иначе у двух процессов были бы свои копии одной игры.
+
+    Методы:
+    load - построение индекса городов и графа букв.
+    set_level - выбор сложности для чата.
+    start - запуск фоновой записи ходов.
+    stop - остановка фоновой записи с сохранением накопленных ходов.
+    new_game - регистрация новой игры.
+    get_state - состояние активной игры чата.
+    find - точный поиск города по названию.
+    pick - выбор города ботом.
+    play - ход: отметка города и смена буквы.
+    finish - завершение игры с сохранением ее ходов.
+    flush - сохранение накопленных ходов.
+    """
+
+    words_game: "GameStore"
+    index: CityIndex | None = None
+    graph: LetterGraph | None = None
+    names: dict[int, str] = field(default_factory=dict)
+    states: dict[int, CityGameState] = field(default_factory=dict)
+    levels: dict[int, str] = field(default_factory=dict)
+    default_level: str = "normal"
+    owns: Callable[[int], bool] | None = None
+    logger: logging.Logger = logging.getLogger("city_engine")
+    _pending: dict[int, list[int]] = field(default_factory=dict)
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    _task: asyncio.Task | None = None
+
+    async def load(self) -> None:
+        """
+        Построение индекса городов и графа переходов между буквами.
+        """
+        self.index = CityIndex.build(await self.words_game.get_city_names())
+        self.names = dict(zip(self.index.ids, self.index.names))
+        self.graph = LetterGraph.build(self.names.items())
+        self.logger.info(f"city index: {len(self.index)} cities")
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def set_level(self, chat_id: int, level: str) -> bool:
+        """
+        Выбор сложности бота для чата.
+
+        :param chat_id: id чата
+        :param level: easy, normal или hard
+        :return: False, если сложность неизвестна
+        """
+        if level not in LEVELS:
+            return False
+        self.levels[chat_id] = level
+        return True
+
+    def new_game(self, game_id: int, chat_id: int) -> CityGameState:
+        """
+        Регистрация только что созданной игры.
+
+        :param game_id: id игровой сессии
+        :param chat_id: id чата
+        :return: состояние игры
+        """
+        state = CityGameState(game_id=game_id, chat_id=chat_id)
+        self.states[chat_id] = state
+        return state
+
+    async def get_state(self, chat_id: int) -> CityGameState | None:
+        """
+        Состояние активной игры в города. Из базы читается только при первом обращении.
+
+        :param chat_id: id чата
+        :return: состояние игры или None, в том числе для чата другого процесса
+        """
+        if self.owns is not None and not self.owns(chat_id):
+            return None
+        if (state := self.states.get(chat_id)) is not None:
+            return state
+        game = await self.words_game.get_session_by_id(chat_id=chat_id)
+        if game is None:
+            return None
+        if self.graph is None:
+            await self.load()
+        used = await self.words_game.get_used_cities(game.id)
+        state = CityGameState(
+            game_id=game.id,
+            chat_id=chat_id,
+            next_letter=game.next_start_letter,
+            used=used,
+            usage=self.graph.usage_from(used),
+        )
+        self.states[chat_id] = state
+        return state
+
+    async def find(self, name: str) -> tuple[int, str] | None:
+        """
+        Точный поиск города по названию без учета регистра и буквы ё.
+
+        :param name: название города
+        :return: (id города, название) или None
+        """
+        if self.index is None:
+            await self.load()
+        return self.index.get(name)
+
+    async def pick(self, state: CityGameState, letter: str | None = None) -> tuple[int, str] | None:
+        """
+        Выбор неиспользованного города на букву с учетом сложности.
+
+        :param state: состояние игры
+        :param letter: первая буква, если не указана - случайная
+        :return: (id города, название) или None, если городов на букву не осталось
+        """
+        if self.graph is None:
+            await self.load()
+        if not letter and not (letter := self.graph.random_letter(state.usage)):
+            return None
+        level = self.levels.get(state.chat_id, self.default_level)
+        if not (last := self.graph.choose_exit(state.usage, letter, level)):
+            return None
+        if (city_id := self.graph.pick(state.usage, state.used, letter, last)) is None:
+            return None
+        return city_id, self.names[city_id]
+
+    def play(self, state: CityGameState, city_id: int, next_letter: str | None) -> None:
+        """
+        Ход в игре: город отмечается использованным, меняется буква.
+        Запись в базу откладывается до фоновой задачи.
+
+        :param state: состояние игры
+        :param city_id: id города
+        :param next_letter: буква следующего города
+        """
+        state.used.add(city_id)
+        self.graph.use(state.usage, city_id)
+        if next_letter:
+            state.next_letter = next_letter
+        self._pending.setdefault(state.game_id, []).append(city_id)
+        self._wakeup.set()
+
+    async def finish(self, chat_id: int) -> CityGameState | None:
+        """
+        Завершение игры: состояние убирается из памяти, ее ходы сохраняются сразу.
+
+        :param chat_id: id чата
+        :return: состояние завершенной игры или None
+        """
+        state = self.states.pop(chat_id, None)
+        if state is not None:
+            await self._save(state, self._pending.pop(state.game_id, []))
+        return state
+
+    async def flush(self) -> None:
+        """
+        Сохранение всех накопленных ходов.
+        """
+        pending, self._pending = self._pending, {}
+        states = {state.game_id: state for state in self.states.values()}
+        for game_id, city_ids in pending.items():
+            if (state := states.get(game_id)) is not None:
+                await self._save(state, city_ids)
+
+    async def _save(self, state: CityGameState, city_ids: list[int]) -> None:
+        if not city_ids:
+            return
+        try:
+            await self.words_game.save_city_move(
+                game_session_id=state.game_id,
+                next_letter=state.next_letter,
+                used=state.used,
+                city_ids=city_ids,
+            )
+        except Exception as e:
+            self.logger.error(f"save city move failed: game={state.game_id} {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
@@ -0,0 +1,210 @@
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+
+def normalize_name(name: str) -> str:
+    """
+    Приведение названия города к виду для сравнения:
+    нижний регистр, ё -> е, дефисы и повторные пробелы заменяются одним пробелом.
+
+    :param name: название города
+    :return: нормализованное название
+    """
+    return " ".join(name.lower().replace("ё", "е").replace("-", " ").split())
+
+
+def trigrams(name: str) -> list[tuple[str, int]]:
+    """
+    Позиционные триграммы нормализованного названия с отступами по краям.
+
+    :param name: нормализованное название
+    :return: список пар (триграмма, позиция)
+    """
+    padded = f"$${name}$$"
+    return [(padded[i : i + 3], i) for i in range(len(padded) - 2)]
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Расстояние Левенштейна, бит-параллельный алгоритм Майерса (в варианте Хююрё).
+    Каждый столбец матрицы считается несколькими операциями над целыми числами.
+
+    :param a: первая строка
+    :param b: вторая строка
+    :return: расстояние
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if not a:
+        return len(b)
+    peq: dict[str, int] = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def default_max_distance(name: str) -> int:
+    """
+    Допустимое число опечаток в зависимости от длины названия.
+
+    :param name: нормализованное название
+    :return: максимальное расстояние
+    """
+    if len(name) <= 3:
+        return 0
+    if len(name) <= 6:
+        return 1
+    return 2
+
+
+@dataclass
+class CityIndex:
+    """
+    Индекс городов в памяти для точного и нечеткого поиска по названию.
+
+    Точный поиск идет по словарю нормализованных названий.
+    Нечеткий поиск использует инвертированный индекс позиционных триграмм:
+    при k опечатках пропадает не больше 3k триграмм запроса, а уцелевшие сдвигаются
+    не больше чем на k позиций. Поэтому подходящий город встречается хотя бы в r
+    из 3k + r самых редких триграмм запроса; кандидаты считаются по этим спискам
+    и проверяются по длине и расстоянию Левенштейна.
+
+    Методы:
+    build - построение индекса по списку (id, название).
+    get - точный поиск города по названию.
+    suggest - ближайший город в пределах допустимого числа опечаток.
+    """
+
+    ids: array = field(default_factory=lambda: array("I"))
+    names: list[str] = field(default_factory=list)
+    normalized: list[str] = field(default_factory=list)
+    by_name: dict[str, int] = field(default_factory=dict)
+    postings: dict[tuple[str, int], array] = field(
+        default_factory=lambda: defaultdict(lambda: array("I"))
+    )
+    required_hits: int = 3
+
+    @classmethod
+    def build(cls, cities: list[tuple[int, str]]) -> "CityIndex":
+        """
+        Построение индекса.
+
+        :param cities: список пар (id города, название)
+        :return: индекс
+        """
+        index = cls()
+        for city_id, name in sorted(cities):
+            norm = normalize_name(name)
+            if not norm or norm in index.by_name:
+                continue
+            ordinal = len(index.names)
+            index.ids.append(city_id)
+            index.names.append(name)
+            index.normalized.append(norm)
+            index.by_name[norm] = ordinal
+            for key in trigrams(norm):
+                index.postings[key].append(ordinal)
+        index.postings = dict(index.postings)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, name: str) -> tuple[int, str] | None:
+        """
+        Точный поиск города по названию без учета регистра и буквы ё.
+
+        :param name: название города
+        :return: (id города, название) или None
+        """
+        ordinal = self.by_name.get(normalize_name(name))
+        if ordinal is None:
+            return None
+        return self.ids[ordinal], self.names[ordinal]
+
+    def suggest(self, name: str, max_distance: int | None = None) -> tuple[int, str] | None:
+        """
+        Поиск ближайшего города с учетом опечаток.
+        Расстояние увеличивается постепенно: большинство опечаток - одна буква.
+
+        :param name: название города
+        :param max_distance: максимальное число опечаток, по умолчанию зависит от длины
+        :return: (id города, название) или None
+        """
+        norm = normalize_name(name)
+        if not norm:
+            return None
+        if (ordinal := self.by_name.get(norm)) is not None:
+            return self.ids[ordinal], self.names[ordinal]
+        if max_distance is None:
+            max_distance = default_max_distance(norm)
+
+        query_grams = trigrams(norm)
+        for distance in range(1, max_distance + 1):
+            if (best := self._search(norm, query_grams, distance)) is not None:
+                return self.ids[best], self.names[best]
+        return None
+
+    def _search(
+        self, norm: str, query_grams: list[tuple[str, int]], max_distance: int
+    ) -> int | None:
+        """
+        Поиск ближайшего кандидата с расстоянием не больше max_distance.
+
+        :param norm: нормализованное название
+        :param query_grams: позиционные триграммы запроса
+        :param max_distance: максимальное расстояние
+        :return: порядковый номер города в индексе или None
+        """
+        postings = []
+        for gram, position in query_grams:
+            lists = [
+                lst
+                for shift in range(-max_distance, max_distance + 1)
+                if (lst := self.postings.get((gram, position + shift)))
+            ]
+            if lists:
+                postings.append(lists)
+        postings.sort(key=lambda lists: sum(map(len, lists)))
+
+        allowed_missing = 3 * max_distance - (len(query_grams) - len(postings))
+        if allowed_missing < 0:
+            return None
+        required = min(self.required_hits, len(postings) - allowed_missing)
+        if required < 1:
+            return None
+
+        hits: Counter = Counter()
+        for lists in postings[: allowed_missing + required]:
+            hits.update(lists[0] if len(lists) == 1 else set().union(*lists))
+        candidates = [ordinal for ordinal, count in hits.items() if count >= required]
+
+        best, limit = None, max_distance
+        for ordinal in candidates:
+            candidate = self.normalized[ordinal]
+            if abs(len(candidate) - len(norm)) > limit:
+                continue
+            distance = levenshtein(norm, candidate)
+            if distance > limit:
+                continue
+            if best is None or distance < limit or ordinal < best:
+                best, limit = ordinal, distance
+        return best
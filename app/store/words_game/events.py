@@ -0,0 +1,265 @@
+"""
+Журнал ходов игр (game_events): worker добавляет события в буфер, фоновая задача
+пишет их пачками одним запросом. По журналу восстанавливается ход любой игры.
+
+Разбор игры по журналу:
+    python -m app.store.words_game.events <id игры>
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from app.store.metrics import Counter
+
+if TYPE_CHECKING:
+    from app.store.words_game.store import GameStore
+
+GAME_EVENTS = Counter("game_events_total", "Game events appended to the move log", ("kind",))
+GAME_EVENTS_DROPPED = Counter("game_events_dropped_total", "Game events lost after failed writes")
+
+# типы событий и их data
+GAME_STARTED = "game_started"  # game_type, life
+PLAYER_JOINED = "player_joined"  # life
+NEXT_PLAYER = "next_player"  # letter
+CITY = "city"  # city_id, name, next_letter; user_id None - ход бота
+WORD = "word"  # word, next_letter
+WORD_REJECTED = "word_rejected"  # word, reason: letter, repeat, unknown
+LIFE_LOST = "life_lost"  # reason: turn, word, slow
+POLL = "poll"  # word, yes, no, accepted
+GAME_FINISHED = "game_finished"  # winner: True, если игрок победил бота
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(slots=True)
+class GameEventRecord:
+    """
+    Событие журнала, поля как у GameEvent.
+
+    :param game_id: id игры
+    :param kind: тип события
+    :param user_id: игрок, None - бот или вся игра
+    :param data: параметры события
+    :param created_at: время события
+    """
+
+    game_id: int
+    kind: str
+    user_id: int | None = None
+    data: dict = field(default_factory=dict)
+    created_at: datetime = field(default_factory=_now)
+
+
+@dataclass(slots=True)
+class PlayerReplay:
+    """
+    Игрок в восстановленной игре.
+
+    :param user_id: id игрока
+    :param life: оставшиеся жизни, None - игра без жизней
+    :param points: засчитанные слова или города
+    """
+
+    user_id: int
+    life: int | None = None
+    points: int = 0
+
+
+@dataclass
+class GameReplay:
+    """
+    Состояние игры, свернутое из журнала событий по порядку.
+
+    :param game_id: id игры
+    :param game_type: тип игры
+    :param life: жизни игрока в начале игры
+    :param next_letter: буква следующего хода
+    :param next_user_id: игрок, который должен ответить
+    :param words: засчитанные слова по порядку
+    :param cities: id городов по порядку, включая ходы бота
+    :param players: игроки по id
+    :param finished: игра завершена
+    :param events: количество событий
+    """
+
+    game_id: int
+    game_type: str | None = None
+    life: int | None = None
+    next_letter: str | None = None
+    next_user_id: int | None = None
+    words: list[str] = field(default_factory=list)
+    cities: list[int] = field(default_factory=list)
+    players: dict[int, PlayerReplay] = field(default_factory=dict)
+    finished: bool = False
+    events: int = 0
+
+    @classmethod
+    def fold(cls, game_id: int, events: list[GameEventRecord]) -> "GameReplay":
+        replay = cls(game_id=game_id)
+        for event in events:
+            replay.apply(event)
+        return replay
+
+    def player(self, user_id: int) -> PlayerReplay:
+        if (player := self.players.get(user_id)) is None:
+            player = self.players[user_id] = PlayerReplay(user_id=user_id, life=self.life)
+        return player
+
+    def apply(self, event: GameEventRecord) -> None:
+        """
+        Применение следующего события к состоянию.
+
+        :param event: событие журнала
+        """
+        self.events += 1
+        data = event.data
+        match event.kind:
+            case "game_started":
+                self.game_type = data.get("game_type")
+                self.life = data.get("life")
+            case "player_joined":
+                self.player(event.user_id).life = data.get("life", self.life)
+            case "next_player":
+                self.next_user_id = event.user_id
+                self.next_letter = data.get("letter") or self.next_letter
+            case "city":
+                self.cities.append(data["city_id"])
+                self.next_letter = data.get("next_letter") or self.next_letter
+                if event.user_id is not None:
+                    self.player(event.user_id).points += 1
+            case "word":
+                self.words.append(data["word"])
+                self.next_letter = data.get("next_letter") or self.next_letter
+                self.player(event.user_id).points += 1
+            case "life_lost":
+                player = self.player(event.user_id)
+                if player.life is not None:
+                    player.life -= 1
+            case "game_finished":
+                self.finished = True
+
+
+@dataclass
+class GameEventLog:
+    """
+    Буфер событий журнала ходов с записью пачками.
+
+    append только добавляет событие в список и не ждет базу. Фоновая задача пишет буфер
+    одним executemany, как только в нем batch_size событий или раз в interval секунд.
+    Если запись не удалась, пачка возвращается в начало буфера, но в буфере держится
+    не больше max_buffer событий: журнал нужен для разбора игр и не должен
+    расти в памяти, пока база недоступна.
+
+    :param words_game: хранилище игр
+    :param batch_size: событий в пачке, при котором запись начинается сразу
+    :param interval: наибольшая задержка записи события, с
+    :param max_buffer: событий в буфере, более старые теряются
+    """
+
+    words_game: "GameStore"
+    batch_size: int = 500
+    interval: float = 1.0
+    max_buffer: int = 50_000
+    logger: logging.Logger = logging.getLogger("game_events")
+    _buffer: list[GameEventRecord] = field(default_factory=list)
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    _task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def append(self, game_id: int, kind: str, user_id: int | None = None, **data) -> None:
+        """
+        Добавление события в буфер.
+
+        :param game_id: id игры
+        :param kind: тип события
+        :param user_id: игрок, None - бот или вся игра
+        :param data: параметры события
+        """
+        self._buffer.append(GameEventRecord(game_id=game_id, kind=kind, user_id=user_id, data=data))
+        GAME_EVENTS.labels(kind).inc()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """
+        Запись всех накопленных событий.
+        """
+        while self._buffer:
+            batch, self._buffer = self._buffer[: self.batch_size], self._buffer[self.batch_size :]
+            try:
+                await self.words_game.add_game_events(batch)
+            except Exception as e:
+                self.logger.error(f"save game events failed: {len(batch)} events {e}")
+                self._buffer[:0] = batch
+                if (dropped := len(self._buffer) - self.max_buffer) > 0:
+                    del self._buffer[:dropped]
+                    GAME_EVENTS_DROPPED.inc(dropped)
+                return
+
+    async def replay(self, game_id: int) -> GameReplay:
+        """
+        Состояние игры по журналу, включая еще не записанные события.
+
+        :param game_id: id игры
+        :return: свернутое состояние
+        """
+        await self.flush()
+        return GameReplay.fold(game_id, await self.words_game.get_game_events(game_id))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+async def run(args) -> None:
+    # конфигурация читает обязательные переменные окружения, поэтому только при запуске из консоли
+    from app.store.database.database import Database
+    from app.store.words_game.accessor import WGAccessor
+    from app.web.config import config
+
+    database = Database(cfg=config)
+    await database.connect()
+    try:
+        events = await WGAccessor(database=database).get_game_events(args.game_id)
+    finally:
+        await database.disconnect()
+    for event in events:
+        user = event.user_id if event.user_id is not None else "-"
+        print(f"{event.created_at:%Y-%m-%d %H:%M:%S} {event.kind:<14} {user:>12} {event.data}")
+    replay = GameReplay.fold(args.game_id, events)
+    print(f"words: {' '.join(replay.words)}")
+    print(f"next: {replay.next_user_id} {replay.next_letter} finished: {replay.finished}")
+    for player in replay.players.values():
+        print(f"player {player.user_id}: points={player.points} life={player.life}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("game_id", type=int)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
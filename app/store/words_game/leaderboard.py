@@ -0,0 +1,213 @@
+import logging
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.store.words_game.store import GameStore
+
+# статистика по всем чатам хранится под chat_id = 0, как общие вердикты слов
+GLOBAL_CHAT = 0
+
+
+@dataclass(slots=True)
+class PlayerResult:
+    """
+    Итог игры для одного игрока.
+
+    :param user_id: id игрока
+    :param username: ник игрока
+    :param words: засчитанные слова или города
+    :param won: победа в игре
+    :param response_time: суммарное время ответов, секунды
+    :param answers: количество ответов с известным временем
+    """
+
+    user_id: int
+    username: str | None = None
+    words: int = 0
+    won: bool = False
+    response_time: float = 0.0
+    answers: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class LeaderEntry:
+    """
+    Строка рейтинга.
+
+    :param user_id: id игрока
+    :param username: ник игрока
+    :param words: засчитанные слова и города за все игры
+    :param wins: победы
+    :param games: сыгранные игры
+    """
+
+    user_id: int
+    username: str | None
+    words: int = 0
+    wins: int = 0
+    games: int = 0
+
+    @property
+    def key(self) -> tuple[int, int, int]:
+        # порядок как в индексе ix_player_stats_rank: слова, победы, id игрока по убыванию
+        return -self.words, -self.wins, -self.user_id
+
+
+@dataclass
+class Leaderboard:
+    """
+    Рейтинг одного чата: ключи игроков в отсортированном списке.
+
+    Место игрока и поиск позиции для обновления - бинарный поиск, O(log n);
+    вставка и удаление сдвигают хвост списка одним memmove. top(n) - срез первых n.
+    """
+
+    keys: list[tuple[int, int, int]] = field(default_factory=list)
+    entries: dict[int, LeaderEntry] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, entries: list[LeaderEntry]) -> "Leaderboard":
+        board = cls(entries={entry.user_id: entry for entry in entries})
+        board.keys = sorted(entry.key for entry in board.entries.values())
+        return board
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, result: PlayerResult) -> LeaderEntry:
+        """
+        Добавление итога игры к строке игрока.
+
+        :param result: итог игры
+        :return: новая строка игрока
+        """
+        old = self.entries.get(result.user_id)
+        if old is None:
+            old = LeaderEntry(user_id=result.user_id, username=result.username)
+        else:
+            del self.keys[bisect_left(self.keys, old.key)]
+        entry = LeaderEntry(
+            user_id=result.user_id,
+            username=result.username or old.username,
+            words=old.words + result.words,
+            wins=old.wins + result.won,
+            games=old.games + 1,
+        )
+        insort(self.keys, entry.key)
+        self.entries[entry.user_id] = entry
+        return entry
+
+    def top(self, limit: int = 10) -> list[LeaderEntry]:
+        return [self.entries[-key[2]] for key in self.keys[:limit]]
+
+    def rank(self, user_id: int) -> int | None:
+        """
+        :param user_id: id игрока
+        :return: место игрока с 1 или None, если игрок не играл
+        """
+        if (entry := self.entries.get(user_id)) is None:
+            return None
+        return bisect_left(self.keys, entry.key) + 1
+
+
+def mark_winner(results: list[PlayerResult]) -> None:
+    """
+    Победитель игры в слова - единственный игрок с наибольшим числом слов.
+    При равенстве или без слов победителя нет.
+
+    :param results: итоги игроков
+    """
+    if not results:
+        return
+    best = max(result.words for result in results)
+    leaders = [result for result in results if result.words == best]
+    if best > 0 and len(leaders) == 1:
+        leaders[0].won = True
+
+
+@dataclass
+class PlayerStatsEngine:
+    """
+    Статистика игроков: время ответов текущих игр и рейтинги чатов в памяти воркера.
+
+    При завершении игры итоги одним вызовом пишутся в хранилище (строки чата
+    и общие под GLOBAL_CHAT), а загруженные рейтинги обновляются на месте. Рейтинг
+    чата загружается из хранилища при первом запросе и перечитывается через ttl
+    секунд: так видны игры, завершенные другими процессами worker.
+
+    Время ответа - от вопроса бота игроку до его ответа; если ответ обработал
+    другой процесс worker, он не учитывается.
+
+    Методы:
+    prompt - бот задал вопрос в игре.
+    answered - ответ игрока, учет времени.
+    finish - сохранение итогов игры и обновление рейтингов.
+    board - рейтинг чата.
+    """
+
+    words_game: "GameStore"
+    ttl: float = 60
+    boards: dict[int, Leaderboard] = field(default_factory=dict)
+    loaded_at: dict[int, float] = field(default_factory=dict)
+    prompts: dict[int, float] = field(default_factory=dict)
+    timings: dict[int, dict[int, list[float]]] = field(default_factory=dict)
+    logger: logging.Logger = logging.getLogger("stats")
+
+    def prompt(self, game_id: int) -> None:
+        self.prompts[game_id] = time.monotonic()
+
+    def answered(self, game_id: int, user_id: int) -> None:
+        """
+        Учет времени ответа: считается первый ответ после вопроса.
+
+        :param game_id: id игры
+        :param user_id: id игрока
+        """
+        if (started := self.prompts.pop(game_id, None)) is None:
+            return
+        timing = self.timings.setdefault(game_id, {}).setdefault(user_id, [0.0, 0])
+        timing[0] += time.monotonic() - started
+        timing[1] += 1
+
+    async def finish(self, chat_id: int, game_id: int, results: list[PlayerResult]) -> None:
+        """
+        Сохранение итогов игры. Ошибка записи статистики не мешает завершению игры.
+
+        :param chat_id: id чата
+        :param game_id: id игры
+        :param results: итоги игроков
+        """
+        self.prompts.pop(game_id, None)
+        timings = self.timings.pop(game_id, {})
+        for result in results:
+            if (timing := timings.get(result.user_id)) is not None:
+                result.response_time += timing[0]
+                result.answers += int(timing[1])
+        if not results:
+            return
+        try:
+            await self.words_game.save_player_stats(chat_id=chat_id, results=results)
+        except Exception as e:
+            self.logger.error(f"save player stats failed: game={game_id} {e}")
+            return
+        for scope in {chat_id, GLOBAL_CHAT}:
+            if (board := self.boards.get(scope)) is not None:
+                for result in results:
+                    board.add(result)
+
+    async def board(self, chat_id: int) -> Leaderboard:
+        """
+        Рейтинг чата, GLOBAL_CHAT - общий рейтинг.
+
+        :param chat_id: id чата
+        :return: рейтинг
+        """
+        now = time.monotonic()
+        if chat_id not in self.boards or now - self.loaded_at[chat_id] > self.ttl:
+            entries = await self.words_game.get_leaderboard(chat_id=chat_id)
+            self.boards[chat_id] = Leaderboard.build(entries)
+            self.loaded_at[chat_id] = now
+        return self.boards[chat_id]
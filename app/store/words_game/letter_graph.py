@@ -0,0 +1,165 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from random import choice, choices, randrange
+from typing import Iterable
+
+from app.store.words_game.bitmap import CityBitmap
+
+LETTERS = "АБВГДЕЖЗИКЛМНОПРСТУФХЦЧШЩЭЮЯ"
+LEVELS = ("easy", "normal", "hard")
+
+
+def exit_letter(name: str) -> str | None:
+    """
+    Буква, на которую должен начинаться следующий город.
+    Буквы ЬЫЪЙЁ и символы не из алфавита пропускаются.
+
+    :param name: название города
+    :return: заглавная буква или None
+    """
+    for char in reversed(name):
+        if (letter := char.upper()) in LETTERS:
+            return letter
+    return None
+
+
+class LetterUsage:
+    """
+    Счетчики использованных в игре городов по буквам.
+    Обновляются на каждом ходе, поэтому остаток городов на букву считается без запросов.
+    """
+
+    __slots__ = ("pairs", "starts")
+
+    def __init__(self):
+        self.pairs: Counter = Counter()
+        self.starts: Counter = Counter()
+
+
+@dataclass
+class LetterGraph:
+    """
+    Граф переходов между буквами в игре в города.
+
+    Ребро (первая буква, буква выхода) хранит число городов и их id.
+    Вместе со счетчиками LetterUsage игры граф дает остаток городов на любую букву
+    и на любую пару букв за O(1).
+
+    Методы:
+    build - построение графа по списку (id, название).
+    use - учет использованного города в счетчиках игры.
+    usage_from - счетчики игры по ее битовой карте.
+    left - число неиспользованных городов на букву.
+    random_letter - случайная буква, на которую остались города.
+    choose_exit - выбор буквы выхода для хода бота в зависимости от сложности.
+    pick - выбор города бота.
+    """
+
+    pairs: Counter = field(default_factory=Counter)
+    starts: Counter = field(default_factory=Counter)
+    edges: dict[str, list[str]] = field(default_factory=dict)
+    buckets: dict[tuple[str, str], list[int]] = field(default_factory=dict)
+    city_letters: dict[int, tuple[str, str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, cities: Iterable[tuple[int, str]]) -> "LetterGraph":
+        """
+        Построение графа. Города без буквы выхода в игре не участвуют.
+
+        :param cities: пары (id города, название)
+        :return: граф
+        """
+        graph = cls()
+        for city_id, name in cities:
+            first, last = name[:1].upper(), exit_letter(name)
+            if first not in LETTERS or last is None:
+                continue
+            graph.pairs[first, last] += 1
+            graph.starts[first] += 1
+            graph.buckets.setdefault((first, last), []).append(city_id)
+            graph.city_letters[city_id] = first, last
+        for first, last in graph.buckets:
+            graph.edges.setdefault(first, []).append(last)
+        return graph
+
+    def use(self, usage: LetterUsage, city_id: int) -> None:
+        """
+        Учет использованного города.
+
+        :param usage: счетчики игры
+        :param city_id: id города
+        """
+        if (letters := self.city_letters.get(city_id)) is not None:
+            usage.pairs[letters] += 1
+            usage.starts[letters[0]] += 1
+
+    def usage_from(self, used: CityBitmap) -> LetterUsage:
+        """
+        Счетчики игры по битовой карте использованных городов.
+
+        :param used: битовая карта
+        :return: счетчики
+        """
+        usage = LetterUsage()
+        for city_id in used:
+            self.use(usage, city_id)
+        return usage
+
+    def left(self, usage: LetterUsage, letter: str) -> int:
+        return self.starts[letter] - usage.starts[letter]
+
+    def random_letter(self, usage: LetterUsage) -> str | None:
+        letters = [letter for letter in self.edges if self.left(usage, letter)]
+        return choice(letters) if letters else None
+
+    def choose_exit(self, usage: LetterUsage, letter: str, level: str = "normal") -> str | None:
+        """
+        Выбор буквы выхода для хода бота.
+
+        easy - буква, на которую у игрока останется больше всего городов.
+        normal - случайный город, то есть буква с весом по числу оставшихся городов.
+        hard - буква, на которую у игрока останется меньше всего городов.
+
+        :param usage: счетчики игры
+        :param letter: первая буква города бота
+        :param level: сложность
+        :return: буква выхода или None, если городов на букву не осталось
+        """
+        exits, weights = [], []
+        for last in self.edges.get(letter, ()):
+            if remaining := self.pairs[letter, last] - usage.pairs[letter, last]:
+                exits.append(last)
+                weights.append(remaining)
+        if not exits:
+            return None
+        if level == "normal":
+            return choices(exits, weights)[0]
+
+        sign = 1 if level == "hard" else -1
+        best, best_score = [], None
+        for last in exits:
+            score = sign * (self.left(usage, last) - (last == letter))
+            if best_score is None or score < best_score:
+                best, best_score = [last], score
+            elif score == best_score:
+                best.append(last)
+        return choice(best)
+
+    def pick(self, usage: LetterUsage, used: CityBitmap, letter: str, last: str) -> int | None:
+        """
+        Случайный неиспользованный город на пару букв.
+
+        :param usage: счетчики игры
+        :param used: битовая карта использованных городов
+        :param letter: первая буква
+        :param last: буква выхода
+        :return: id города или None
+        """
+        if self.pairs[letter, last] - usage.pairs[letter, last] <= 0:
+            return None
+        bucket = self.buckets[letter, last]
+        start = randrange(len(bucket))
+        for i in range(len(bucket)):
+            if (city_id := bucket[(start + i) % len(bucket)]) not in used:
+                return city_id
+        return None
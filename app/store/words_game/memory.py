@@ -0,0 +1,481 @@
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from pathlib import Path
+from random import choice
+
+from app.store.words_game.bitmap import CityBitmap
+from app.store.words_game.events import GameEventRecord
+from app.store.words_game.leaderboard import GLOBAL_CHAT, LeaderEntry, PlayerResult
+
+CITY_SQL = Path(__file__).resolve().parent.parent / "database" / "city.sql"
+LETTERS = "АБВГДЕЖЗИКЛМНОПРСТУФХЦЧШЩЭЮЯ"
+
+
+def read_city_sql(path: Path = CITY_SQL) -> list[tuple[int, str]]:
+    """
+    Города из city.sql с id в порядке вставки, как после загрузки файла в пустую таблицу.
+
+    :param path: путь к файлу
+    :return: список пар (id города, название)
+    """
+    names = re.findall(r"values \('(.*)'\);", path.read_text(encoding="utf-8"))
+    return [(city_id, name) for city_id, name in enumerate(names, start=1) if name]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(slots=True)
+class UserRecord:
+    id: int
+    username: str
+    total_point: int = 0
+    created_at: datetime = field(default_factory=_now)
+
+
+@dataclass(slots=True)
+class GameRecord:
+    """
+    Игровая сессия, поля как у GameSession без связей.
+    Битовая карта использованных городов хранится в MemoryGameStore.used_cities.
+    """
+
+    id: int
+    game_type: str
+    chat_id: int
+    creator_id: int | None = None
+    words: str | None = None
+    next_user_id: int | None = None
+    winner_id: int | None = None
+    is_active: bool = False
+    next_start_letter: str | None = None
+    current_poll_id: int | None = None
+    response_time: int = 15
+    anonymous_poll: bool = True
+    poll_time: int = 15
+    life: int = 3
+    created_at: datetime = field(default_factory=_now)
+
+
+@dataclass(slots=True)
+class PlayerRecord:
+    """
+    Игрок в игре, поля как у UserGameSession.
+    """
+
+    id: int
+    game_sessions_id: int
+    player_id: int
+    player: UserRecord | None = None
+    life: int = 3
+    round_: int = 0
+    point: int = 0
+    poll_answer: bool | None = None
+
+
+@dataclass(slots=True)
+class CityRecord:
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class WordRecord:
+    id: int
+    word: str
+
+
+@dataclass(slots=True)
+class VerdictRecord:
+    word: str
+    chat_id: int
+    yes: int = 0
+    no: int = 0
+    expires_at: datetime | None = None
+
+    @property
+    def accepted(self) -> bool:
+        return self.yes > self.no
+
+    @property
+    def confidence(self) -> float:
+        return max(self.yes, self.no) / (self.yes + self.no)
+
+
+@dataclass(slots=True)
+class StatsRecord:
+    """
+    Статистика игрока, поля как у PlayerStats.
+    """
+
+    chat_id: int
+    user_id: int
+    games: int = 0
+    wins: int = 0
+    words: int = 0
+    response_time: float = 0.0
+    answers: int = 0
+
+
+@dataclass(slots=True)
+class SettingsRecord:
+    id: int = 1
+    response_time: int = 15
+    anonymous_poll: bool = True
+    poll_time: int = 15
+    life: int = 3
+    version: int = 1
+
+
+@dataclass
+class MemoryGameStore:
+    """
+    Хранилище игр в памяти процесса с тем же набором методов, что и WGAccessor (GameStore).
+    Нужно для тестов worker без базы, бенчмарков и демо-режима GAME_STORE=memory:
+    после перезапуска процесса игры теряются.
+
+    Записи - dataclass со __slots__, выборки, которые worker делает на каждом сообщении,
+    идут по словарям-индексам: игры по чату и по опросу, игроки по игре, города по имени
+    и первой букве, слова и вердикты по слову.
+
+    Семантика повторяет запросы WGAccessor, включая особенности: get_session_by_id
+    по user_id ищет игру с chat_id = user_id, update_game_session всегда перезаписывает
+    current_poll_id.
+    """
+
+    cities: list[tuple[int, str]] = field(default_factory=list)
+    keep_city_history: bool = False
+    share_verdicts: bool = False
+    verdict_ttl: timedelta = timedelta(days=30)
+    verdict_min_confidence: float = 0.6
+    settings: SettingsRecord = field(default_factory=SettingsRecord)
+    users: dict[int, UserRecord] = field(default_factory=dict)
+    games: dict[int, GameRecord] = field(default_factory=dict)
+    games_by_chat: dict[int, list[GameRecord]] = field(default_factory=lambda: defaultdict(list))
+    games_by_poll: dict[int, GameRecord] = field(default_factory=dict)
+    players: dict[int, dict[int, PlayerRecord]] = field(default_factory=lambda: defaultdict(dict))
+    used_cities: dict[int, CityBitmap] = field(default_factory=dict)
+    city_history: dict[int, list[int]] = field(default_factory=lambda: defaultdict(list))
+    words: dict[str, WordRecord] = field(default_factory=dict)
+    words_in_game: dict[int, list[str]] = field(default_factory=lambda: defaultdict(list))
+    verdicts: dict[tuple[str, int], VerdictRecord] = field(default_factory=dict)
+    stats: dict[int, dict[int, StatsRecord]] = field(default_factory=lambda: defaultdict(dict))
+    events: dict[int, list[GameEventRecord]] = field(default_factory=lambda: defaultdict(list))
+    _ids: count = field(default_factory=lambda: count(1))
+
+    def __post_init__(self):
+        self.city_by_id = {city_id: CityRecord(city_id, name) for city_id, name in self.cities}
+        self.city_by_name = {city.name: city for city in self.city_by_id.values()}
+        self.cities_by_letter: dict[str, list[CityRecord]] = defaultdict(list)
+        for city in self.city_by_id.values():
+            self.cities_by_letter[city.name[:1]].append(city)
+
+    @classmethod
+    def from_city_sql(cls, path: Path = CITY_SQL, **kwargs) -> "MemoryGameStore":
+        """
+        Хранилище с городами из city.sql.
+
+        :param path: путь к файлу
+        """
+        return cls(cities=read_city_sql(path), **kwargs)
+
+    async def get_session_by_id(
+        self, user_id: int | None = None, chat_id: int | None = None, is_active: bool = True
+    ) -> GameRecord | None:
+        chat_id = user_id or chat_id
+        if not chat_id:
+            return None
+        for game in reversed(self.games_by_chat.get(chat_id, ())):
+            if game.is_active == is_active:
+                return game
+        return None
+
+    async def create_game_session(
+        self,
+        user_id: int,
+        chat_id: int,
+        chat_type: str,
+        response_time: int = 15,
+        anonymous_poll: bool = True,
+        poll_time: int = 15,
+        life: int = 3,
+    ) -> GameRecord:
+        game = GameRecord(
+            id=next(self._ids),
+            game_type=chat_type,
+            chat_id=chat_id,
+            creator_id=user_id,
+            is_active=True,
+            response_time=response_time,
+            anonymous_poll=anonymous_poll,
+            poll_time=poll_time,
+            life=life,
+        )
+        self.games[game.id] = game
+        self.games_by_chat[chat_id].append(game)
+        return game
+
+    async def update_game_session(
+        self,
+        game_id: int,
+        status: bool = True,
+        next_letter: str | None = None,
+        words: list[str] | None = None,
+        poll_id: int | None = None,
+        next_user_id: int | None = None,
+    ) -> GameRecord | None:
+        if (game := self.games.get(game_id)) is None:
+            return None
+        game.is_active = status
+        game.next_start_letter = next_letter or game.next_start_letter
+        game.words = words or game.words
+        game.next_user_id = next_user_id or game.next_user_id
+        if game.current_poll_id is not None:
+            self.games_by_poll.pop(game.current_poll_id, None)
+        game.current_poll_id = poll_id
+        if poll_id is not None:
+            self.games_by_poll[poll_id] = game
+        return game
+
+    async def delete_game_session(self, chat_id: int) -> None:
+        for game in self.games_by_chat.pop(chat_id, ()):
+            del self.games[game.id]
+            self.games_by_poll.pop(game.current_poll_id, None)
+            for index in (self.players, self.used_cities, self.city_history, self.words_in_game):
+                index.pop(game.id, None)
+
+    async def change_next_user_to_game_session(
+        self, game_id: int, user_id: int, next_letter: str | None = None
+    ) -> GameRecord | None:
+        game = self.games.get(game_id)
+        if game is None or not game.is_active:
+            return None
+        game.next_user_id = user_id
+        if next_letter:
+            game.next_start_letter = next_letter
+        return game
+
+    async def create_user(self, user_id: int, username: str) -> UserRecord:
+        if (user := self.users.get(user_id)) is None:
+            user = self.users[user_id] = UserRecord(id=user_id, username=username)
+        return user
+
+    async def select_user_by_id(self, user_id: int) -> UserRecord | None:
+        return self.users.get(user_id)
+
+    async def update_user(self, user_id: int, point) -> UserRecord | None:
+        if (user := self.users.get(user_id)) is not None:
+            user.total_point += point
+        return user
+
+    async def get_city_by_first_letter(
+        self, game_session_id: int, letter: str | None = None, city_count: int | None = None
+    ) -> CityRecord | None:
+        letter = letter or choice(LETTERS)
+        used = await self.get_used_cities(game_session_id)
+        candidates = [
+            city
+            for city in self.cities_by_letter.get(letter[:1], ())
+            if city.name.startswith(letter) and city.id not in used
+        ]
+        return choice(candidates) if candidates else None
+
+    async def get_city_by_name(self, name: str) -> CityRecord | None:
+        return self.city_by_name.get(name)
+
+    async def get_city_names(self) -> list[tuple[int, str]]:
+        return [(city.id, city.name) for city in self.city_by_id.values()]
+
+    async def get_used_cities(self, game_session_id: int) -> CityBitmap:
+        if (bitmap := self.used_cities.get(game_session_id)) is None:
+            bitmap = self.used_cities[game_session_id] = CityBitmap()
+        return bitmap
+
+    async def check_city_in_used(self, city_id: int, game_session_id: int) -> bool:
+        return city_id in await self.get_used_cities(game_session_id)
+
+    async def set_city_to_used(self, city_id: int, game_session_id: int) -> None:
+        (await self.get_used_cities(game_session_id)).add(city_id)
+        if self.keep_city_history:
+            self.city_history[game_session_id].append(city_id)
+
+    async def save_city_move(
+        self, game_session_id: int, next_letter: str | None, used: CityBitmap, city_ids: list[int]
+    ) -> None:
+        if (game := self.games.get(game_session_id)) is None:
+            return
+        game.next_start_letter = next_letter or game.next_start_letter
+        self.used_cities[game_session_id] = used
+        if self.keep_city_history:
+            self.city_history[game_session_id].extend(city_ids)
+
+    async def get_city_list_by_session_id(self, game_session_id: int) -> list[CityRecord]:
+        if self.keep_city_history:
+            city_ids = self.city_history.get(game_session_id, ())
+        else:
+            city_ids = sorted(self.used_cities.get(game_session_id, ()))
+        return [self.city_by_id[city_id] for city_id in city_ids if city_id in self.city_by_id]
+
+    async def add_user_to_team(self, user_id: int, game_id: int, life: int = 3) -> None:
+        team = self.players[game_id]
+        if user_id not in team:
+            team[user_id] = PlayerRecord(
+                id=next(self._ids),
+                game_sessions_id=game_id,
+                player_id=user_id,
+                player=self.users.get(user_id),
+                life=life,
+            )
+
+    async def update_team(
+        self, game_session_id: int, user_id: int, point: int = 0, round_: int = 0
+    ) -> None:
+        if (player := self.players.get(game_session_id, {}).get(user_id)) is not None:
+            player.point += point
+            player.round_ += round_
+
+    async def get_team_by_game_id(
+        self, game_session_id: int, player_id: int | None = None
+    ) -> list[int]:
+        team = [
+            player.player_id
+            for player in self.players.get(game_session_id, {}).values()
+            if player.life > 0
+        ]
+        if len(team) > 1 and player_id is not None and player_id in team:
+            team.remove(player_id)
+        return team
+
+    async def remove_life_from_player(self, game_id: int, player_id: int, round_: int = 0) -> None:
+        if (player := self.players.get(game_id, {}).get(player_id)) is not None:
+            player.life -= 1
+            player.round_ += round_
+
+    async def get_game_session_by_poll_id(self, poll_id: int) -> GameRecord | None:
+        return self.games_by_poll.get(poll_id)
+
+    async def get_list_words_by_game_id(self, game_session_id: int) -> list[str]:
+        return list(self.words_in_game.get(game_session_id, ()))
+
+    async def add_word(self, word: str) -> WordRecord | None:
+        """
+        Добавление слова. Для уже известного слова возвращает None,
+        как WGAccessor.add_word при нарушении уникальности.
+        """
+        word = word.capitalize()
+        if word in self.words:
+            return None
+        record = self.words[word] = WordRecord(id=next(self._ids), word=word)
+        return record
+
+    async def get_word_by_word(self, word: str) -> WordRecord | None:
+        return self.words.get(word.capitalize())
+
+    async def add_used_word(self, game_session_id: int, word: str) -> None:
+        record = await self.add_word(word) or await self.get_word_by_word(word)
+        self.words_in_game[game_session_id].append(record.word)
+
+    async def get_player_list(self, game_session_id: int) -> list:
+        return [
+            (player.player.username if player.player else None, player.point)
+            for player in self.players.get(game_session_id, {}).values()
+        ]
+
+    async def get_game_settings(self) -> SettingsRecord:
+        return self.settings
+
+    async def get_settings_version(self) -> int:
+        return self.settings.version
+
+    async def get_player(self, player_id: int, game_session_id: int) -> PlayerRecord | None:
+        return self.players.get(game_session_id, {}).get(player_id)
+
+    async def set_player_poll_answer(
+        self, game_session_id: int, player_id: int, answer: bool
+    ) -> None:
+        if (player := self.players.get(game_session_id, {}).get(player_id)) is not None:
+            player.poll_answer = answer
+
+    async def check_not_anonim_poll(self, game_session_id: int) -> bool:
+        answers = Counter()
+        for player in self.players.get(game_session_id, {}).values():
+            answers[player.poll_answer] += 1
+            player.poll_answer = None
+        return answers[True] > answers[False]
+
+    async def get_word_verdict(self, word: str, chat_id: int) -> bool | None:
+        word, now = word.capitalize(), datetime.now(timezone.utc)
+        for scope in (chat_id, 0):
+            verdict = self.verdicts.get((word, scope))
+            if (
+                verdict is not None
+                and verdict.expires_at > now
+                and verdict.confidence >= self.verdict_min_confidence
+            ):
+                return verdict.accepted
+        return None
+
+    async def save_word_verdict(self, word: str, chat_id: int, yes: int, no: int) -> None:
+        if yes + no == 0:
+            return
+        word = word.capitalize()
+        expires_at = datetime.now(timezone.utc) + self.verdict_ttl
+        for scope in (chat_id, 0) if self.share_verdicts else (chat_id,):
+            verdict = self.verdicts.setdefault((word, scope), VerdictRecord(word=word, chat_id=scope))
+            verdict.yes += yes
+            verdict.no += no
+            verdict.expires_at = expires_at
+
+    async def update_total_points_to_user(self, game_id) -> None:
+        for player in self.players.get(game_id, {}).values():
+            if player.player is not None:
+                player.player.total_point += player.point
+
+    async def get_game_results(self, game_session_id: int) -> list[PlayerResult]:
+        return [
+            PlayerResult(
+                user_id=player.player_id,
+                username=player.player.username if player.player else None,
+                words=player.point,
+            )
+            for player in self.players.get(game_session_id, {}).values()
+        ]
+
+    async def save_player_stats(self, chat_id: int, results: list[PlayerResult]) -> None:
+        for scope in {chat_id, GLOBAL_CHAT}:
+            for result in results:
+                record = self.stats[scope].setdefault(
+                    result.user_id, StatsRecord(chat_id=scope, user_id=result.user_id)
+                )
+                record.games += 1
+                record.wins += result.won
+                record.words += result.words
+                record.response_time += result.response_time
+                record.answers += result.answers
+
+    async def get_leaderboard(self, chat_id: int) -> list[LeaderEntry]:
+        return [
+            LeaderEntry(
+                user_id=record.user_id,
+                username=user.username if (user := self.users.get(record.user_id)) else None,
+                words=record.words,
+                wins=record.wins,
+                games=record.games,
+            )
+            for record in self.stats.get(chat_id, {}).values()
+        ]
+
+    async def add_game_events(self, events: list[GameEventRecord]) -> None:
+        for event in events:
+            self.events[event.game_id].append(event)
+
+    async def get_game_events(self, game_session_id: int) -> list[GameEventRecord]:
+        return sorted(self.events.get(game_session_id, []), key=lambda event: event.created_at)
+
+    async def flush(self) -> None:
+        # записи выполняются сразу, откладывать нечего
+        return
@@ -0,0 +1,167 @@
+from typing import Protocol
+
+from app.store.words_game.bitmap import CityBitmap
+from app.store.words_game.events import GameEventRecord
+from app.store.words_game.leaderboard import LeaderEntry, PlayerResult
+
+
+class GameStore(Protocol):
+    """
+    Хранилище игр "Города" и "Слова", которым пользуется worker.
+    Реализации: WGAccessor - PostgreSQL или SQLite через Database,
+    MemoryGameStore - словари в памяти процесса для тестов, бенчмарков и демо без базы.
+
+    Методы повторяют WGAccessor, возвращаемые объекты должны иметь те же поля, что и модели
+    app.words_game.models: worker читает из них только колонки, без связей.
+    """
+
+    async def get_session_by_id(
+        self, user_id: int | None = None, chat_id: int | None = None, is_active: bool = True
+    ):
+        ...
+
+    async def create_game_session(
+        self,
+        user_id: int,
+        chat_id: int,
+        chat_type: str,
+        response_time: int = 15,
+        anonymous_poll: bool = True,
+        poll_time: int = 15,
+        life: int = 3,
+    ):
+        ...
+
+    async def update_game_session(
+        self,
+        game_id: int,
+        status: bool = True,
+        next_letter: str | None = None,
+        words: list[str] | None = None,
+        poll_id: int | None = None,
+        next_user_id: int | None = None,
+    ):
+        ...
+
+    async def delete_game_session(self, chat_id: int) -> None:
+        ...
+
+    async def change_next_user_to_game_session(
+        self, game_id: int, user_id: int, next_letter: str | None = None
+    ):
+        ...
+
+    async def create_user(self, user_id: int, username: str):
+        ...
+
+    async def select_user_by_id(self, user_id: int):
+        ...
+
+    async def update_user(self, user_id: int, point):
+        ...
+
+    async def get_city_by_first_letter(
+        self, game_session_id: int, letter: str | None = None, city_count: int | None = None
+    ):
+        ...
+
+    async def get_city_by_name(self, name: str):
+        ...
+
+    async def get_city_names(self) -> list[tuple[int, str]]:
+        ...
+
+    async def get_used_cities(self, game_session_id: int) -> CityBitmap:
+        ...
+
+    async def check_city_in_used(self, city_id: int, game_session_id: int) -> bool:
+        ...
+
+    async def set_city_to_used(self, city_id: int, game_session_id: int) -> None:
+        ...
+
+    async def save_city_move(
+        self, game_session_id: int, next_letter: str | None, used: CityBitmap, city_ids: list[int]
+    ) -> None:
+        ...
+
+    async def get_city_list_by_session_id(self, game_session_id: int) -> list:
+        ...
+
+    async def add_user_to_team(self, user_id: int, game_id: int, life: int = 3) -> None:
+        ...
+
+    async def update_team(
+        self, game_session_id: int, user_id: int, point: int = 0, round_: int = 0
+    ) -> None:
+        ...
+
+    async def get_team_by_game_id(
+        self, game_session_id: int, player_id: int | None = None
+    ) -> list[int]:
+        ...
+
+    async def remove_life_from_player(self, game_id: int, player_id: int, round_: int = 0) -> None:
+        ...
+
+    async def get_game_session_by_poll_id(self, poll_id: int):
+        ...
+
+    async def get_list_words_by_game_id(self, game_session_id: int) -> list[str]:
+        ...
+
+    async def add_word(self, word: str):
+        ...
+
+    async def get_word_by_word(self, word: str):
+        ...
+
+    async def add_used_word(self, game_session_id: int, word: str) -> None:
+        ...
+
+    async def get_player_list(self, game_session_id: int) -> list:
+        ...
+
+    async def get_game_settings(self):
+        ...
+
+    async def get_settings_version(self) -> int:
+        ...
+
+    async def get_player(self, player_id: int, game_session_id: int):
+        ...
+
+    async def set_player_poll_answer(
+        self, game_session_id: int, player_id: int, answer: bool
+    ) -> None:
+        ...
+
+    async def check_not_anonim_poll(self, game_session_id: int) -> bool:
+        ...
+
+    async def get_word_verdict(self, word: str, chat_id: int) -> bool | None:
+        ...
+
+    async def save_word_verdict(self, word: str, chat_id: int, yes: int, no: int) -> None:
+        ...
+
+    async def update_total_points_to_user(self, game_id) -> None:
+        ...
+
+    async def get_game_results(self, game_session_id: int) -> list[PlayerResult]:
+        ...
+
+    async def save_player_stats(self, chat_id: int, results: list[PlayerResult]) -> None:
+        ...
+
+    async def get_leaderboard(self, chat_id: int) -> list[LeaderEntry]:
+        ...
+
+    async def add_game_events(self, events: list[GameEventRecord]) -> None:
+        ...
+
+    async def get_game_events(self, game_session_id: int) -> list[GameEventRecord]:
+        ...
+
+    async def flush(self) -> None:
+        ...
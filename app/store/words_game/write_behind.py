@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, AsyncIterator
+
+from app.store.metrics import Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from app.store.database.database import Database
+
+WRITE_BEHIND_PENDING = Gauge("write_behind_pending", "Deferred game writes waiting for flush")
+WRITE_BEHIND_LAG = Histogram(
+    "write_behind_lag_seconds", "Age of the oldest deferred game write when it is flushed"
+)
+WRITE_BEHIND_FLUSHES = Counter(
+    "write_behind_flushes_total", "Flushes of deferred game writes by result", ("result",)
+)
+WRITE_BEHIND_DROPPED = Counter(
+    "write_behind_dropped_total", "Deferred game writes lost after failed retries"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PointsDelta:
+    """
+    Отложенное изменение очков и раундов игрока в игре.
+
+    :param player_id: id игрока
+    :param point: прибавка очков
+    :param round_: прибавка раундов
+    """
+
+    player_id: int
+    point: int = 0
+    round_: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class UsedWord:
+    """
+    Отложенное добавление слова в слова игры.
+
+    :param word: слово
+    """
+
+    word: str
+
+
+@dataclass(eq=False, slots=True)
+class PendingWrite:
+    """
+    Отложенная запись: запросы одной операции и ее результат для чтения до записи в базу.
+
+    :param queries: запросы в порядке выполнения
+    :param key: id игры, к которой относится запись, None - запись не читается из памяти
+    :param effect: изменение, которое чтение игры добавляет к строкам базы
+    :param added: время добавления, time.monotonic()
+    :param attempts: неудачных попыток записи
+    """
+
+    queries: tuple
+    key: int | None = None
+    effect: PointsDelta | UsedWord | None = None
+    added: float = 0.0
+    attempts: int = 0
+
+
+@dataclass
+class WriteBehind:
+    """
+    Отложенная запись некритичных изменений игры (очки и раунды игроков, слова игры,
+    итоговые очки пользователей): запросы копятся в памяти и выполняются одной
+    транзакцией раз в interval секунд или как только накопится batch_size запросов.
+
+    Запросы выполняются в порядке добавления и не должны зависеть от результата
+    друг друга на стороне Python: это готовые UPDATE и INSERT ... SELECT.
+    Чтение игры не ждет записи: внутри reading() оно добавляет к строкам базы
+    изменения pending(game_id), а запись пачки начинается только между чтениями.
+    Другие процессы видят изменения с задержкой до interval.
+
+    Ошибочная пачка возвращается в начало очереди и повторяется с удвоением задержки
+    до max_delay. Запись, которая не удалась max_attempts раз, и самые старые записи
+    сверх max_pending запросов теряются с ошибкой в логе и учитываются
+    в write_behind_dropped_total: очередь не растет в памяти, пока база недоступна.
+
+    :param database: база данных
+    :param interval: наибольшая задержка записи, с
+    :param batch_size: запросов, при котором запись начинается сразу
+    :param max_pending: наибольшее количество запросов в очереди
+    :param max_attempts: попыток записи, после которых запись теряется
+    :param max_delay: наибольшая задержка повтора ошибочной пачки, с
+    """
+
+    database: "Database"
+    interval: float = 0.2
+    batch_size: int = 100
+    max_pending: int = 50_000
+    max_attempts: int = 10
+    max_delay: float = 5.0
+    logger: logging.Logger = logging.getLogger("write_behind")
+    _pending: list[PendingWrite] = field(default_factory=list)
+    _size: int = 0
+    _failures: int = 0
+    _readers: int = 0
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    _no_readers: asyncio.Event = field(default_factory=asyncio.Event)
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    _task: asyncio.Task | None = None
+
+    def __post_init__(self):
+        self._no_readers.set()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, *queries, key: int | None = None, effect=None) -> None:
+        """
+        Отложенные запросы, выполняются вместе в одной транзакции.
+
+        :param queries: запросы в порядке выполнения
+        :param key: id игры для pending
+        :param effect: изменение, которое видит чтение игры до записи
+        """
+        self._pending.append(
+            PendingWrite(queries=queries, key=key, effect=effect, added=time.monotonic())
+        )
+        self._size += len(queries)
+        WRITE_BEHIND_PENDING.set(self._size)
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+        if self._size >= self.batch_size and not self._failures:
+            self._wakeup.set()
+
+    def pending(self, key: int) -> list:
+        """
+        Изменения игры, которые еще не записаны в базу, в порядке добавления.
+        Вызывается внутри reading(), иначе пачка может записаться между чтением
+        базы и pending, и изменение учтется дважды.
+
+        :param key: id игры
+        """
+        return [write.effect for write in self._pending if write.key == key and write.effect]
+
+    @asynccontextmanager
+    async def reading(self) -> AsyncIterator[None]:
+        """
+        Чтение базы вместе с pending: начатая запись пачки дожидается окончания,
+        новая не начнется до выхода из блока.
+        """
+        async with self._lock:
+            self._readers += 1
+            self._no_readers.clear()
+        try:
+            yield
+        finally:
+            self._readers -= 1
+            if not self._readers:
+                self._no_readers.set()
+
+    async def flush(self) -> None:
+        """
+        Выполнение всех накопленных запросов. Ошибочная пачка возвращается в начало очереди.
+        """
+        async with self._lock:
+            await self._no_readers.wait()
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            WRITE_BEHIND_LAG.observe(time.monotonic() - batch[0].added)
+            queries = [query for write in batch for query in write.queries]
+            try:
+                await self.database.execute_transaction(queries)
+            except Exception as e:
+                WRITE_BEHIND_FLUSHES.labels("error").inc()
+                self._failures += 1
+                self.logger.error(
+                    f"deferred writes failed: {len(queries)} queries, retry {self._failures} {e}"
+                )
+                self._requeue(batch)
+                return
+            self._failures = 0
+            self._size -= len(queries)
+            WRITE_BEHIND_PENDING.set(self._size)
+            WRITE_BEHIND_FLUSHES.labels("ok").inc()
+
+    async def stop(self) -> None:
+        """
+        Остановка фоновой записи с выполнением накопленных запросов.
+        Следующий add снова запускает фоновую запись.
+        """
+        if self._task:
+            # под блокировкой фоновая задача не посреди записи: отмена не потеряет пачку
+            async with self._lock:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+                self._task = None
+        await self.flush()
+
+    def _requeue(self, batch: list[PendingWrite]) -> None:
+        for write in batch:
+            write.attempts += 1
+        kept = [write for write in batch if write.attempts < self.max_attempts]
+        self._pending[:0] = kept
+        dropped = len(batch) - len(kept)
+        self._size -= sum(
+            len(write.queries) for write in batch if write.attempts >= self.max_attempts
+        )
+        # сверх max_pending теряются самые старые записи
+        overflow = 0
+        while self._size > self.max_pending and overflow < len(self._pending):
+            self._size -= len(self._pending[overflow].queries)
+            overflow += 1
+        del self._pending[:overflow]
+        dropped += overflow
+        WRITE_BEHIND_PENDING.set(self._size)
+        if dropped:
+            WRITE_BEHIND_DROPPED.inc(dropped)
+            self.logger.error(f"deferred writes dropped: {dropped} writes")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            # после ошибки повтор с удвоением задержки, чтобы не нагружать недоступную базу
+            delay = self.interval * 2 ** min(self._failures, 16)
+            if self._failures:
+                delay = min(delay, max(self.max_delay, self.interval))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
@@ -1,10 +1,16 @@
 import asyncio
+import time
+
 import aiohttp
+from app.store.metrics import Counter, Histogram
 from app.store.yandex_dict_api.schemas import Word
 from dataclasses import dataclass
 
 from app.web.config import config_env
 
+YANDEX_REQUEST_SECONDS = Histogram("yandex_dict_request_seconds", "Yandex dictionary request time")
+YANDEX_RESULTS = Counter("yandex_dict_results_total", "Yandex dictionary answers", ("result",))
+
 
 @dataclass
 class YandexDictAccessor:
@@ -12,16 +18,22 @@ class YandexDictAccessor:
     url = "https://dictionary.yandex.net/api/v1/dicservice.json/lookup?key="
 
     async def check_word_(self, text: str, lang: str = "ru-ru") -> bool:
-        self.url = self.url + f"{self.token}&lang={lang}&text={text}"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.url) as resp:
-                if resp.status == 200 and (word := (await resp.json()).get("def", None)):
-                    word = Word.Schema().load(word[0])
-
-                    return word.pos == "noun"
-                else:
-                    return False
+        url = self.url + f"{self.token}&lang={lang}&text={text}"
+
+        started, result = time.perf_counter(), "error"
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as resp:
+                    if resp.status == 200 and (word := (await resp.json()).get("def", None)):
+                        word = Word.Schema().load(word[0])
+                        result = "noun" if word.pos == "noun" else "other"
+                        return word.pos == "noun"
+                    else:
+                        result = "unknown" if resp.status == 200 else "error"
+                        return False
+        finally:
+            YANDEX_REQUEST_SECONDS.observe(time.perf_counter() - started)
+            YANDEX_RESULTS.labels(result).inc()
 
 
 async def check_word(text: str, lang: str = "ru-ru") -> bool:
@@ -12,7 +12,8 @@ from aiohttp_session.cookie_storage import EncryptedCookieStorage
 from app.admin.models import Admin
 from app.store import Store, setup_store
 from app.store.database.database import Database
-from app.store.rabbitMQ.rabbitMQ import RabbitMQ
+from app.store.rabbitMQ.broker import Broker
+from app.web.cache import setup_cache
 from app.web.config import Config, setup_config
 from app.web.logger import setup_logging
 from app.web.middlewares import setup_middlewares
@@ -23,7 +24,7 @@ class Application(AiohttpApplication):
     config: Optional[Config] = None
     store: Optional[Store] = None
     database: Optional[Database] = None
-    rabbitMQ: Optional[RabbitMQ] = None
+    rabbitMQ: Optional[Broker] = None
 
 
 class Request(AiohttpRequest):
@@ -63,4 +64,5 @@ def setup_app() -> Application:
     setup_aiohttp_apispec(app, title="TG Words Bot", url="/docs/json", swagger_path="/docs")
     setup_middlewares(app)
     setup_store(app)
+    setup_cache(app)
     return app
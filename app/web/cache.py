@@ -0,0 +1,172 @@
+import functools
+import os
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from aiohttp.helpers import ETAG_ANY
+from aiohttp.web import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.store.metrics import Counter
+
+HTTP_CACHE_REQUESTS = Counter(
+    "http_cache_requests_total", "Cached admin GET requests by result", ("route", "result")
+)
+
+
+@dataclass
+class TableVersions:
+    """
+    Версии таблиц в процессе веб-приложения: счетчик растет при каждом commit записи
+    в таблицу через ORM этого процесса (см. setup_cache). ETag строится из версий
+    без запроса к базе.
+
+    boot отличает запуски процесса: после перезапуска счетчики начинаются заново,
+    и старые ETag не должны совпасть с новыми.
+    """
+
+    boot: str = field(default_factory=lambda: os.urandom(4).hex())
+    versions: dict[str, int] = field(default_factory=dict)
+
+    def bump(self, table: str) -> None:
+        self.versions[table] = self.versions.get(table, 0) + 1
+
+    def etag(self, tables: tuple[str, ...], key: str) -> str:
+        """
+        :param tables: таблицы, из которых собран ответ
+        :param key: маршрут и параметры запроса
+        :return: ETag ответа
+        """
+        versions = ".".join(str(self.versions.get(table, 0)) for table in tables)
+        return f'"{self.boot}-{versions}-{zlib.crc32(key.encode()):08x}"'
+
+
+TABLE_VERSIONS = TableVersions()
+
+
+@dataclass
+class ResponseCache:
+    """
+    Ответы GET в памяти по маршруту и параметрам запроса, вытеснение самых старых.
+
+    :param max_size: число хранимых ответов
+    """
+
+    max_size: int = 1024
+    entries: OrderedDict[str, tuple[str, bytes, str]] = field(default_factory=OrderedDict)
+
+    def get(self, key: str, etag: str) -> tuple[bytes, str] | None:
+        """
+        :param key: маршрут и параметры запроса
+        :param etag: текущий ETag
+        :return: тело и content type ответа или None, если ответа нет или он устарел
+        """
+        if (entry := self.entries.get(key)) is None or entry[0] != etag:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, key: str, etag: str, body: bytes, content_type: str) -> None:
+        self.entries[key] = (etag, body, content_type)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Match содержит etag или *. Для If-None-Match слабый W/ ETag
+    сравнивается как сильный.
+
+    :param request: запрос
+    :param etag: ETag ответа в кавычках
+    """
+    value = etag.strip('"')
+    return any(tag.value in (value, ETAG_ANY) for tag in request.if_none_match or ())
+
+
+def cached_response(*tables: str):
+    """
+    Кэш ответов GET для данных, которые почти не меняются.
+
+    ETag считается из версий таблиц tables и ключа (путь и отсортированные параметры).
+    If-None-Match с тем же ETag - ответ 304 без обращения к базе, иначе совпадающий
+    ответ берется из кэша, и только при промахе вызывается обработчик.
+    Запись в любую из таблиц через ORM процесса меняет ETag.
+
+    :param tables: имена таблиц, из которых собирается ответ
+    """
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(self):
+            request = self.request
+            key = f"{request.path}?{sorted(request.query.items())}"
+            etag = TABLE_VERSIONS.etag(tables, key)
+            route = request.path
+            if etag_matches(request, etag):
+                HTTP_CACHE_REQUESTS.labels(route, "not_modified").inc()
+                return Response(status=304, headers={"ETag": etag})
+            if (cached := RESPONSE_CACHE.get(key, etag)) is not None:
+                HTTP_CACHE_REQUESTS.labels(route, "hit").inc()
+                body, content_type = cached
+                return Response(body=body, content_type=content_type, headers={"ETag": etag})
+            HTTP_CACHE_REQUESTS.labels(route, "miss").inc()
+            response = await handler(self)
+            if response.status == 200:
+                response.headers["ETag"] = etag
+                RESPONSE_CACHE.put(key, etag, response.body, response.content_type)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# имена таблиц, записанных в текущей транзакции сессии, версии растут после commit
+PENDING_TABLES = "cache_pending_tables"
+
+
+def _pending_tables(session) -> set[str]:
+    return session.info.setdefault(PENDING_TABLES, set())
+
+
+def _collect_flushed(session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if (table := getattr(obj, "__tablename__", None)) is not None:
+            _pending_tables(session).add(table)
+
+
+def _collect_executed(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if (table := getattr(orm_execute_state.statement, "table", None)) is not None:
+            _pending_tables(orm_execute_state.session).add(table.name)
+
+
+def _bump_committed(session) -> None:
+    for table in session.info.pop(PENDING_TABLES, ()):
+        TABLE_VERSIONS.bump(table)
+
+
+def _discard_rolled_back(session) -> None:
+    session.info.pop(PENDING_TABLES, None)
+
+
+def setup_cache(app) -> None:
+    """
+    Подписка на запись через ORM: add/изменение объектов и INSERT/UPDATE/DELETE
+    через session.execute увеличивают версию таблицы после commit. До commit
+    параллельный GET читает старые строки и кэширует их под старым ETag,
+    rollback изменений версии не меняет.
+    Записи в обход процесса (psql, другие процессы) кэш не видит.
+    """
+    if not event.contains(Session, "after_flush", _collect_flushed):
+        event.listen(Session, "after_flush", _collect_flushed)
+        event.listen(Session, "do_orm_execute", _collect_executed)
+        event.listen(Session, "after_commit", _bump_committed)
+        event.listen(Session, "after_rollback", _discard_rolled_back)
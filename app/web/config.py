@@ -39,6 +39,7 @@ class BotConfig:
 @dataclass
 class TgConfig:
     tg_token: str
+    api_url: str | None = None
 
 
 @dataclass
@@ -48,6 +49,7 @@ class DatabaseConfig:
     user: str
     password: str
     database: str
+    driver: str = "postgresql+asyncpg"
 
 
 @dataclass
@@ -58,11 +60,50 @@ class RabbitMQ:
     port: str
 
 
+@dataclass
+class BrokerConfig:
+    kind: str = "rabbitmq"
+
+
+@dataclass
+class StoreConfig:
+    kind: str = "database"
+
+
 @dataclass
 class YandexDictConfig:
     token: str
 
 
+@dataclass
+class LexiconConfig:
+    path: str | None = None
+
+
+@dataclass
+class MetricsConfig:
+    port: int | None = None
+
+
+@dataclass
+class ArchiveConfig:
+    after_days: int | None = None
+    batch_size: int = 500
+    interval: float = 600
+
+
+@dataclass
+class WriteBehindConfig:
+    interval: float = 0.2
+    batch_size: int = 100
+
+
+@dataclass
+class WorkerConfig:
+    processes: int = 1
+    restart_delay: float = 1.0
+
+
 @dataclass
 class Config:
     admin: AdminConfig
@@ -85,6 +126,13 @@ class ConfigEnv:
     rabbitmq: RabbitMQ = None
     yandex_dict: YandexDictConfig = None
     tg_token: TgConfig = None
+    lexicon: LexiconConfig = None
+    metrics: MetricsConfig = None
+    broker: BrokerConfig = None
+    store: StoreConfig = None
+    archive: ArchiveConfig = None
+    write_behind: WriteBehindConfig = None
+    worker: WorkerConfig = None
 
 
 config = ConfigEnv(
@@ -92,10 +140,14 @@ config = ConfigEnv(
     session=SessionConfig(key=config_env.get("SESSION_KEY")),
     database=DatabaseConfig(
         host=config_env.get("POSTGRES_DEFAULT_HOST"),
-        port=int(config_env.get("POSTGRES_DEFAULT_PORT")),
+        port=int(config_env.get("POSTGRES_DEFAULT_PORT") or 5432),
         user=config_env.get("POSTGRES_DEFAULT_USER"),
         password=config_env.get("POSTGRES_DEFAULT_PASS"),
-        database=config_env.get("POSTGRES_DEFAULT_DB"),
+        # для DATABASE_DRIVER=sqlite+aiosqlite - путь к файлу SQLITE_PATH, без него база в памяти
+        database=config_env.get("SQLITE_PATH")
+        if config_env.get("DATABASE_DRIVER", "").startswith("sqlite")
+        else config_env.get("POSTGRES_DEFAULT_DB"),
+        driver=config_env.get("DATABASE_DRIVER", "postgresql+asyncpg"),
     ),
     rabbitmq=RabbitMQ(
         host=config_env.get("RABBITMQ_DEFAULT_HOST"),
@@ -106,5 +158,30 @@ config = ConfigEnv(
     yandex_dict=YandexDictConfig(
         token=config_env["YANDEX_DICT_TOKEN"],
     ),
-    tg_token=TgConfig(tg_token=config_env["BOT_TOKEN_TG"]),
+    tg_token=TgConfig(tg_token=config_env["BOT_TOKEN_TG"], api_url=config_env.get("TG_API_URL")),
+    lexicon=LexiconConfig(path=config_env.get("LEXICON_PATH")),
+    broker=BrokerConfig(kind=config_env.get("BROKER", "rabbitmq")),
+    store=StoreConfig(kind=config_env.get("GAME_STORE", "database")),
+    metrics=MetricsConfig(
+        port=int(config_env["METRICS_PORT"]) if config_env.get("METRICS_PORT") else None
+    ),
+    # без ARCHIVE_AFTER_DAYS завершенные игры не переносятся в архив
+    archive=ArchiveConfig(
+        after_days=(
+            int(config_env["ARCHIVE_AFTER_DAYS"]) if config_env.get("ARCHIVE_AFTER_DAYS") else None
+        ),
+        batch_size=int(config_env.get("ARCHIVE_BATCH_SIZE") or 500),
+        interval=float(config_env.get("ARCHIVE_INTERVAL") or 600),
+    ),
+    # WRITE_BEHIND_INTERVAL=0 - очки и слова игры пишутся сразу, без отложенной записи
+    write_behind=WriteBehindConfig(
+        interval=float(config_env.get("WRITE_BEHIND_INTERVAL") or 0.2),
+        batch_size=int(config_env.get("WRITE_BEHIND_BATCH_SIZE") or 100),
+    ),
+    # WORKER_PROCESSES > 1 - процессы worker делят чаты на шарды, значение должно
+    # совпадать у poller, sender и worker: по нему выбирается роутинг ключ сообщения
+    worker=WorkerConfig(
+        processes=int(config_env.get("WORKER_PROCESSES") or 1),
+        restart_delay=float(config_env.get("WORKER_RESTART_DELAY") or 1.0),
+    ),
 )
@@ -0,0 +1,111 @@
+import base64
+import binascii
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from aiohttp.web_exceptions import HTTPBadRequest
+from sqlalchemy import Table, func, select, text
+
+if TYPE_CHECKING:
+    from app.store.database.database import Database
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Курсор следующей страницы: id последней записи страницы.
+    Клиент получает его непрозрачной строкой и передает обратно в after.
+
+    :param last_id: id последней записи страницы
+    :return: курсор
+    """
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Разбор курсора из параметра after.
+
+    :param cursor: курсор
+    :return: id последней записи предыдущей страницы
+    :raises HTTPBadRequest: курсор поврежден
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPBadRequest(reason="invalid cursor")
+
+
+async def keyset_page(
+    database: "Database",
+    model,
+    per_page: int,
+    after: str | None = None,
+    descending: bool = False,
+    offset: int = 0,
+) -> tuple[list, str | None]:
+    """
+    Страница записей по курсору: WHERE id > after ORDER BY id LIMIT per_page + 1.
+    Запрос идет по первичному ключу, поэтому стоит одинаково для первой и десятитысячной страницы,
+    в отличие от OFFSET, который читает и отбрасывает все предыдущие строки.
+
+    :param database: база данных
+    :param model: модель или таблица (архивная) с колонкой id
+    :param per_page: размер страницы
+    :param after: курсор из ответа на предыдущую страницу
+    :param descending: обратный порядок id
+    :param offset: OFFSET для старых параметров page/per_page, с курсором не используется
+    :return: записи страницы и курсор следующей страницы (None - страница последняя)
+    """
+    id_ = model.c.id if isinstance(model, Table) else model.id
+    query = select(model).order_by(id_.desc() if descending else id_).limit(per_page + 1)
+    if after is not None:
+        last_id = decode_cursor(after)
+        query = query.where(id_ < last_id if descending else id_ > last_id)
+    elif offset:
+        query = query.offset(offset)
+    result = await database.execute_query(query)
+    rows = list(result.all() if isinstance(model, Table) else result.scalars().all())
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(rows[-1].id)
+
+
+@dataclass
+class ApproximateCount:
+    """
+    Примерное число строк в таблицах для total в списках админки.
+
+    PostgreSQL: оценка планировщика из pg_class.reltuples, которую обновляют
+    VACUUM и ANALYZE, - без чтения таблицы. Для таблиц, по которым статистики еще нет
+    (reltuples -1, или 0 до первого ANALYZE), и для SQLite - точный count.
+    Результат кэшируется на ttl секунд.
+
+    :param ttl: время жизни значения, с
+    """
+
+    ttl: float = 60.0
+    _cache: dict[str, tuple[float, int]] = field(default_factory=dict)
+
+    async def get(self, database: "Database", model) -> int:
+        """
+        :param database: база данных
+        :param model: модель или таблица
+        :return: примерное число строк
+        """
+        table = model.name if isinstance(model, Table) else model.__tablename__
+        now = time.monotonic()
+        if (cached := self._cache.get(table)) is not None and cached[0] > now:
+            return cached[1]
+        count = None
+        if database.dialect == "postgresql":
+            query = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table")
+            count = (await database.execute_query(query.bindparams(table=table))).scalar()
+        if count is None or count <= 0:
+            count = (await database.execute_query(select(func.count()).select_from(model))).scalar()
+        self._cache[table] = (now + self.ttl, count)
+        return count
+
+    def clear(self) -> None:
+        self._cache.clear()
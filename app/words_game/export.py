@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Sequence
+
+from sqlalchemy import Select, select
+
+from app.words_game.models import GameSession, User, game_sessions_archive
+
+if TYPE_CHECKING:
+    from app.store.database.database import Database
+
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+PLAYER_COLUMNS = (User.id, User.username, User.total_point, User.created_at)
+GAME_SESSION_COLUMNS = (
+    GameSession.id,
+    GameSession.game_type,
+    GameSession.chat_id,
+    GameSession.creator_id,
+    GameSession.winner_id,
+    GameSession.is_active,
+    GameSession.response_time,
+    GameSession.anonymous_poll,
+    GameSession.poll_time,
+    GameSession.life,
+    GameSession.words,
+    GameSession.created_at,
+)
+
+
+def _filter_created(query: Select, model, date_from: datetime | None, date_to: datetime | None):
+    if date_from is not None:
+        query = query.where(model.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(model.created_at < date_to)
+    return query
+
+
+def players_query(date_from: datetime | None = None, date_to: datetime | None = None) -> Select:
+    """
+    Выгрузка игроков по времени регистрации [date_from, date_to).
+
+    :param date_from: начало периода
+    :param date_to: конец периода, не включая
+    :return: запрос по колонкам, без загрузки моделей
+    """
+    query = select(*PLAYER_COLUMNS).order_by(User.id)
+    return _filter_created(query, User, date_from, date_to)
+
+
+def game_sessions_query(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    game_type: str | None = None,
+    archived: bool = False,
+) -> Select:
+    """
+    Выгрузка истории игр по времени создания [date_from, date_to) и типу игры.
+
+    :param date_from: начало периода
+    :param date_to: конец периода, не включая
+    :param game_type: тип игры (тип чата): private, group, supergroup
+    :param archived: выгрузка из архива game_sessions_archive
+    :return: запрос по колонкам, без загрузки моделей
+    """
+    source = game_sessions_archive.c if archived else GameSession
+    columns = [getattr(source, column.name) for column in GAME_SESSION_COLUMNS]
+    query = select(*columns).order_by(source.id)
+    if game_type is not None:
+        query = query.where(source.game_type == game_type)
+    return _filter_created(query, source, date_from, date_to)
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_rows(rows: Sequence, columns: list[str], fmt: str, header: bool = False) -> bytes:
+    """
+    Часть выгрузки в NDJSON (объект на строку) или CSV.
+
+    :param rows: строки выборки
+    :param columns: имена колонок
+    :param fmt: ndjson или csv
+    :param header: добавить строку заголовка CSV
+    :return: байты для записи в ответ
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(columns)
+        for row in rows:
+            writer.writerow(
+                ";".join(value) if isinstance(value, list) else _value(value) for value in row
+            )
+        return buffer.getvalue().encode()
+    return "".join(
+        json.dumps(dict(zip(columns, map(_value, row))), ensure_ascii=False) + "\n" for row in rows
+    ).encode()
+
+
+async def export_rows(
+    database: "Database", query: Select, fmt: str, chunk_size: int = 1000
+) -> AsyncIterator[bytes]:
+    """
+    Выгрузка выборки частями по chunk_size строк: память не зависит от числа строк.
+
+    :param database: база данных
+    :param query: запрос по колонкам
+    :param fmt: ndjson или csv
+    :param chunk_size: строк в одной части
+    :return: асинхронный итератор байтов
+    """
+    columns = [column.name for column in query.selected_columns]
+    if fmt == "csv":
+        yield encode_rows((), columns, fmt, header=True)
+    async for partition in database.stream_query(query, chunk_size=chunk_size):
+        yield encode_rows(partition, columns, fmt)
@@ -1,4 +1,16 @@
-from sqlalchemy import ForeignKey, select
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Table,
+    UniqueConstraint,
+    func,
+    select,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship, MappedAsDataclass
 
 from app.store.database.sqlalchemy_base import DB, bigint
@@ -11,12 +23,16 @@ class User(MappedAsDataclass, DB):
     :param id: Идентификатор пользователя.
     :param username: Имя пользователя.
     :param total_point: Общее количество очков пользователя.
+    :param created_at: Время регистрации пользователя.
     """
     __tablename__ = "users"
 
     id: Mapped[bigint] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(nullable=False)
     total_point: Mapped[int] = mapped_column(nullable=True, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True, init=False
+    )
 
 
 class GameSession(MappedAsDataclass, DB):
@@ -38,8 +54,11 @@ class GameSession(MappedAsDataclass, DB):
     :param anonymous_poll: Флаг анонимности голосования.
     :param poll_time: Время на голосование.
     :param life: Количество жизней.
+    :param used_city_bitmap: Битовая карта использованных городов.
+    :param created_at: Время создания игровой сессии.
     """
     __tablename__ = "game_sessions"
+    __table_args__ = (Index("ix_game_sessions_chat_id_is_active", "chat_id", "is_active"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     game_type: Mapped[str] = mapped_column(nullable=False)
@@ -64,6 +83,10 @@ class GameSession(MappedAsDataclass, DB):
     anonymous_poll: Mapped[bool] = mapped_column(nullable=False, default=True)
     poll_time: Mapped[int] = mapped_column(nullable=False, default=15)
     life: Mapped[int] = mapped_column(nullable=False, default=3)
+    used_city_bitmap: Mapped[bytes] = mapped_column(nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True, init=False
+    )
 
 
 class UserGameSession(MappedAsDataclass, DB):
@@ -111,6 +134,69 @@ class Words(MappedAsDataclass, DB):
     word: Mapped[str] = mapped_column(nullable=False, unique=True)
 
 
+class WordVerdict(MappedAsDataclass, DB):
+    """
+    Класс, представляющий итог голосований за слово.
+
+    :param id: Идентификатор вердикта.
+    :param word: Слово.
+    :param chat_id: Идентификатор чата, 0 - вердикт для всех чатов.
+    :param accepted: Принято ли слово.
+    :param yes: Количество голосов за.
+    :param no: Количество голосов против.
+    :param confidence: Доля голосов за принятое решение.
+    :param expires_at: Время, после которого вердикт не используется.
+    """
+    __tablename__ = "word_verdicts"
+    __table_args__ = (UniqueConstraint("word", "chat_id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    word: Mapped[str] = mapped_column(nullable=False)
+    chat_id: Mapped[bigint] = mapped_column(nullable=False, default=0)
+    accepted: Mapped[bool] = mapped_column(nullable=False, default=False)
+    yes: Mapped[int] = mapped_column(nullable=False, default=0)
+    no: Mapped[int] = mapped_column(nullable=False, default=0)
+    confidence: Mapped[float] = mapped_column(nullable=False, default=0.0)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=None
+    )
+
+
+class PlayerStats(MappedAsDataclass, DB):
+    """
+    Класс, представляющий накопленную статистику игрока, обновляется при завершении игры.
+
+    :param id: Идентификатор записи.
+    :param chat_id: Идентификатор чата, 0 - статистика по всем чатам.
+    :param user_id: Идентификатор игрока.
+    :param games: Количество сыгранных игр.
+    :param wins: Количество побед.
+    :param words: Количество засчитанных слов и городов.
+    :param response_time: Суммарное время ответов, секунды.
+    :param answers: Количество ответов с известным временем.
+    """
+    __tablename__ = "player_stats"
+    __table_args__ = (
+        UniqueConstraint("chat_id", "user_id"),
+        Index("ix_player_stats_rank", "chat_id", "words", "wins", "user_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, init=False)
+    chat_id: Mapped[bigint] = mapped_column(nullable=False, default=0)
+    user_id: Mapped[bigint] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, default=None
+    )
+    games: Mapped[int] = mapped_column(nullable=False, default=0)
+    wins: Mapped[int] = mapped_column(nullable=False, default=0)
+    words: Mapped[int] = mapped_column(nullable=False, default=0)
+    response_time: Mapped[float] = mapped_column(nullable=False, default=0.0)
+    answers: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    @property
+    def avg_response_time(self) -> float | None:
+        return self.response_time / self.answers if self.answers else None
+
+
 class WordsInGame(MappedAsDataclass, DB):
     __tablename__ = "words_in_game"
 
@@ -123,6 +209,30 @@ class WordsInGame(MappedAsDataclass, DB):
     word: Mapped[Words] = relationship(Words, backref="words_in_game", lazy="joined")
 
 
+class GameEvent(MappedAsDataclass, DB):
+    """
+    Класс, представляющий событие журнала ходов игры: строки только добавляются, пачками.
+
+    Внешнего ключа на game_sessions нет: пачка пишется позже хода, и игра к этому времени
+    может быть удалена, а одна такая строка не должна отменять запись всей пачки.
+
+    :param id: Идентификатор события, порядок событий одной игры.
+    :param game_session_id: Идентификатор игровой сессии.
+    :param kind: Тип события, см. app.store.words_game.events.
+    :param created_at: Время события (а не записи пачки).
+    :param user_id: Игрок, None - ход бота или событие всей игры.
+    :param data: Параметры события.
+    """
+    __tablename__ = "game_events"
+
+    id: Mapped[int] = mapped_column(primary_key=True, init=False)
+    game_session_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    kind: Mapped[str] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    user_id: Mapped[bigint] = mapped_column(nullable=True, default=None)
+    data: Mapped[dict] = mapped_column(JSON, nullable=False, default_factory=dict)
+
+
 class GameSettings(MappedAsDataclass, DB):
     __tablename__ = "game_settings"
 
@@ -131,6 +241,7 @@ class GameSettings(MappedAsDataclass, DB):
     anonymous_poll: Mapped[bool] = mapped_column(nullable=False, default=True)
     poll_time: Mapped[int] = mapped_column(nullable=False, default=15)
     life: Mapped[int] = mapped_column(nullable=False, default=3)
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default="1")
 
     _instance = None
 
@@ -144,3 +255,40 @@ class GameSettings(MappedAsDataclass, DB):
                     session.add(cls._instance)
                     await session.commit()
         return cls._instance
+
+
+def archive_table(model, *indexes: str) -> Table:
+    """
+    Архивная копия таблицы игр: те же колонки без внешних ключей и значений по умолчанию,
+    строки только добавляются фоновым переносом завершенных игр (app.store.words_game.archive).
+
+    :param model: модель горячей таблицы
+    :param indexes: колонки с отдельным индексом
+    :return: таблица <имя>_archive
+    """
+    name = f"{model.__tablename__}_archive"
+    return Table(
+        name,
+        DB.metadata,
+        *(
+            Column(
+                column.name,
+                column.type,
+                primary_key=column.primary_key,
+                autoincrement=False,
+                nullable=column.nullable,
+            )
+            for column in model.__table__.columns
+        ),
+        *(Index(f"ix_{name}_{column}", column) for column in indexes),
+    )
+
+
+game_sessions_archive = archive_table(GameSession, "chat_id", "created_at")
+game_sessions_archive.append_column(
+    Column("archived_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+)
+user_game_sessions_archive = archive_table(UserGameSession, "game_sessions_id", "player_id")
+words_in_game_archive = archive_table(WordsInGame, "game_session_id")
+used_cities_archive = archive_table(UsedCity, "game_session_id")
+game_events_archive = archive_table(GameEvent, "game_session_id")
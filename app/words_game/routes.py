@@ -1,6 +1,14 @@
 import typing
 
-from app.words_game.views import GameSessionView, PlayerView, CityView, GameSettingsView
+from app.words_game.views import (
+    GameSessionView,
+    PlayerView,
+    CityView,
+    GameSettingsView,
+    PlayerExportView,
+    GameSessionExportView,
+    LeaderboardView,
+)
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
@@ -8,6 +16,9 @@ if typing.TYPE_CHECKING:
 
 def setup_routes(app: "Application"):
     app.router.add_view("/game_sessions", GameSessionView)
+    app.router.add_view("/game_sessions/export", GameSessionExportView)
     app.router.add_view("/players", PlayerView)
+    app.router.add_view("/players/export", PlayerExportView)
     app.router.add_view("/cities", CityView)
     app.router.add_view("/game_settings", GameSettingsView)
+    app.router.add_view("/leaderboard", LeaderboardView)
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields
+from datetime import timezone
+
+from marshmallow import Schema, fields, validate
 
 
 class UserSchema(Schema):
@@ -30,19 +32,28 @@ class CitySchema(Schema):
 
 class CityListResponseSchema(Schema):
     cities = fields.List(fields.Nested(CitySchema))
+    next = fields.String(allow_none=True)
+    total = fields.Integer()
 
 
 class GameSessionListResponseSchema(Schema):
     games = fields.List(fields.Nested(GameSessionSchema))
+    next = fields.String(allow_none=True)
+    total_pages = fields.Integer()
+    total = fields.Integer()
 
 
 class PlayerListResponseSchema(Schema):
     users = fields.List(fields.Nested(UserSchema))
+    next = fields.String(allow_none=True)
+    total = fields.Integer()
 
 
 class PaginationSchema(Schema):
-    page = fields.Integer(default=1)
-    per_page = fields.Integer(default=20)
+    page = fields.Integer(load_default=1, validate=validate.Range(min=1))
+    per_page = fields.Integer(load_default=20, validate=validate.Range(min=1))
+    after = fields.String()
+    total = fields.Boolean(load_default=False)
 
 
 class GameSettingsSchema(Schema):
@@ -50,8 +61,37 @@ class GameSettingsSchema(Schema):
     anonymous_poll = fields.Boolean(default=True, required=False)
     poll_time = fields.Integer(default=15, required=False)
     life = fields.Integer(default=3, required=False)
+    version = fields.Integer(dump_only=True)
+
+
+class PaginationSchemaGames(PaginationSchema):
+    archived = fields.Boolean(load_default=False)
+
+
+class ExportSchema(Schema):
+    format = fields.String(load_default="ndjson", validate=validate.OneOf(["ndjson", "csv"]))
+    date_from = fields.AwareDateTime(default_timezone=timezone.utc)
+    date_to = fields.AwareDateTime(default_timezone=timezone.utc)
+
+
+class GameSessionExportSchema(ExportSchema):
+    game_type = fields.String()
+    archived = fields.Boolean(load_default=False)
+
+
+class LeaderboardSchema(Schema):
+    chat_id = fields.Integer(load_default=0)
+    limit = fields.Integer(load_default=10, validate=validate.Range(min=1, max=100))
+
+
+class PlayerStatsSchema(Schema):
+    user_id = fields.Integer()
+    username = fields.String()
+    games = fields.Integer()
+    wins = fields.Integer()
+    words = fields.Integer()
+    avg_response_time = fields.Float(allow_none=True)
 
 
-class PaginationSchemaGames(Schema):
-    page = fields.Integer(default=1)
-    per_page = fields.Integer(default=20)
+class LeaderboardResponseSchema(Schema):
+    players = fields.List(fields.Nested(PlayerStatsSchema))
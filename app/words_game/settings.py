@@ -0,0 +1,38 @@
+from dataclasses import asdict, dataclass, fields
+
+# роутинг ключ рассылки настроек: у каждого worker своя очередь, событие получают все
+SETTINGS_ROUTING_KEY = "settings"
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """
+    Неизменяемый снимок настроек игры в worker. Новая версия заменяет снимок целиком,
+    поэтому обработчик никогда не видит наполовину обновленные настройки.
+
+    :param version: версия настроек, растет при каждом изменении в админке
+    :param response_time: время на ответ
+    :param anonymous_poll: анонимный опрос
+    :param poll_time: время опроса
+    :param life: количество жизней
+    """
+
+    version: int = 1
+    response_time: int = 15
+    anonymous_poll: bool = True
+    poll_time: int = 15
+    life: int = 3
+
+    @classmethod
+    def from_model(cls, settings) -> "SettingsSnapshot":
+        """
+        :param settings: GameSettings или запись настроек хранилища
+        """
+        return cls(**{field.name: getattr(settings, field.name) for field in fields(cls)})
+
+    @classmethod
+    def from_message(cls, message: dict) -> "SettingsSnapshot":
+        return cls(**{field.name: message[field.name] for field in fields(cls)})
+
+    def to_message(self) -> dict:
+        return {"type_": "settings_changed", **asdict(self)}
@@ -1,9 +1,21 @@
-from sqlalchemy import desc, select, func
+import logging
+
+from sqlalchemy import select, update
 
 from app.web.app import View
+from app.web.cache import cached_response
 from app.web.mixins import AuthRequiredMixin
+from app.web.pagination import ApproximateCount, keyset_page
 from app.web.utils import json_response
-from app.words_game.models import GameSession, City, User, GameSettings
+from app.words_game.models import (
+    GameSession,
+    City,
+    User,
+    GameSettings,
+    PlayerStats,
+    game_sessions_archive,
+)
+from app.words_game.settings import SETTINGS_ROUTING_KEY, SettingsSnapshot
 from app.words_game.schemes import (
     GameSessionListResponseSchema,
     PlayerListResponseSchema,
@@ -14,69 +26,236 @@ from app.words_game.schemes import (
     GameSessionSchema,
     GameSettingsSchema,
     PaginationSchemaGames,
+    ExportSchema,
+    GameSessionExportSchema,
+    LeaderboardSchema,
+    LeaderboardResponseSchema,
+    PlayerStatsSchema,
 )
 
+from aiohttp.web import StreamResponse
 from aiohttp_apispec import docs, response_schema, querystring_schema, request_schema
 
+from app.words_game.export import CONTENT_TYPES, export_rows, game_sessions_query, players_query
+
+
+# общее число строк для total_pages и total: оценка с кэшем вместо count(id) на каждый запрос
+TOTALS = ApproximateCount()
+
 
 class GameSessionView(AuthRequiredMixin, View):
-    @docs(tags=["game"], summary="List Game Sessions", description="List all game sessions")
+    @docs(
+        tags=["game"],
+        summary="List Game Sessions",
+        description="List all game sessions. Pass the next cursor as after for the next page, "
+        "page/per_page are kept for compatibility, archived=true lists archived games",
+    )
     @querystring_schema(PaginationSchemaGames)
     @response_schema(GameSessionListResponseSchema, 200)
     async def get(self):
-        page = int(self.request.query.get("page", "1"))
-        per_page = int(self.request.query.get("per_page", "20"))
-        offset = (page - 1) * per_page
-        stmt = select(GameSession).order_by(GameSession.id).limit(per_page).offset(offset)
-        game_sessions = await self.request.app.database.execute_query(stmt)
-        game_sessions = game_sessions.scalars().all()
-        game_sessions = [GameSessionSchema().dump(i) for i in game_sessions]
-        stmt = select(func.count(GameSession.id))
-        total_count = await self.request.app.database.execute_query(stmt)
-        total_count = total_count.scalar()
-        total_pages = (total_count + per_page - 1) // per_page
-        return json_response(data={"game_sessions": game_sessions, "total_pages": total_pages})
+        query = self.request["querystring"]
+        per_page = query["per_page"]
+        table = game_sessions_archive if query["archived"] else GameSession
+        game_sessions, next_ = await keyset_page(
+            self.database,
+            table,
+            per_page,
+            after=query.get("after"),
+            offset=(query["page"] - 1) * per_page,
+        )
+        data = {
+            "game_sessions": [GameSessionSchema().dump(i) for i in game_sessions],
+            "next": next_,
+        }
+        if "after" not in query:
+            total_count = await TOTALS.get(self.database, table)
+            data["total_pages"] = (total_count + per_page - 1) // per_page
+        if query["total"]:
+            data["total"] = await TOTALS.get(self.database, table)
+        return json_response(data=data)
 
 
 class PlayerView(AuthRequiredMixin, View):
-    @docs(tags=["game"], summary="List Players", description="List all players")
+    @docs(
+        tags=["game"],
+        summary="List Players",
+        description="List players. Without per_page and after all players are returned",
+    )
+    @querystring_schema(PaginationSchema)
     @response_schema(PlayerListResponseSchema, 200)
     async def get(self):
-        stmt = select(User).order_by(User.id)
-        players = await self.request.app.database.execute_query(stmt)
-        players = [UserSchema().dump(i) for i in players.scalars().all()]
-        return json_response(data={"users": players})
+        query = self.request["querystring"]
+        # per_page из схемы есть всегда, без него в строке запроса - все игроки одним списком
+        if "per_page" not in self.request.query and "after" not in query:
+            stmt = select(User).order_by(User.id)
+            players = await self.database.execute_query(stmt)
+            players, next_ = players.scalars().all(), None
+        else:
+            per_page = query["per_page"]
+            players, next_ = await keyset_page(
+                self.database,
+                User,
+                per_page,
+                after=query.get("after"),
+                offset=(query["page"] - 1) * per_page,
+            )
+        data = {"users": [UserSchema().dump(i) for i in players], "next": next_}
+        if query["total"]:
+            data["total"] = await TOTALS.get(self.database, User)
+        return json_response(data=data)
+
+
+class ExportMixin:
+    async def stream_export(self, query, name: str) -> StreamResponse:
+        """
+        Потоковая выгрузка выборки в NDJSON или CSV, строки читаются и пишутся частями.
+
+        :param query: запрос по колонкам
+        :param name: имя файла без расширения
+        :return: ответ
+        """
+        fmt = self.request["querystring"]["format"]
+        response = StreamResponse(
+            headers={
+                "Content-Type": CONTENT_TYPES[fmt],
+                "Content-Disposition": f'attachment; filename="{name}.{fmt}"',
+            }
+        )
+        await response.prepare(self.request)
+        async for chunk in export_rows(self.database, query, fmt):
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+
+class PlayerExportView(AuthRequiredMixin, ExportMixin, View):
+    @docs(
+        tags=["game"],
+        summary="Export Players",
+        description="Stream players registered in [date_from, date_to) as NDJSON or CSV",
+    )
+    @querystring_schema(ExportSchema)
+    async def get(self):
+        params = self.request["querystring"]
+        query = players_query(date_from=params.get("date_from"), date_to=params.get("date_to"))
+        return await self.stream_export(query, "players")
+
+
+class GameSessionExportView(AuthRequiredMixin, ExportMixin, View):
+    @docs(
+        tags=["game"],
+        summary="Export Game Sessions",
+        description="Stream game sessions created in [date_from, date_to) as NDJSON or CSV, "
+        "archived=true exports archived games",
+    )
+    @querystring_schema(GameSessionExportSchema)
+    async def get(self):
+        params = self.request["querystring"]
+        query = game_sessions_query(
+            date_from=params.get("date_from"),
+            date_to=params.get("date_to"),
+            game_type=params.get("game_type"),
+            archived=params["archived"],
+        )
+        return await self.stream_export(query, "game_sessions")
 
 
 class CityView(AuthRequiredMixin, View):
-    @docs(tags=["game"], summary="List Cities", description="List all cities")
+    @docs(
+        tags=["game"],
+        summary="List Cities",
+        description="List cities, newest first. Pass the next cursor as after for the next page",
+    )
     @querystring_schema(PaginationSchema)
     @response_schema(CityListResponseSchema, 200)
+    @cached_response("city")
     async def get(self):
-        page = int(self.request.query.get("page", "1"))
-        per_page = int(self.request.query.get("per_page", "20"))
-        stmt = select(City).order_by(desc(City.id)).limit(per_page).offset((page - 1) * per_page)
-        cities = await self.request.app.database.execute_query(stmt)
-        cities = [CitySchema().dump(i) for i in cities.scalars().all()]
-        return json_response(data={"cities": cities})
+        query = self.request["querystring"]
+        per_page = query["per_page"]
+        cities, next_ = await keyset_page(
+            self.database,
+            City,
+            per_page,
+            after=query.get("after"),
+            descending=True,
+            offset=(query["page"] - 1) * per_page,
+        )
+        data = {"cities": [CitySchema().dump(i) for i in cities], "next": next_}
+        if query["total"]:
+            data["total"] = await TOTALS.get(self.database, City)
+        return json_response(data=data)
 
 
 class GameSettingsView(AuthRequiredMixin, View):
     @docs(tags=["game"], summary="Get Game Settings", description="Get game settings")
     @response_schema(GameSettingsSchema, 200)
+    @cached_response("game_settings")
     async def get(self):
         game_settings = await GameSettings.get_instance(self.request.app.database.session)
         return json_response(data={"game_settings": GameSettingsSchema().dump(game_settings)})
 
+    async def publish_settings(self, game_settings: GameSettings) -> None:
+        """
+        Рассылка новых настроек worker. Ошибка брокера не отменяет сохранение:
+        worker сверяют версию настроек с базой и подхватят ее позже.
+
+        :param game_settings: сохраненные настройки
+        """
+        if (broker := self.request.app.rabbitMQ) is None:
+            return
+        try:
+            await broker.send_event(
+                message=SettingsSnapshot.from_model(game_settings).to_message(),
+                routing_key=SETTINGS_ROUTING_KEY,
+            )
+        except Exception as e:
+            logging.getLogger("views").warning(f"settings_changed not sent: {e!r}")
+
     @docs(tags=["game"], summary="Update Game Settings", description="Update game settings")
     @request_schema(GameSettingsSchema)
     @response_schema(GameSettingsSchema, 200)
     async def post(self):
         data = await self.request.json()
-        game_settings = await GameSettings.get_instance(self.request.app.database.session)
-        game_settings.response_time = data.get("response_time", game_settings.response_time)
-        game_settings.anonymous_poll = data.get("anonymous_poll", game_settings.anonymous_poll)
-        game_settings.poll_time = data.get("poll_time", game_settings.poll_time)
-        game_settings.life = data.get("life", game_settings.life)
-        await self.request.app.database.add_query(game_settings)
+        # строка настроек создается при первом запуске
+        await GameSettings.get_instance(self.request.app.database.session)
+        fields = ("response_time", "anonymous_poll", "poll_time", "life")
+        # версия растет в базе: копия настроек в памяти процесса может быть устаревшей,
+        # а worker применяют только версию новее своей
+        query = (
+            update(GameSettings)
+            .values(
+                **{name: data[name] for name in fields if name in data},
+                version=GameSettings.version + 1,
+            )
+            .returning(GameSettings)
+        )
+        res = await self.request.app.database.execute_query(query)
+        game_settings = res.scalar_one()
+        GameSettings._instance = None
+        await self.publish_settings(game_settings)
         return json_response(data={"game_settings": GameSettingsSchema().dump(game_settings)})
+
+
+class LeaderboardView(AuthRequiredMixin, View):
+    @docs(
+        tags=["game"],
+        summary="Leaderboard",
+        description="Top players of a chat by accepted words and wins, chat_id=0 - all chats",
+    )
+    @querystring_schema(LeaderboardSchema)
+    @response_schema(LeaderboardResponseSchema, 200)
+    async def get(self):
+        query = self.request["querystring"]
+        # порядок совпадает с индексом ix_player_stats_rank: чтение первых limit строк индекса
+        stmt = (
+            select(PlayerStats, User.username)
+            .join(User, User.id == PlayerStats.user_id)
+            .where(PlayerStats.chat_id == query["chat_id"])
+            .order_by(PlayerStats.words.desc(), PlayerStats.wins.desc(), PlayerStats.user_id.desc())
+            .limit(query["limit"])
+        )
+        rows = (await self.database.execute_query(stmt)).all()
+        players = [
+            {**PlayerStatsSchema().dump(stats), "username": username} for stats, username in rows
+        ]
+        return json_response(data={"players": players})
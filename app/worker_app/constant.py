@@ -6,9 +6,11 @@ help_msg = """
 + /play - начать игру
 + /stop - остановить игру
 + /stat - показать статистику игры
++ /top - рейтинг игроков чата, /top all - общий рейтинг
 + /ping - проверить доступность бота
 + /help - показать справку по командам
 + /last - показать на какую букву город
++ /level - выбрать сложность бота: easy, normal или hard
 + /FAQ - показать правила игры
 """
 
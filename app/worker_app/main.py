@@ -1,7 +1,38 @@
+from app.store.metrics import MetricsServer
+from app.store.rabbitMQ.shards import Shard
+from app.store.words_game.memory import MemoryGameStore
 from app.web.config import config
 from starter import starter
+from supervisor import Supervisor
 from worker import Worker
 
+
+def run_worker(shard: Shard | None = None, metrics_port: int | None = None) -> None:
+    """
+    Запуск worker до остановки по сигналу: в этом процессе или в процессе шарда supervisor.
+
+    :param shard: шард чатов процесса, None - все чаты
+    :param metrics_port: порт метрик, у процессов шардов - только на 127.0.0.1
+    """
+    store = MemoryGameStore.from_city_sql() if config.store.kind == "memory" else None
+    worker = Worker(cfg=config, store=store, shard=shard)
+    metrics = MetricsServer(port=metrics_port, host="0.0.0.0" if shard is None else "127.0.0.1")
+    starter(start_tasks=[worker.start, metrics.start], stop_tasks=[worker.stop, metrics.stop])
+
+
 if __name__ == "__main__":
-    worker = Worker(cfg=config)
-    starter(start_tasks=[worker.start], stop_tasks=[worker.stop])
+    # WORKER_PROCESSES > 1: процессы worker с шардами чатов под управлением supervisor
+    if config.worker.processes > 1:
+        supervisor = Supervisor(
+            target=run_worker,
+            processes=config.worker.processes,
+            metrics_port=config.metrics.port,
+            restart_delay=config.worker.restart_delay,
+        )
+        metrics = MetricsServer(port=config.metrics.port, upstreams=supervisor.metrics_urls)
+        starter(
+            start_tasks=[supervisor.start, metrics.start],
+            stop_tasks=[metrics.stop, supervisor.stop],
+        )
+    else:
+        run_worker(metrics_port=config.metrics.port)
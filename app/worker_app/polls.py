@@ -0,0 +1,91 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from app.store.tg_api.schemes import Poll
+
+YES, NO = "Yes", "No"
+
+
+@dataclass(slots=True)
+class PollTally:
+    """
+    Текущий подсчет голосов опроса за слово.
+
+    :param poll_id: id опроса
+    :param chat_id: id чата
+    :param word: слово
+    :param message_id: id сообщения с опросом
+    :param anonymous: анонимный ли опрос
+    :param yes: голосов за
+    :param no: голосов против
+    :param voters: число игроков, которые могут голосовать
+    :param answers: ответы игроков в неанонимном опросе
+    :param timer: задача, завершающая опрос, если Telegram не прислал закрытие
+    """
+
+    poll_id: int
+    chat_id: int
+    word: str
+    message_id: int | None = None
+    anonymous: bool = True
+    yes: int = 0
+    no: int = 0
+    voters: int | None = None
+    answers: dict[int, bool | None] = field(default_factory=dict)
+    timer: asyncio.Task | None = field(default=None, repr=False)
+
+    def update(self, poll: Poll) -> None:
+        """
+        Обновление подсчета по опросу из обновления Telegram.
+
+        :param poll: опрос
+        """
+        self.yes, self.no = poll_counts(poll)
+
+    def answer(self, user_id: int, answer: bool | None) -> None:
+        """
+        Учет ответа игрока в неанонимном опросе, повторный ответ заменяет прошлый.
+
+        :param user_id: id игрока
+        :param answer: True - за, False - против, None - ответ отозван или другой вариант
+        """
+        self.answers[user_id] = answer
+        votes = list(self.answers.values())
+        self.yes, self.no = votes.count(True), votes.count(False)
+
+    def decided(self) -> bool | None:
+        """
+        Итог опроса, если оставшиеся голоса уже не могут его изменить.
+        Слово принимается, если голосов за больше, чем против.
+
+        :return: True - принято, False - отклонено, None - итог еще не ясен
+        """
+        if not self.voters:
+            return None
+        left = max(self.voters - self.yes - self.no, 0)
+        if self.yes > self.no + left:
+            return True
+        if self.yes + left <= self.no:
+            return False
+        return None
+
+
+def poll_counts(poll: Poll) -> tuple[int, int]:
+    """
+    Голоса за и против в опросе.
+
+    :param poll: опрос
+    :return: (за, против)
+    """
+    counts = {option.text: option.voter_count or 0 for option in poll.options}
+    return counts.get(YES, 0), counts.get(NO, 0)
+
+
+def poll_word(poll: Poll) -> str:
+    """
+    Слово из вопроса опроса "Граждане примем ли мы {слово} как допустимое слово?".
+
+    :param poll: опрос
+    :return: слово
+    """
+    return poll.question.split()[4]
@@ -0,0 +1,180 @@
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from app.store.metrics import Counter, Histogram
+from app.store.tg_api.schemes import UpdateObj
+
+if TYPE_CHECKING:
+    from app.store.words_game.city_engine import CityGameState
+    from app.words_game.models import GameSession
+
+COMMAND_SECONDS = Histogram("worker_command_seconds", "Worker command handling time", ("command",))
+COMMANDS = Counter("worker_commands_total", "Worker handled commands", ("command", "status"))
+
+PRIVATE, GROUP = "private", "group"
+ANY_CHAT = (PRIVATE, GROUP)
+
+_UNSET = object()
+
+
+@dataclass(slots=True)
+class UpdateContext:
+    """
+    Сообщение и данные, которые нужны нескольким обработчикам: игра чата и игра
+    в города игрока читаются при первом обращении и запоминаются до конца обработки.
+
+    :param worker: worker, обрабатывающий сообщение
+    :param upd: обновление Telegram с сообщением
+    """
+
+    worker: object
+    upd: UpdateObj
+    _game: object = _UNSET
+    _city: object = _UNSET
+
+    @property
+    def chat_id(self) -> int:
+        return self.upd.message.chat.id
+
+    @property
+    def user_id(self) -> int:
+        return self.upd.message.from_.id
+
+    @property
+    def chat(self) -> str:
+        return PRIVATE if self.upd.message.chat.type == "private" else GROUP
+
+    async def game(self) -> "GameSession | None":
+        """
+        Активная игра в слова чата.
+        """
+        if self._game is _UNSET:
+            self._game = await self.worker.words_game.get_session_by_id(chat_id=self.chat_id)
+        return self._game
+
+    async def city(self) -> "CityGameState | None":
+        """
+        Активная игра в города автора сообщения.
+        """
+        if self._city is _UNSET:
+            self._city = await self.worker.city_engine.get_state(self.user_id)
+        return self._city
+
+
+Handler = Callable[[object, UpdateContext], Awaitable[None]]
+Guard = Callable[[UpdateContext], Awaitable[object]]
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """
+    Метрики маршрута получаются при регистрации: на сообщение нет поиска по меткам.
+
+    :param name: команда или вид хода, метка метрик
+    :param handler: обработчик (worker, context)
+    :param args: команда принимает аргументы (/level easy)
+    :param guard: условие для хода без команды
+    """
+
+    name: str
+    handler: Handler
+    args: bool = False
+    guard: Guard | None = None
+    seconds: object = field(init=False, repr=False, compare=False)
+    counts: dict[str, object] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "seconds", COMMAND_SECONDS.labels(self.name))
+        counts = {status: COMMANDS.labels(self.name, status) for status in ("ok", "error")}
+        object.__setattr__(self, "counts", counts)
+
+
+@dataclass
+class CommandRouter:
+    """
+    Маршруты сообщений worker, регистрируются один раз при импорте модуля.
+
+    Команда ищется по паре (команда, тип чата) в словаре. Сообщение без известной
+    команды - ход в игре: маршруты ходов проверяются по порядку регистрации,
+    их условия читают игру через UpdateContext, поэтому игра читается один раз.
+    Время и результат обработки пишутся в метрики с меткой команды.
+    """
+
+    commands: dict[tuple[str, str], Route] = field(default_factory=dict)
+    moves: dict[str, list[Route]] = field(default_factory=lambda: {chat: [] for chat in ANY_CHAT})
+
+    def command(self, name: str, chats: tuple[str, ...] = ANY_CHAT, args: bool = False):
+        """
+        Регистрация обработчика команды.
+
+        :param name: команда, например /play
+        :param chats: типы чатов, в которых команда работает
+        :param args: команда принимает аргументы
+        """
+
+        def decorator(handler: Handler) -> Handler:
+            for chat in chats:
+                if (name, chat) in self.commands:
+                    raise ValueError(f"command {name} already routed for {chat} chats")
+                self.commands[(name, chat)] = Route(name=name, handler=handler, args=args)
+            return handler
+
+        return decorator
+
+    def move(self, name: str, guard: Guard, chats: tuple[str, ...] = ANY_CHAT):
+        """
+        Регистрация обработчика хода: сообщения без команды.
+
+        :param name: вид хода, метка метрик
+        :param guard: условие (context) -> истинное значение, если ход для этого обработчика
+        :param chats: типы чатов
+        """
+
+        def decorator(handler: Handler) -> Handler:
+            for chat in chats:
+                self.moves[chat].append(Route(name=name, handler=handler, guard=guard))
+            return handler
+
+        return decorator
+
+    def resolve(self, text: str, chat: str) -> Route | None:
+        """
+        Маршрут команды: /cmd@bot и аргументы отбрасываются при поиске.
+
+        :param text: текст сообщения
+        :param chat: PRIVATE или GROUP
+        :return: маршрут или None, если это не известная команда
+        """
+        words = text.split("@", 1)[0].split(maxsplit=1)
+        if not words:
+            return None
+        route = self.commands.get((words[0], chat))
+        if route is None or (len(words) > 1 and not route.args):
+            return None
+        return route
+
+    async def dispatch(self, worker, upd: UpdateObj) -> None:
+        """
+        Вызов обработчика сообщения.
+
+        :param worker: worker
+        :param upd: обновление с сообщением
+        """
+        context = UpdateContext(worker=worker, upd=upd)
+        started = time.perf_counter()
+        route = self.resolve(upd.message.text or "", context.chat)
+        if route is None:
+            for move in self.moves[context.chat]:
+                if await move.guard(context):
+                    route = move
+                    break
+            else:
+                return
+        status = "error"
+        try:
+            await route.handler(worker, context)
+            status = "ok"
+        finally:
+            route.seconds.observe(time.perf_counter() - started)
+            route.counts[status].inc()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+from app.store.metrics import Counter, Gauge
+from app.store.rabbitMQ.shards import Shard
+
+WORKER_RESTARTS = Counter(
+    "worker_restarts_total", "Worker processes restarted by the supervisor", ("shard",)
+)
+WORKER_PROCESSES = Gauge("worker_processes", "Running worker processes")
+
+# target(shard, metrics_port) - запуск worker в дочернем процессе до его остановки
+Target = Callable[[Shard, int | None], None]
+
+
+@dataclass
+class Supervisor:
+    """
+    Несколько процессов worker на одной машине (WORKER_PROCESSES > 1).
+
+    Процесс i обрабатывает чаты шарда Shard(i, processes): у него своя очередь tg_bot_<i>,
+    свой цикл asyncio и свое хранилище игр в памяти, если GAME_STORE=memory. Poller и sender
+    отправляют сообщение шарду его чата, поэтому игра чата всегда в одном процессе.
+
+    Упавший процесс перезапускается через restart_delay секунд. Если он падает сразу
+    после запуска, задержка удваивается до max_restart_delay и сбрасывается, когда
+    процесс проработал дольше max_restart_delay. При остановке supervisor передает
+    процессам SIGTERM, ждет их штатной остановки stop_timeout секунд и завершает
+    оставшиеся SIGKILL.
+
+    Процессы запускаются через spawn, а не fork: у supervisor свой цикл asyncio
+    и сервер метрик, дочернему процессу их состояние не нужно.
+    Метрики процесса i отдаются на metrics_port + 1 + i только на 127.0.0.1,
+    supervisor отдает их на metrics_port вместе со своими с меткой shard.
+
+    :param target: запуск worker в дочернем процессе, функция уровня модуля
+    :param processes: количество процессов и шардов
+    :param metrics_port: порт метрик supervisor, None - метрики не отдаются
+    :param restart_delay: задержка перезапуска упавшего процесса, с
+    :param max_restart_delay: наибольшая задержка перезапуска, с
+    :param stop_timeout: ожидание штатной остановки процессов, с
+    """
+
+    target: Target
+    processes: int
+    metrics_port: int | None = None
+    restart_delay: float = 1.0
+    max_restart_delay: float = 30.0
+    stop_timeout: float = 20.0
+    logger: logging.Logger = logging.getLogger("supervisor")
+    children: dict[int, BaseProcess] = field(default_factory=dict)
+    _started_at: dict[int, float] = field(default_factory=dict)
+    _delays: dict[int, float] = field(default_factory=dict)
+    _restarts: dict[int, asyncio.TimerHandle] = field(default_factory=dict)
+    _stopping: bool = False
+
+    def __post_init__(self):
+        self.context = multiprocessing.get_context("spawn")
+
+    def child_metrics_port(self, index: int) -> int | None:
+        return self.metrics_port + 1 + index if self.metrics_port else None
+
+    def metrics_urls(self) -> dict[str, str]:
+        """
+        Адреса /metrics работающих процессов по номеру шарда.
+        """
+        return {
+            str(index): f"http://127.0.0.1:{self.child_metrics_port(index)}/metrics"
+            for index, process in self.children.items()
+            if self.metrics_port and process.is_alive()
+        }
+
+    async def start(self) -> None:
+        self._stopping = False
+        for index in range(self.processes):
+            self._spawn(index)
+        self.logger.info(f"started {self.processes} worker processes")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for handle in self._restarts.values():
+            handle.cancel()
+        self._restarts.clear()
+        loop = asyncio.get_running_loop()
+        for process in self.children.values():
+            loop.remove_reader(process.sentinel)
+        # SIGTERM: starter дочернего процесса останавливает worker штатно
+        running = [process for process in self.children.values() if process.is_alive()]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for process in running:
+            await loop.run_in_executor(None, process.join, max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                self.logger.warning(f"{process.name} did not stop in {self.stop_timeout}s, killed")
+                process.kill()
+                await loop.run_in_executor(None, process.join)
+        self.children.clear()
+        WORKER_PROCESSES.set(0)
+
+    def _spawn(self, index: int) -> None:
+        self._restarts.pop(index, None)
+        process = self.context.Process(
+            target=self.target,
+            args=(Shard(index=index, count=self.processes), self.child_metrics_port(index)),
+            name=f"worker-{index}",
+        )
+        process.start()
+        self.children[index] = process
+        self._started_at[index] = time.monotonic()
+        asyncio.get_running_loop().add_reader(process.sentinel, self._on_exit, index)
+        WORKER_PROCESSES.set(sum(p.is_alive() for p in self.children.values()))
+
+    def _on_exit(self, index: int) -> None:
+        process = self.children[index]
+        loop = asyncio.get_running_loop()
+        loop.remove_reader(process.sentinel)
+        process.join()
+        WORKER_PROCESSES.set(sum(p.is_alive() for p in self.children.values()))
+        if self._stopping:
+            return
+        if time.monotonic() - self._started_at[index] >= self.max_restart_delay:
+            delay = self.restart_delay
+        else:
+            delay = min(self._delays.get(index, self.restart_delay / 2) * 2, self.max_restart_delay)
+        self._delays[index] = delay
+        self.logger.error(
+            f"{process.name} exited with code {process.exitcode}, restart in {delay}s"
+        )
+        WORKER_RESTARTS.labels(str(index)).inc()
+        self._restarts[index] = loop.call_later(delay, self._spawn, index)
@@ -1,46 +1,112 @@
 import asyncio
 import logging
+import time
 from random import choice
+from uuid import uuid4
 
-import bson
 from aio_pika.abc import AbstractIncomingMessage
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError
 from constant import help_msg, faq_group, faq_solo
-from app.store.tg_api.schemes import UpdateObj
-from app.words_game.models import GameSession, GameSettings
+from polls import NO, YES, PollTally, poll_counts, poll_word
+from router import GROUP, PRIVATE, CommandRouter, UpdateContext
+from app.store.tg_api.schemes import Poll, UpdateObj
+from app.words_game.models import GameSession
+from app.words_game.settings import SETTINGS_ROUTING_KEY, SettingsSnapshot
 
 from app.web.config import ConfigEnv
 from app.store.words_game.accessor import WGAccessor
-from app.store.database.database import Database
+from app.store.words_game.store import GameStore
+from app.store.words_game.write_behind import WriteBehind
+from app.store.words_game.city_engine import CityGameEngine, CityGameState
+from app.store.words_game.events import (
+    CITY,
+    GAME_FINISHED,
+    GAME_STARTED,
+    LIFE_LOST,
+    NEXT_PLAYER,
+    PLAYER_JOINED,
+    POLL,
+    WORD,
+    WORD_REJECTED,
+    GameEventLog,
+)
+from app.store.words_game.leaderboard import GLOBAL_CHAT, PlayerResult, PlayerStatsEngine, mark_winner
+from app.store.words_game.letter_graph import LEVELS, exit_letter
+from app.store.database.database import Database, db_round_trips
+from app.store.metrics import Counter, Gauge, Histogram
+from app.store.metrics.tracing import TraceContext, current_trace
+from app.store.rabbitMQ.broker import Broker, load_message
 from app.store.rabbitMQ.rabbitMQ import RabbitMQ
+from app.store.rabbitMQ.shards import Shard, base_routing_key, shard_routing_key
 from app.store.yandex_dict_api.accessor import YandexDictAccessor
+from app.store.lexicon.dawg import Lexicon
+
+MESSAGE_SECONDS = Histogram("worker_message_seconds", "Worker message handling time", ("kind",))
+MESSAGES = Counter("worker_messages_total", "Worker handled messages", ("kind", "status"))
+MESSAGE_DB_QUERIES = Histogram(
+    "worker_message_db_queries",
+    "Database queries per handled message",
+    ("kind",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34),
+)
+WORD_CHECKS = Counter("worker_word_checks_total", "Word checks by source", ("source",))
+SETTINGS_VERSION = Gauge("worker_settings_version", "Game settings version applied by worker")
 
 
 class BaseMixin:
-    def __init__(self, cfg: ConfigEnv, concurrent_workers: int = 1):
+    def __init__(
+        self,
+        cfg: ConfigEnv,
+        concurrent_workers: int = 1,
+        broker: Broker | None = None,
+        store: GameStore | None = None,
+        settings_check_interval: float = 30,
+        shard: Shard | None = None,
+    ):
         self.cfg = cfg
+        # с несколькими шардами процесс обрабатывает только свои чаты, см. supervisor.py
+        self.shard = shard or Shard()
         self._tasks = []
         self.concurrent_workers = concurrent_workers
-        self.database = Database(cfg=self.cfg)
-        self.words_game = WGAccessor(database=self.database)
-        self.rabbitMQ = RabbitMQ(
+        # с переданным хранилищем (MemoryGameStore) worker работает без базы данных
+        self.database = Database(cfg=self.cfg) if store is None else None
+        self.words_game: GameStore = store or WGAccessor(
+            database=self.database, write_behind=self.setup_write_behind()
+        )
+        self.rabbitMQ = broker or RabbitMQ(
             host=self.cfg.rabbitmq.host,
             port=self.cfg.rabbitmq.port,
             user=self.cfg.rabbitmq.user,
             password=self.cfg.rabbitmq.password,
         )
         self.yandex_dict = YandexDictAccessor(token=self.cfg.yandex_dict.token)
+        self.lexicon: Lexicon | None = None
         self.logger = logging.getLogger("worker")
         self.routing_key_worker = "worker"
         self.routing_key_sender = "sender"
         self.routing_key_poller = "poller"
-        self.queue_name = "tg_bot"
-        self.game_settings: GameSettings | None = None
+        self.queue_name = self.shard.queue_name("tg_bot")
+        # снимок заменяется целиком, новые игры берут настройки из текущего снимка
+        self.game_settings: SettingsSnapshot | None = None
+        self.settings_check_interval = settings_check_interval
+        self.city_engine = CityGameEngine(words_game=self.words_game, owns=self.shard.owns)
+        self.stats = PlayerStatsEngine(words_game=self.words_game)
+        self.event_log = GameEventLog(words_game=self.words_game)
+        self.polls: dict[int, PollTally] = {}
 
     async def statistics(self, upd: UpdateObj, game: GameSession | None = None) -> None:
         raise NotImplementedError
 
+    def setup_write_behind(self) -> WriteBehind | None:
+        """
+        Отложенная запись очков и слов игры, WRITE_BEHIND_INTERVAL=0 - запись сразу.
+        """
+        cfg = self.cfg.write_behind
+        if cfg is None or cfg.interval <= 0:
+            return None
+        return WriteBehind(database=self.database, interval=cfg.interval, batch_size=cfg.batch_size)
+
 
 class CityGameMixin(BaseMixin):
     """
@@ -50,7 +116,9 @@ class CityGameMixin(BaseMixin):
     stop_game: Метод для остановки игры в города для одного игрока.
     pick_city: Метод для выбора города игроком.
     check_city: Метод для проверки города игроком.
+    set_level: Метод для выбора сложности бота.
     bot_looser: Метод для обработки поражения бота в игре в города.
+    save_city_stats: Метод для сохранения статистики игры в города.
     """
 
     async def statistics(self, upd: UpdateObj, game: GameSession | None = None) -> None:
@@ -63,7 +131,7 @@ class CityGameMixin(BaseMixin):
         :param upd:
         :return:
         """
-        if await self.words_game.get_session_by_id(upd.message.from_.id):
+        if await self.city_engine.get_state(upd.message.from_.id):
             message_game_exist = {
                 "type_": "message",
                 "chat_id": upd.message.from_.id,
@@ -79,9 +147,11 @@ class CityGameMixin(BaseMixin):
             user_id=upd.message.from_.id, username=upd.message.from_.username
         )
 
-        await self.words_game.create_game_session(
+        game = await self.words_game.create_game_session(
             user_id=user.id, chat_id=upd.message.chat.id, chat_type=upd.message.chat.type
         )
+        self.city_engine.new_game(game_id=game.id, chat_id=upd.message.chat.id)
+        self.event_log.append(game.id, GAME_STARTED, user.id, game_type=game.game_type)
 
         message_game_start = {
             "type_": "message",
@@ -107,14 +177,38 @@ class CityGameMixin(BaseMixin):
         :return:
         """
         if game := await self.words_game.get_session_by_id(chat_id=upd.message.chat.id):
+            state = await self.city_engine.finish(upd.message.chat.id)
             await self.words_game.update_game_session(game_id=game.id, status=False)
+            self.event_log.append(game.id, GAME_FINISHED, winner=False)
+            await self.save_city_stats(game, state, won=False, username=upd.message.from_.username)
             await self.statistics(upd, game=game)
 
+    async def set_level(self, upd: UpdateObj) -> None:
+        """
+        Метод set_level для выбора сложности бота в игре в города: /level easy|normal|hard.
+
+        :param upd:
+        :return:
+        """
+        chat_id = upd.message.chat.id
+        args = upd.message.text.split()[1:]
+        if args and self.city_engine.set_level(chat_id=chat_id, level=args[0].lower()):
+            text = f"Сложность: {args[0].lower()}"
+        else:
+            level = self.city_engine.levels.get(chat_id, self.city_engine.default_level)
+            text = f"Сложность: {level}. Доступно: /level {'|'.join(LEVELS)}"
+
+        await self.rabbitMQ.send_event(
+            message={"type_": "message", "chat_id": chat_id, "text": text},
+            routing_key=self.routing_key_sender,
+        )
+
     async def pick_city(
         self, user_id: int, chat_id: int, username: str, letter: str | None = None
     ) -> None:
         """
         Метод pick_city для выбора города ботом.
+        Город выбирается движком в памяти, запись хода в базу отложенная.
 
         :param user_id: id игрока
         :param chat_id: id чата
@@ -123,27 +217,25 @@ class CityGameMixin(BaseMixin):
         :return:
         """
         self.logger.info(f"pick_city: {username} {letter}")
-        game = await self.words_game.get_session_by_id(user_id)
+        state = await self.city_engine.get_state(user_id)
 
-        city = await self.words_game.get_city_by_first_letter(
-            letter=letter, game_session_id=game.id
-        )
+        city = await self.city_engine.pick(state, letter=letter)
         self.logger.info(f"city: {city}")
         if not city:
-            return await self.bot_looser(game_session_id=game.id)
-
-        first_letter = (
-            city.name[-1] if city.name[-1] not in "ьыъйё" else city.name[-2]
-        ).capitalize()
-
-        await self.words_game.update_game_session(game_id=game.id, next_letter=first_letter)
+            return await self.bot_looser(game_session_id=state.game_id)
+        city_id, city_name = city
 
-        await self.words_game.set_city_to_used(city_id=city.id, game_session_id=game.id)
+        first_letter = exit_letter(city_name)
+        self.city_engine.play(state, city_id=city_id, next_letter=first_letter)
+        self.event_log.append(
+            state.game_id, CITY, city_id=city_id, name=city_name, next_letter=first_letter
+        )
+        self.stats.prompt(state.game_id)
 
         message_city_start_letter = {
             "type_": "message",
             "chat_id": chat_id,
-            "text": f"""{username} {city.name} \nТебе на {first_letter}""",
+            "text": f"""{username} {city_name} \nТебе на {first_letter}""",
         }
         await self.rabbitMQ.send_event(
             message=message_city_start_letter, routing_key=self.routing_key_sender
@@ -156,22 +248,17 @@ class CityGameMixin(BaseMixin):
         :param upd:
         :return:
         """
-        if city := await self.words_game.get_city_by_name(upd.message.text.strip("/")):
-            letter_num, letter = -1, None
-            while abs(letter_num) < len(city.name):
-                if city.name[letter_num] not in "ьыъйё":
-                    letter = city.name[letter_num].capitalize()
-                    break
-                else:
-                    letter_num -= 1
+        if city := await self.city_engine.find(upd.message.text.strip("/")):
+            city_id, city_name = city
+            letter = exit_letter(city_name)
 
-            game = await self.words_game.get_session_by_id(upd.message.from_.id)
+            state = await self.city_engine.get_state(upd.message.from_.id)
 
-            if await self.words_game.check_city_in_used(city_id=city.id, game_session_id=game.id):
+            if city_id in state.used:
                 message_city_exist = {
                     "type_": "message",
                     "chat_id": upd.message.chat.id,
-                    "text": f"{upd.message.from_.username} {city.name} уже есть",
+                    "text": f"{upd.message.from_.username} {city_name} уже есть",
                 }
 
                 await self.rabbitMQ.send_event(
@@ -179,15 +266,23 @@ class CityGameMixin(BaseMixin):
                 )
                 return
 
-            if game.next_start_letter == city.name[0]:
-                await self.words_game.update_game_session(game_id=game.id, next_letter=letter)
-                await self.words_game.set_city_to_used(city_id=city.id, game_session_id=game.id)
+            if state.next_letter == city_name[0].upper():
+                self.city_engine.play(state, city_id=city_id, next_letter=letter)
+                self.event_log.append(
+                    state.game_id,
+                    CITY,
+                    upd.message.from_.id,
+                    city_id=city_id,
+                    name=city_name,
+                    next_letter=letter,
+                )
+                self.stats.answered(state.game_id, upd.message.from_.id)
 
                 message_right_city = {
                     "type_": "message",
                     "chat_id": upd.message.chat.id,
                     "text": f"{upd.message.from_.username} "
-                    f"{city.name} Есть такой город. Мне на {letter}",
+                    f"{city_name} Есть такой город. Мне на {letter}",
                 }
 
                 await self.rabbitMQ.send_event(
@@ -206,7 +301,7 @@ class CityGameMixin(BaseMixin):
                     "type_": "message",
                     "chat_id": upd.message.chat.id,
                     "text": f"{upd.message.from_.username} "
-                    f"{city.name} на {city.name[0]}, а тебе на {game.next_start_letter}",
+                    f"{city_name} на {city_name[0]}, а тебе на {state.next_letter}",
                 }
 
                 await self.rabbitMQ.send_event(
@@ -214,10 +309,13 @@ class CityGameMixin(BaseMixin):
                 )
 
         else:
+            text = f"{upd.message.from_.username} {upd.message.text} Нет такого города"
+            if suggestion := self.city_engine.index.suggest(upd.message.text.strip("/")):
+                text = f"{text}. Может быть, {suggestion[1]}?"
             message_city_not_found = {
                 "type_": "message",
                 "chat_id": upd.message.chat.id,
-                "text": f"{upd.message.from_.username} {upd.message.text} Нет такого города",
+                "text": text,
             }
 
             await self.rabbitMQ.send_event(
@@ -232,8 +330,40 @@ class CityGameMixin(BaseMixin):
         :return:
         """
         game = await self.words_game.update_game_session(game_id=game_session_id, status=False)
+        state = await self.city_engine.finish(game.chat_id)
+        self.event_log.append(game.id, GAME_FINISHED, winner=True)
         message_loose = {"type_": "message", "chat_id": game.chat_id, "text": "Увы, я проиграл"}
         await self.rabbitMQ.send_event(message=message_loose, routing_key=self.routing_key_sender)
+        await self.save_city_stats(game, state, won=True)
+
+    async def save_city_stats(
+        self,
+        game: GameSession,
+        state: CityGameState | None,
+        won: bool,
+        username: str | None = None,
+    ) -> None:
+        """
+        Статистика игры в города: бот ходит первым, поэтому города игрока -
+        половина использованных городов.
+
+        :param game: завершенная игра
+        :param state: состояние игры из движка, None если игры не было в памяти
+        :param won: игрок победил бота
+        :param username: ник игрока, если известен
+        :return:
+        """
+        if game.creator_id is None:
+            return
+        if username is None and (user := await self.words_game.select_user_by_id(game.creator_id)):
+            username = user.username
+        result = PlayerResult(
+            user_id=game.creator_id,
+            username=username,
+            words=len(state.used) // 2 if state is not None else 0,
+            won=won,
+        )
+        await self.stats.finish(chat_id=game.chat_id, game_id=game.id, results=[result])
 
 
 class WordGameMixin(BaseMixin):
@@ -246,6 +376,11 @@ class WordGameMixin(BaseMixin):
     check_word: Метод для проверки слова игроком.
     right_word: Метод для обработки правильного слова в игре в города.
     words_poll: Метод для обработки голосования за слово в игре в города.
+    open_poll: Метод для начала подсчета голосов опроса.
+    handle_poll: Метод для обработки обновления опроса от Telegram.
+    stop_poll_if_decided: Метод для досрочного завершения опроса с известным итогом.
+    close_poll: Метод для завершения опроса.
+    poll_result: Метод для применения результата опроса к игре.
     stop_game_group: Метод для остановки игры в города для группы игроков.
     """
 
@@ -261,17 +396,25 @@ class WordGameMixin(BaseMixin):
         """
         if await self.words_game.get_session_by_id(chat_id=upd.message.chat.id):
             return
+        settings = self.game_settings
         async with asyncio.Lock():
-            await self.words_game.create_game_session(
+            game = await self.words_game.create_game_session(
                 user_id=upd.message.from_.id,
                 chat_id=upd.message.chat.id,
                 chat_type=upd.message.chat.type,
-                response_time=self.game_settings.response_time,
-                anonymous_poll=self.game_settings.anonymous_poll,
-                poll_time=self.game_settings.poll_time,
-                life=self.game_settings.life,
+                response_time=settings.response_time,
+                anonymous_poll=settings.anonymous_poll,
+                poll_time=settings.poll_time,
+                life=settings.life,
+            )
+        if game is not None:
+            self.event_log.append(
+                game.id,
+                GAME_STARTED,
+                upd.message.from_.id,
+                game_type=game.game_type,
+                life=game.life,
             )
-
 
         message_create_team = {
             "type_": "message_keyboard",
@@ -302,6 +445,9 @@ class WordGameMixin(BaseMixin):
                 user_id=upd.callback_query.from_.id,
                 life=game.life,
             )
+            self.event_log.append(
+                game.id, PLAYER_JOINED, upd.callback_query.from_.id, life=game.life
+            )
             message_add_to_team = {
                 "type_": "callback_alert",
                 "text": f"{upd.callback_query.from_.username} теперь ты в игре",
@@ -349,8 +495,9 @@ class WordGameMixin(BaseMixin):
         game.next_user_id = player_id.id
 
         await self.words_game.change_next_user_to_game_session(
-            game_id=game.id, user_id=player_id.id
+            game_id=game.id, user_id=player_id.id, next_letter=game.next_start_letter
         )
+        self.event_log.append(game.id, NEXT_PLAYER, player_id.id, letter=game.next_start_letter)
 
         text = (
             f"@{player_id.username} назови слово на букву {game.next_start_letter}"
@@ -367,6 +514,7 @@ class WordGameMixin(BaseMixin):
         await self.rabbitMQ.send_event(
             message=message_say_word, routing_key=self.routing_key_sender
         )
+        self.stats.prompt(game.id)
         player_id = await self.words_game.get_player(
             player_id=player_id.id, game_session_id=game.id
         )
@@ -380,20 +528,38 @@ class WordGameMixin(BaseMixin):
 
         await self.rabbitMQ.send_event(
             message=message_slow_player,
-            routing_key=self.routing_key_worker,
+            routing_key=shard_routing_key(self.routing_key_worker, game.chat_id, self.shard.count),
             delay=game.response_time * 1000 if game.response_time else 15000,
         )
 
-    async def check_word(self, upd: UpdateObj) -> None:
+    async def is_noun(self, word: str) -> bool:
+        """
+        Метод проверки слова по локальному словарю, API Яндекс.Словаря
+        вызывается только для слов, которых в нем нет.
+
+        :param word: слово
+        :return: True, если слово - существительное
+        """
+        if self.lexicon is not None and (check := self.lexicon.get(word)) is not None:
+            WORD_CHECKS.labels("lexicon").inc()
+            return check
+        WORD_CHECKS.labels("yandex").inc()
+        return await self.yandex_dict.check_word_(text=word)
+
+    async def check_word(self, upd: UpdateObj, game: GameSession | None = None) -> None:
         """
         Метод проверки слова на существование в словаре или вызове голосования
 
         :param upd:
+        :param game: активная игра чата, если уже прочитана
         :return:
         """
         word = upd.message.text.strip("/").capitalize()
-        game = await self.words_game.get_session_by_id(chat_id=upd.message.chat.id)
+        if game is None:
+            game = await self.words_game.get_session_by_id(chat_id=upd.message.chat.id)
         check = False
+        if game.next_user_id == upd.message.from_.id:
+            self.stats.answered(game.id, upd.message.from_.id)
         if game.next_user_id != upd.message.from_.id:
             """
             Удаление жизни игрока в случае несовпадения id игрока и id текущего игрока
@@ -410,6 +576,7 @@ class WordGameMixin(BaseMixin):
             await self.words_game.remove_life_from_player(
                 game_id=game.id, player_id=upd.message.from_.id
             )
+            self.event_log.append(game.id, LIFE_LOST, upd.message.from_.id, reason="turn")
         elif game.next_start_letter and game.next_start_letter.lower() != word[0].lower():
             """
             Слово не начинается с буквы с которой закончилось прошлое
@@ -423,6 +590,9 @@ class WordGameMixin(BaseMixin):
             await self.rabbitMQ.send_event(
                 message=message_wrong_start_letter, routing_key=self.routing_key_sender
             )
+            self.event_log.append(
+                game.id, WORD_REJECTED, upd.message.from_.id, word=word, reason="letter"
+            )
             return await self.pick_leader(game=game)
         elif word in await self.words_game.get_list_words_by_game_id(game_session_id=game.id):
             """
@@ -436,17 +606,24 @@ class WordGameMixin(BaseMixin):
             await self.rabbitMQ.send_event(
                 message=message_already_word, routing_key=self.routing_key_sender
             )
+            self.event_log.append(
+                game.id, WORD_REJECTED, upd.message.from_.id, word=word, reason="repeat"
+            )
             return await self.pick_leader(game=game)
         else:
             """
-            Проверка слова в словаре
+            Проверка слова по прошлым голосованиям и в словаре
             """
-            check = await self.yandex_dict.check_word_(text=word)
+            verdict = await self.words_game.get_word_verdict(word=word, chat_id=upd.message.chat.id)
+            if verdict is not None:
+                WORD_CHECKS.labels("verdict").inc()
+            check = verdict if verdict is not None else await self.is_noun(word)
 
-            if not check:
+            if not check and verdict is None:
                 """
                 Проверка слова в словаре не удалась, голосование
                 """
+                WORD_CHECKS.labels("poll").inc()
                 await self.words_poll(word=word, game=game, upd=upd)
                 return
         if not check:
@@ -456,6 +633,10 @@ class WordGameMixin(BaseMixin):
             await self.words_game.remove_life_from_player(
                 game_id=game.id, player_id=upd.message.from_.id, round_=1
             )
+            self.event_log.append(
+                game.id, WORD_REJECTED, upd.message.from_.id, word=word, reason="unknown"
+            )
+            self.event_log.append(game.id, LIFE_LOST, upd.message.from_.id, reason="word")
             message_no_word = {
                 "type_": "message",
                 "chat_id": upd.message.chat.id,
@@ -472,7 +653,8 @@ class WordGameMixin(BaseMixin):
 
     async def right_word(self, game: GameSession, word: str):
         """
-        Подтверждение правильного слова и выбор новой первой буквы
+        Подтверждение правильного слова и выбор новой первой буквы.
+        Буква сохраняется вместе со следующим игроком в pick_leader.
 
         :param game: игра
         :param word: слово
@@ -500,8 +682,7 @@ class WordGameMixin(BaseMixin):
         )
 
         await self.words_game.add_used_word(game_session_id=game.id, word=word)
-
-        await self.words_game.update_game_session(game_id=game.id, next_letter=last_letter)
+        self.event_log.append(game.id, WORD, game.next_user_id, word=word, next_letter=last_letter)
 
         game.next_start_letter = last_letter
 
@@ -520,14 +701,149 @@ class WordGameMixin(BaseMixin):
             "type_": "send_poll",
             "chat_id": upd.message.chat.id,
             "question": f"Граждане примем ли мы {word} как допустимое слово?",
-            "options": ["Yes", "No", "Слово?"],
+            "options": [YES, NO, "Слово?"],
             "anonymous": game.anonymous_poll if game.anonymous_poll else False,
             "game_id": game.id,
             "period": game.poll_time if game.poll_time else 10,
+            "word": word,
         }
 
         await self.rabbitMQ.send_event(message=poll_message, routing_key=self.routing_key_sender)
 
+    async def open_poll(self, text: dict) -> None:
+        """
+        Начало подсчета голосов опроса, отправленного Sender.
+        Голоса приходят обновлениями poll от Telegram, таймер завершает опрос,
+        если закрытие опроса не пришло.
+
+        :param text: сообщение poll_id
+        :return:
+        """
+        game = await self.words_game.get_session_by_id(chat_id=text["chat_id"])
+        if game is None:
+            return
+        await self.words_game.update_game_session(game_id=game.id, poll_id=text["poll_id"])
+        if "word" not in text:
+            return
+        tally = PollTally(
+            poll_id=text["poll_id"],
+            chat_id=text["chat_id"],
+            word=text["word"],
+            message_id=text.get("message_id"),
+            anonymous=text.get("anonymous", True),
+            voters=len(await self.words_game.get_team_by_game_id(game_session_id=game.id)),
+        )
+        tally.timer = asyncio.create_task(
+            self._close_poll_later(tally.poll_id, delay=text.get("period", 10) + 2)
+        )
+        self.polls[tally.poll_id] = tally
+
+    async def _close_poll_later(self, poll_id: int, delay: int) -> None:
+        # таймер - не ответ на обновление, открывшее опрос
+        current_trace.set(None)
+        await asyncio.sleep(delay)
+        await self.close_poll(poll_id=poll_id)
+
+    async def handle_poll(self, poll: Poll) -> None:
+        """
+        Обработка обновления опроса: подсчет голосов и завершение закрытого опроса.
+
+        :param poll: опрос
+        :return:
+        """
+        if (tally := self.polls.get(poll.id)) is not None:
+            tally.update(poll)
+        if poll.is_closed:
+            await self.close_poll(poll_id=poll.id, poll=poll)
+        elif tally is not None:
+            await self.stop_poll_if_decided(tally)
+
+    async def stop_poll_if_decided(self, tally: PollTally) -> None:
+        """
+        Досрочное завершение опроса, если оставшиеся игроки уже не изменят итог.
+        Опрос в чате закрывается через Sender, игра продолжается сразу.
+
+        :param tally: подсчет голосов опроса
+        :return:
+        """
+        if tally.decided() is None or tally.poll_id not in self.polls:
+            return
+        if tally.message_id is not None:
+            await self.rabbitMQ.send_event(
+                message={"type_": "stop_poll", "chat_id": tally.chat_id, "message_id": tally.message_id},
+                routing_key=self.routing_key_sender,
+            )
+        await self.close_poll(poll_id=tally.poll_id)
+
+    async def close_poll(self, poll_id: int, poll: Poll | None = None) -> None:
+        """
+        Завершение опроса. Опрос, которого нет в памяти (например, после рестарта),
+        завершается по обновлению Telegram, если игра еще ждет его результата.
+
+        :param poll_id: id опроса
+        :param poll: закрытый опрос из обновления Telegram
+        :return:
+        """
+        tally = self.polls.pop(poll_id, None)
+        if tally is not None and tally.timer is not asyncio.current_task():
+            tally.timer.cancel()
+        if tally is None and poll is None:
+            return
+        game = await self.words_game.get_game_session_by_poll_id(poll_id=poll_id)
+        # закрытый опрос приходит всем шардам, завершает его шард чата игры
+        if game is None or not self.shard.owns(game.chat_id):
+            return
+        if poll is not None:
+            (yes, no), word, anonymous = poll_counts(poll), poll_word(poll), poll.is_anonymous
+        else:
+            yes, no, word, anonymous = tally.yes, tally.no, tally.word, tally.anonymous
+
+        if yes <= no:
+            await self.rabbitMQ.send_event(
+                message={"type_": "message", "chat_id": game.chat_id, "text": f"{word} - нет такого слова"},
+                routing_key=self.routing_key_sender,
+            )
+        await self.poll_result(game=game, word=word, yes=yes, no=no, anonymous=anonymous)
+
+    async def poll_result(
+        self,
+        game: GameSession,
+        word: str,
+        yes: int | None,
+        no: int | None,
+        anonymous: bool,
+        accepted: bool | None = None,
+    ) -> None:
+        """
+        Применение результата опроса: слово засчитывается или ход переходит дальше.
+        В неанонимном опросе учитываются ответы игроков команды.
+
+        :param game: игра
+        :param word: слово
+        :param yes: голосов за
+        :param no: голосов против
+        :param anonymous: анонимный ли опрос
+        :param accepted: готовый результат, если голоса неизвестны
+        :return:
+        """
+        result = None
+        if not anonymous:
+            result = await self.words_game.check_not_anonim_poll(game_session_id=game.id)
+        await self.words_game.update_game_session(game_id=game.id, poll_id=None)
+        if yes is not None and no is not None:
+            await self.words_game.save_word_verdict(
+                word=word, chat_id=game.chat_id, yes=yes, no=no
+            )
+            if accepted is None:
+                accepted = yes > no
+        self.event_log.append(
+            game.id, POLL, word=word, yes=yes, no=no, accepted=bool(accepted or result)
+        )
+        if accepted or result:
+            await self.right_word(game=game, word=word)
+        else:
+            await self.pick_leader(game=game)
+
     async def stop_game_group(
         self, upd: UpdateObj | None = None, game: GameSession | None = None
     ) -> None:
@@ -545,7 +861,11 @@ class WordGameMixin(BaseMixin):
         if not game:
             return
         await self.words_game.update_game_session(game_id=game.id, status=False)
+        self.event_log.append(game.id, GAME_FINISHED)
         await self.words_game.update_total_points_to_user(game_id=game.id)
+        results = await self.words_game.get_game_results(game_session_id=game.id)
+        mark_winner(results)
+        await self.stats.finish(chat_id=game.chat_id, game_id=game.id, results=results)
         await self.statistics(upd=upd, game=game)
 
 
@@ -560,23 +880,37 @@ class Worker(CityGameMixin, WordGameMixin):
     words_game: Объект-аксессор для взаимодействия с сервисом Words Game.
     rabbitMQ: Объект RabbitMQ для связи с другими сервисами.
     yandex_dict: Объект-аксессор для взаимодействия с API Яндекс.Словаря.
+    city_engine: Движок игры в города в памяти.
+    lexicon: Локальный словарь существительных, если указан LEXICON_PATH.
+    polls: Подсчет голосов открытых опросов по id опроса.
+    stats: Статистика игроков и рейтинги чатов.
+    event_log: Журнал ходов игр с записью пачками.
     logger: Объект логгера для записи событий.
     routing_key_worker: Ключ маршрутизации для сообщений рабочего процесса.
     routing_key_sender: Ключ маршрутизации для сообщений отправителя.
     routing_key_poller: Ключ маршрутизации для сообщений опросника.
-    queue_name: Название очереди для прослушивания.
-    game_settings: Объект настроек игры.
+    queue_name: Название очереди для прослушивания, у каждого шарда своя.
+    shard: Шард чатов, которые обрабатывает процесс (Shard).
+    game_settings: Снимок настроек игры (SettingsSnapshot).
+    settings_check_interval: Период сверки версии настроек с хранилищем, секунды.
 
     Список методов для класса Worker:
 
     setup_settings: Метод для настройки настроек игры.
+    apply_settings: Метод для замены снимка настроек более новой версией.
+    setup_city_index: Метод для построения индекса городов в памяти.
+    setup_write_behind: Метод для настройки отложенной записи очков и слов игры.
+    setup_lexicon: Метод для открытия локального словаря существительных.
     handle_update: Метод для обработки входящих сообщений Telegram.
+    owns_update: Метод для проверки, что обновление для чата этого шарда.
     handle_callback: Метод для обработки входящих callback от Telegram.
     handle_poll_answer: Метод для обработки ответа на опрос от Telegram
+    handle_poll: Метод для обработки обновления опроса от Telegram
     on_message: Метод для обработки входящих сообщений от Telegram.
     start: Метод для запуска рабочих процессов и подключения к базе данных и RabbitMQ.
     stop: Метод для остановки рабочих процессов и отключения от RabbitMQ и базы данных.
     statistics: Метод для получения статистики игры.
+    top: Метод для вывода рейтинга игроков чата или общего.
 
     """
 
@@ -585,7 +919,82 @@ class Worker(CityGameMixin, WordGameMixin):
         Инициализация настроек игры.
         :return:
         """
-        self.game_settings = await GameSettings.get_instance(self.database.session)
+        settings = await self.words_game.get_game_settings()
+        self.apply_settings(SettingsSnapshot.from_model(settings))
+
+    def apply_settings(self, snapshot: SettingsSnapshot) -> bool:
+        """
+        Замена снимка настроек. Событие и периодическая сверка могут прийти в любом
+        порядке, поэтому старая или та же версия не применяется.
+
+        :param snapshot: новый снимок настроек
+        :return: снимок заменен
+        """
+        if self.game_settings is not None and self.game_settings.version >= snapshot.version:
+            return False
+        self.game_settings = snapshot
+        SETTINGS_VERSION.set(snapshot.version)
+        self.logger.info(f"settings version {snapshot.version} applied")
+        return True
+
+    async def on_settings_message(self, message: AbstractIncomingMessage):
+        """
+        Событие settings_changed из админки.
+
+        :param message: сообщение с новым снимком настроек
+        :return:
+        """
+        try:
+            self.apply_settings(SettingsSnapshot.from_message(load_message(message)))
+        except (KeyError, TypeError) as e:
+            self.logger.info(f"settings message {e!r}")
+        await message.ack()
+
+    async def _settings_listener(self):
+        """
+        Прослушивание событий настроек: у каждого процесса своя временная очередь,
+        поэтому событие получают все worker, а не один из них.
+        :return:
+        """
+        await self.rabbitMQ.listen_events(
+            on_message_func=self.on_settings_message,
+            routing_key=[SETTINGS_ROUTING_KEY],
+            queue_name=f"{self.queue_name}_settings_{uuid4().hex[:8]}",
+            exclusive=True,
+        )
+
+    async def _settings_watcher(self):
+        """
+        Периодическая сверка версии настроек на случай пропущенного события
+        (worker был отключен от брокера). Читается только номер версии.
+        :return:
+        """
+        while True:
+            await asyncio.sleep(self.settings_check_interval)
+            try:
+                if await self.words_game.get_settings_version() > self.game_settings.version:
+                    await self.setup_settings()
+            except Exception as e:
+                self.logger.warning(f"settings check failed: {e!r}")
+
+    def setup_lexicon(self):
+        """
+        Открытие локального словаря существительных, если он указан в LEXICON_PATH.
+        :return:
+        """
+        if path := self.cfg.lexicon and self.cfg.lexicon.path:
+            try:
+                self.lexicon = Lexicon.open(path)
+                self.logger.info(f"lexicon: {len(self.lexicon)} words from {path}")
+            except (OSError, ValueError) as e:
+                self.logger.error(f"lexicon {path} not loaded: {e}")
+
+    async def setup_city_index(self):
+        """
+        Построение индекса городов в памяти для игры в города.
+        :return:
+        """
+        await self.city_engine.load()
 
     async def _worker_rabbit(self):
         """
@@ -594,48 +1003,87 @@ class Worker(CityGameMixin, WordGameMixin):
         """
         await self.rabbitMQ.listen_events(
             on_message_func=self.on_message,
-            routing_key=[self.routing_key_worker, self.routing_key_poller],
+            routing_key=self.shard.routing_keys(self.routing_key_worker, self.routing_key_poller),
             queue_name=self.queue_name,
         )
 
     async def on_message(self, message: AbstractIncomingMessage):
         """
-        Обработка сообщений из очереди RabbitMQ.
+        Обработка сообщений из очереди RabbitMQ с учетом времени,
+        результата и числа запросов к базе данных по видам сообщений.
 
         :param message:
         :return:
         """
-        if message.routing_key == "poller":
+        kinds = [base_routing_key(message.routing_key)]
+        round_trips = db_round_trips.set([0])
+        if (trace := TraceContext.from_headers(message.headers)) is not None:
+            trace.mark("worker_queue")
+            trace.stage = "worker"
+        trace_token = current_trace.set(trace)
+        started, status = time.perf_counter(), "error"
+        try:
+            await self.dispatch(message, kinds)
+            status = "ok"
+        finally:
+            kind = kinds[-1]
+            MESSAGE_SECONDS.labels(kind).observe(time.perf_counter() - started)
+            MESSAGES.labels(kind, status).inc()
+            MESSAGE_DB_QUERIES.labels(kind).observe(db_round_trips.get()[0])
+            db_round_trips.reset(round_trips)
+            current_trace.reset(trace_token)
+
+    async def dispatch(self, message: AbstractIncomingMessage, kinds: list[str]):
+        """
+        Разбор сообщения из очереди RabbitMQ и вызов обработчика.
+
+        :param message: сообщение
+        :param kinds: вид сообщения дописывается в конец списка, как только он известен
+        :return:
+        """
+        routing_key = base_routing_key(message.routing_key)
+        if routing_key == "poller":
             try:
-                upd: UpdateObj = UpdateObj.Schema().load(bson.loads(message.body))
+                upd: UpdateObj = UpdateObj.Schema().load(load_message(message))
             except ValidationError as e:
                 self.logger.info(f"validation {e}")
                 return
-            if upd.message:
+            if not self.owns_update(upd):
+                kinds.append("other_shard")
+            elif upd.message:
+                kinds.append("message")
                 await self.handle_message(upd)
             elif upd.callback_query:
+                kinds.append("callback_query")
                 await self.handle_callback_query(upd)
             elif upd.poll_answer:
+                kinds.append("poll_answer")
                 await self.handle_poll_answer(upd)
-        elif message.routing_key == self.routing_key_worker:
-            text = bson.loads(message.body)
+            elif upd.poll:
+                kinds.append("poll")
+                await self.handle_poll(upd.poll)
+        elif routing_key == self.routing_key_worker:
+            text = load_message(message)
+            if "chat_id" in text and not self.shard.owns(text["chat_id"]):
+                kinds.append("other_shard")
+                return await message.ack()
+            kinds.append(text["type_"])
             match text["type_"]:
                 case "pick_leader":
                     game = await self.words_game.get_session_by_id(chat_id=text["chat_id"])
                     await self.pick_leader(game=game)
                 case "poll_result":
+                    # результат от Sender для опросов, отправленных до подсчета голосов в воркере
                     game = await self.words_game.get_session_by_id(chat_id=text["chat_id"])
                     if game:
-                        result = None
-                        if not text["poll_type"]:
-                            result = await self.words_game.check_not_anonim_poll(
-                                game_session_id=game.id
-                            )
-                        await self.words_game.update_game_session(game_id=game.id, poll_id=None)
-                        if text["poll_result"] == "yes" or result:
-                            await self.right_word(game=game, word=text["word"])
-                        else:
-                            await self.pick_leader(game=game)
+                        await self.poll_result(
+                            game=game,
+                            word=text["word"],
+                            yes=text.get("yes"),
+                            no=text.get("no"),
+                            anonymous=text["poll_type"],
+                            accepted=text["poll_result"] == "yes",
+                        )
                 case "slow_player":
                     game = await self.words_game.get_session_by_id(chat_id=text["chat_id"])
                     if game is None:
@@ -653,138 +1101,38 @@ class Worker(CityGameMixin, WordGameMixin):
                         await self.words_game.remove_life_from_player(
                             game_id=game.id, player_id=text["user_id"], round_=1
                         )
+                        self.event_log.append(game.id, LIFE_LOST, text["user_id"], reason="slow")
                         await self.pick_leader(game=game)
                 case "poll_id":
-                    game = await self.words_game.get_session_by_id(chat_id=text["chat_id"])
-                    if game:
-                        await self.words_game.update_game_session(
-                            game_id=game.id, poll_id=text["poll_id"]
-                        )
+                    await self.open_poll(text)
                 case _:
                     self.logger.info(f"unknown type {text['type_']}")
         await message.ack()
 
-    async def handle_message(self, upd: UpdateObj):
+    def owns_update(self, upd: UpdateObj) -> bool:
         """
-        Обработка сообщений.
+        Обновление для чата этого шарда. Роутинг ключ poller уже выбирает шард,
+        проверка защищает от двойной обработки, если у poller другое WORKER_PROCESSES.
+        poll и poll_answer без чата приходят всем шардам и проверяются по игре опроса.
 
         :param upd: Объект обновления.
         :return:
         """
+        if upd.message:
+            return self.shard.owns(upd.message.chat.id)
+        if upd.callback_query:
+            return self.shard.owns(upd.callback_query.message.chat.id)
+        return True
 
-        async def handle_ping(self, upd: UpdateObj):
-            """Обработка команды /ping.
-
-            :param self: Экземпляр класса.
-            :param upd: Объект обновления.
-            :return:
-            """
-
-            message_ping = {
-                "type_": "message",
-                "chat_id": upd.message.chat.id,
-                "text": "/pong",
-            }
-
-            await self.rabbitMQ.send_event(
-                message=message_ping, routing_key=self.routing_key_sender
-            )
-
-        async def handle_help(self, upd: UpdateObj):
-            """Обработка команды /help.
-
-            :param self: Экземпляр класса.
-            :param upd: Объект обновления.
-            :return:
-            """
-
-            message_help = {
-                "type_": "message",
-                "chat_id": upd.message.chat.id,
-                "text": help_msg,
-            }
-            await self.rabbitMQ.send_event(
-                message=message_help, routing_key=self.routing_key_sender
-            )
-
-        async def handle_last(self, upd: UpdateObj):
-            """Обработка команды /last.
-
-            :param self: Экземпляр класса.
-            :param upd: Объект обновления.
-            :return:
-            """
-
-            game = await self.words_game.get_session_by_id(chat_id=upd.message.chat.id)
-            if game is None:
-                message_last_letter = {
-                    "type_": "message",
-                    "chat_id": upd.message.chat.id,
-                    "text": "Игра не начата",
-                }
-            else:
-                if upd.message.chat.type != "private":
-                    thing = "Слово"
-                else:
-                    thing = "Город"
-                message_last_letter = {
-                    "type_": "message",
-                    "chat_id": upd.message.chat.id,
-                    "text": f"{thing} на букву {game.next_start_letter}",
-                }
-
-            await self.rabbitMQ.send_event(
-                message=message_last_letter, routing_key=self.routing_key_sender
-            )
-
-        async def handle_faq(self, upd: UpdateObj):
-            """Обработка команды /faq.
-            :param self: Экземпляр класса.
-            :param upd: Объект обновления.
-            :return:
-            """
-            if upd.message.chat.type != "private":
-                await self.rabbitMQ.send_event(
-                    message={
-                        "type_": "message",
-                        "chat_id": upd.message.chat.id,
-                        "text": faq_group.format(response=self.game_settings.response_time, life=3),
-                    },
-                    routing_key=self.routing_key_sender,
-                )
-            else:
-                await self.rabbitMQ.send_event(
-                    message={"type_": "message", "chat_id": upd.message.chat.id, "text": faq_solo},
-                    routing_key=self.routing_key_sender,
-                )
+    async def handle_message(self, upd: UpdateObj):
+        """
+        Обработка сообщений: команда или ход в игре, маршруты - router в конце модуля.
 
+        :param upd: Объект обновления.
+        :return:
+        """
         try:
-            match upd.message.text.split("@")[0]:
-                case "/play" if upd.message.chat.type == "private":
-                    await self.start_game(upd=upd)
-                case "/play" if upd.message.chat.type != "private":
-                    await self.chose_your_team(upd)
-                case "/stop" if upd.message.chat.type == "private":
-                    await self.stop_game(upd=upd)
-                case "/stop":
-                    await self.stop_game_group(upd=upd)
-                case "/ping":
-                    await handle_ping(self, upd)
-                case "/help" if upd.message.chat.type != "private":
-                    await handle_help(self, upd)
-                case "/last" if upd.message.chat.type == "private":
-                    await handle_last(self, upd)
-
-                case "/stat":
-                    await self.statistics(upd=upd)
-                case "/faq":
-                    await handle_faq(self, upd=upd)
-                case _ if upd.message.chat.type != "private" and await self.words_game.get_session_by_id(
-                    chat_id=upd.message.chat.id
-                ):
-                    await self.check_word(upd=upd)
-                case _ if await self.words_game.get_session_by_id(chat_id=upd.message.from_.id):
-                    await self.check_city(upd=upd)
+            await router.dispatch(self, upd)
         except IntegrityError as e:
             self.logger.info(f"message {e}")
 
@@ -808,12 +1156,19 @@ class Worker(CityGameMixin, WordGameMixin):
         """
         Метод start для запуска рабочих процессов и подключения к базе данных и RabbitMQ.
         """
-        await self.database.connect()
+        if self.database is not None:
+            await self.database.connect()
         await self.rabbitMQ.connect()
         await self.setup_settings()
+        await self.setup_city_index()
+        self.setup_lexicon()
+        await self.city_engine.start()
+        await self.event_log.start()
         self._tasks = [
             asyncio.create_task(self._worker_rabbit()) for _ in range(self.concurrent_workers)
         ]
+        self._tasks.append(asyncio.create_task(self._settings_listener()))
+        self._tasks.append(asyncio.create_task(self._settings_watcher()))
 
     async def stop(self):
         """
@@ -821,8 +1176,17 @@ class Worker(CityGameMixin, WordGameMixin):
         """
         for t in self._tasks:
             t.cancel()
+        for tally in self.polls.values():
+            tally.timer.cancel()
+        await self.city_engine.stop()
+        await self.event_log.stop()
+        await self.words_game.flush()
         await self.rabbitMQ.disconnect()
-        await self.database.disconnect()
+        if self.database is not None:
+            await self.database.disconnect()
+        if self.lexicon is not None:
+            self.lexicon.close()
+            self.lexicon = None
 
     async def statistics(self, upd, game: GameSession | None = None):
         """
@@ -878,6 +1242,36 @@ class Worker(CityGameMixin, WordGameMixin):
                 message=message_no_team, routing_key=self.routing_key_sender
             )
 
+    async def top(self, upd: UpdateObj, limit: int = 10):
+        """
+        Рейтинг игроков: в группе - рейтинг чата, в личном чате и по /top all - общий.
+        Рейтинг берется из памяти, место игрока - бинарный поиск.
+
+        :param upd: Объект обновления.
+        :param limit: Количество строк рейтинга.
+        :return:
+        """
+        chat_id = upd.message.chat.id
+        scope = chat_id
+        if upd.message.chat.type == "private" or upd.message.text.split()[1:2] == ["all"]:
+            scope = GLOBAL_CHAT
+        board = await self.stats.board(scope)
+        lines = [
+            f"{place}. @{entry.username} - {entry.words}, побед {entry.wins}"
+            for place, entry in enumerate(board.top(limit), start=1)
+        ]
+        if not lines:
+            text = "Рейтинг пуст"
+        else:
+            title = "Рейтинг чата" if scope != GLOBAL_CHAT else "Общий рейтинг"
+            text = "\n".join([f"{title}:", *lines])
+            if (place := board.rank(upd.message.from_.id)) is not None and place > limit:
+                text = f"{text}\nТвое место: {place} из {len(board)}"
+        await self.rabbitMQ.send_event(
+            message={"type_": "message", "chat_id": chat_id, "text": text},
+            routing_key=self.routing_key_sender,
+        )
+
     async def handle_poll_answer(self, upd: UpdateObj):
         """
         Обработка ответа на опрос.
@@ -887,7 +1281,7 @@ class Worker(CityGameMixin, WordGameMixin):
         poll_id = upd.poll_answer.poll_id
         player_id = upd.poll_answer.user.id
         game = await self.words_game.get_game_session_by_poll_id(poll_id=poll_id)
-        if game:
+        if game and self.shard.owns(game.chat_id):
             if upd.poll_answer.option_ids:
                 answer = {0: True, 1: False}.get(upd.poll_answer.option_ids[0], None)
             else:
@@ -896,3 +1290,93 @@ class Worker(CityGameMixin, WordGameMixin):
             await self.words_game.set_player_poll_answer(
                 player_id=player_id, game_session_id=game.id, answer=answer
             )
+            if (tally := self.polls.get(poll_id)) is not None:
+                tally.answer(player_id, answer)
+                await self.stop_poll_if_decided(tally)
+
+
+router = CommandRouter()
+
+
+@router.command("/play", chats=(PRIVATE,))
+async def play_city(worker: Worker, context: UpdateContext) -> None:
+    await worker.start_game(upd=context.upd)
+
+
+@router.command("/play", chats=(GROUP,))
+async def play_words(worker: Worker, context: UpdateContext) -> None:
+    await worker.chose_your_team(context.upd)
+
+
+@router.command("/stop", chats=(PRIVATE,))
+async def stop_city(worker: Worker, context: UpdateContext) -> None:
+    await worker.stop_game(upd=context.upd)
+
+
+@router.command("/stop", chats=(GROUP,))
+async def stop_words(worker: Worker, context: UpdateContext) -> None:
+    await worker.stop_game_group(upd=context.upd)
+
+
+@router.command("/ping")
+async def ping(worker: Worker, context: UpdateContext) -> None:
+    await worker.rabbitMQ.send_event(
+        message={"type_": "message", "chat_id": context.chat_id, "text": "/pong"},
+        routing_key=worker.routing_key_sender,
+    )
+
+
+@router.command("/help", chats=(GROUP,))
+async def help_(worker: Worker, context: UpdateContext) -> None:
+    await worker.rabbitMQ.send_event(
+        message={"type_": "message", "chat_id": context.chat_id, "text": help_msg},
+        routing_key=worker.routing_key_sender,
+    )
+
+
+@router.command("/last", chats=(PRIVATE,))
+async def last_letter(worker: Worker, context: UpdateContext) -> None:
+    state = await context.city()
+    text = "Игра не начата" if state is None else f"Город на букву {state.next_letter}"
+    await worker.rabbitMQ.send_event(
+        message={"type_": "message", "chat_id": context.chat_id, "text": text},
+        routing_key=worker.routing_key_sender,
+    )
+
+
+@router.command("/level", chats=(PRIVATE,), args=True)
+async def level(worker: Worker, context: UpdateContext) -> None:
+    await worker.set_level(upd=context.upd)
+
+
+@router.command("/stat")
+async def stat(worker: Worker, context: UpdateContext) -> None:
+    await worker.statistics(upd=context.upd)
+
+
+@router.command("/top", args=True)
+async def top(worker: Worker, context: UpdateContext) -> None:
+    await worker.top(upd=context.upd)
+
+
+@router.command("/faq")
+async def faq(worker: Worker, context: UpdateContext) -> None:
+    if context.chat == GROUP:
+        text = faq_group.format(response=worker.game_settings.response_time, life=3)
+    else:
+        text = faq_solo
+    await worker.rabbitMQ.send_event(
+        message={"type_": "message", "chat_id": context.chat_id, "text": text},
+        routing_key=worker.routing_key_sender,
+    )
+
+
+@router.move("word", guard=UpdateContext.game, chats=(GROUP,))
+async def word_move(worker: Worker, context: UpdateContext) -> None:
+    await worker.check_word(upd=context.upd, game=await context.game())
+
+
+# игра в города идет в личном чате игрока: его шард и держит состояние игры
+@router.move("city", guard=UpdateContext.city, chats=(PRIVATE,))
+async def city_move(worker: Worker, context: UpdateContext) -> None:
+    await worker.check_city(upd=context.upd)
@@ -0,0 +1,107 @@
+"""
+Бенчмарк нечеткого поиска городов CityIndex.
+
+Запуск:
+    python -m bench.bench_city_index
+    python -m bench.bench_city_index --synthetic 1000000 --queries 2000
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+from pathlib import Path
+
+from app.store.words_game.city_index import CityIndex
+
+CITY_SQL = Path(__file__).resolve().parent.parent / "app" / "store" / "database" / "city.sql"
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщэюя"
+
+
+def load_cities() -> list[tuple[int, str]]:
+    """
+    Список городов из app/store/database/city.sql в порядке вставки (id = номер строки).
+    """
+    names = re.findall(r"values \('(.*)'\);", CITY_SQL.read_text(encoding="utf-8"))
+    return [(city_id, name) for city_id, name in enumerate(names, start=1) if name]
+
+
+def synthetic_cities(cities: list[tuple[int, str]], size: int, seed: int = 1) -> list[tuple[int, str]]:
+    """
+    Синтетический набор: реальные названия плюс склейки частей и случайные замены букв.
+    """
+    rnd = random.Random(seed)
+    names = [name for _, name in cities]
+    result = list(cities)
+    while len(result) < size:
+        left, right = rnd.choice(names), rnd.choice(names)
+        name = left[: rnd.randint(2, max(2, len(left)))] + right[rnd.randint(0, len(right) // 2) :]
+        if rnd.random() < 0.5:
+            pos = rnd.randrange(len(name))
+            name = name[:pos] + rnd.choice(ALPHABET) + name[pos + 1 :]
+        result.append((len(result) + 1, name.capitalize()))
+    return result
+
+
+def misspell(name: str, rnd: random.Random) -> str:
+    """
+    Одна случайная опечатка: замена, вставка, удаление или перестановка.
+    """
+    pos = rnd.randrange(len(name))
+    match rnd.randrange(4):
+        case 0:
+            return name[:pos] + rnd.choice(ALPHABET) + name[pos + 1 :]
+        case 1:
+            return name[:pos] + rnd.choice(ALPHABET) + name[pos:]
+        case 2 if len(name) > 4:
+            return name[:pos] + name[pos + 1 :]
+        case _ if pos + 1 < len(name):
+            return name[:pos] + name[pos + 1] + name[pos] + name[pos + 2 :]
+    return name + rnd.choice(ALPHABET)
+
+
+def run(label: str, cities: list[tuple[int, str]], queries: int, seed: int = 2) -> None:
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+    index = CityIndex.build(cities)
+    build_time = time.perf_counter() - started
+
+    sample = [name for _, name in rnd.sample(cities, queries) if len(name) > 3]
+    typos = [misspell(name, rnd) for name in sample]
+
+    timings = {"exact": [], "typo": []}
+    found = 0
+    for name, typo in zip(sample, typos):
+        started = time.perf_counter()
+        index.get(name)
+        timings["exact"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        found += index.suggest(typo) is not None
+        timings["typo"].append(time.perf_counter() - started)
+
+    print(f"{label}: {len(index)} names, build {build_time:.2f}s")
+    for kind, values in timings.items():
+        values.sort()
+        print(
+            f"  {kind:<5} mean {statistics.mean(values) * 1e6:8.1f}us"
+            f"  p50 {values[len(values) // 2] * 1e6:8.1f}us"
+            f"  p99 {values[int(len(values) * 0.99)] * 1e6:8.1f}us"
+        )
+    print(f"  typo suggestions found: {found}/{len(typos)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--synthetic", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    cities = load_cities()
+    run("city.sql", cities, args.queries)
+    if args.synthetic:
+        run(f"synthetic {args.synthetic}", synthetic_cities(cities, args.synthetic), args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Бенчмарк выгрузки игроков: пиковая память и время для выгрузки частями
+(как /players/export) и для выборки всех строк сразу (как /players без параметров).
+
+По умолчанию SQLite в памяти, с --driver postgresql+asyncpg - PostgreSQL из .env.
+
+Запуск:
+    python -m bench.bench_export --rows 10000 100000 300000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from sqlalchemy import delete, insert, select
+
+from app.store.database.database import Database
+from app.web.config import DatabaseConfig, config
+from app.words_game.export import export_rows, players_query
+from app.words_game.models import User
+from app.words_game.schemes import UserSchema
+
+BASE_ID = 800_000_000
+
+
+async def fill(database: Database, rows: int, batch: int = 50_000) -> None:
+    await database.execute_query(delete(User).where(User.id >= BASE_ID))
+    async with database.session() as session:
+        for start in range(0, rows, batch):
+            values = [
+                {"id": BASE_ID + num, "username": f"user{num}", "total_point": num % 100}
+                for num in range(start, min(start + batch, rows))
+            ]
+            await session.execute(insert(User), values)
+        await session.commit()
+
+
+async def streamed(database: Database, fmt: str) -> int:
+    size = 0
+    async for chunk in export_rows(database, players_query(), fmt):
+        size += len(chunk)
+    return size
+
+
+async def all_at_once(database: Database) -> int:
+    users = (await database.execute_query(select(User).order_by(User.id))).scalars().all()
+    return len(json.dumps({"users": [UserSchema().dump(user) for user in users]}))
+
+
+async def measure(label: str, coro) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await coro
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<14} {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB  {size / 2**20:8.1f} MiB out")
+
+
+async def run(args) -> None:
+    if args.driver.startswith("sqlite"):
+        db_config = DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver=args.driver
+        )
+    else:
+        db_config = config.database
+    database = Database(cfg=SimpleNamespace(database=db_config))
+    await database.connect()
+    try:
+        for rows in args.rows:
+            await fill(database, rows)
+            print(f"{args.driver}: {rows} players")
+            await measure("export ndjson", streamed(database, "ndjson"))
+            await measure("export csv", streamed(database, "csv"))
+            await measure("select all", all_at_once(database))
+        await database.execute_query(delete(User).where(User.id >= BASE_ID))
+    finally:
+        await database.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--driver", default="sqlite+aiosqlite")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
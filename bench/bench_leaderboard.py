@@ -0,0 +1,57 @@
+"""
+Бенчмарк рейтинга: обновление строки игрока и место игрока в Leaderboard
+против сортировки всех строк на каждый запрос, как при подсчете из сырых таблиц.
+
+Запуск:
+    python -m bench.bench_leaderboard --players 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from app.store.words_game.leaderboard import LeaderEntry, Leaderboard, PlayerResult
+
+
+def measure(label: str, func, repeat: int) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"  {label:<18} {elapsed * 1e6:10.1f} us")
+
+
+def run(players: int, repeat: int) -> None:
+    entries = [
+        LeaderEntry(user_id=num, username=f"user{num}", words=random.randrange(1000), wins=random.randrange(50))
+        for num in range(players)
+    ]
+    started = time.perf_counter()
+    board = Leaderboard.build(entries)
+    print(f"{players} players, build {time.perf_counter() - started:.2f}s")
+
+    def update():
+        board.add(PlayerResult(user_id=random.randrange(players), words=random.randrange(10)))
+
+    def rank():
+        board.rank(random.randrange(players))
+
+    def sort_top():
+        sorted(board.entries.values(), key=lambda entry: entry.key)[:10]
+
+    measure("add", update, repeat)
+    measure("rank", rank, repeat)
+    measure("top 10", lambda: board.top(10), repeat)
+    measure("sort all, top 10", sort_top, max(1, repeat // 100))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+    for players in args.players:
+        run(players, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Бенчмарк поиска в словаре существительных Lexicon.
+
+Запуск:
+    python -m bench.bench_lexicon
+    python -m bench.bench_lexicon --words words.txt --queries 20000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.store.lexicon.dawg import Lexicon, build_dawg, read_word_list
+
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщэюя"
+ENDINGS = ("", "а", "ы", "ов", "ам", "ами", "ах", "ость", "ник", "ка")
+
+
+def synthetic_words(size: int, seed: int = 1) -> list[tuple[str, bool]]:
+    """
+    Синтетический список: случайные основы с общими окончаниями, как у словоформ.
+    """
+    rnd = random.Random(seed)
+    words: dict[str, bool] = {}
+    while len(words) < size:
+        stem = "".join(rnd.choice(ALPHABET) for _ in range(rnd.randint(3, 8)))
+        is_noun = rnd.random() < 0.7
+        for ending in ENDINGS:
+            words.setdefault(stem + ending, is_noun)
+    return list(words.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=Path, default=None)
+    parser.add_argument("--synthetic", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    words = list(read_word_list(args.words)) if args.words else synthetic_words(args.synthetic)
+    started = time.perf_counter()
+    data = build_dawg(words)
+    build_time = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lexicon.dawg"
+        path.write_bytes(data)
+        lexicon = Lexicon.open(path)
+
+        rnd = random.Random(2)
+        known = [word for word, _ in rnd.sample(words, min(args.queries, len(words)))]
+        unknown = [word + rnd.choice(ALPHABET) + rnd.choice(ALPHABET) for word in known]
+
+        print(
+            f"{len(lexicon)} words, {len(lexicon.nodes) // 3} nodes, "
+            f"{len(data) / 1024 / 1024:.1f} MiB, build {build_time:.1f}s"
+        )
+        for label, queries in (("known", known), ("unknown", unknown)):
+            timings = []
+            for word in queries:
+                started = time.perf_counter()
+                lexicon.get(word)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            print(
+                f"  {label:<7} mean {statistics.mean(timings) * 1e6:6.2f}us"
+                f"  p50 {timings[len(timings) // 2] * 1e6:6.2f}us"
+                f"  p99 {timings[int(len(timings) * 0.99)] * 1e6:6.2f}us"
+            )
+        lexicon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Нагрузочный тест: N одиночных игр в города и M групповых игр в слова по K игроков
+проходят через poller -> worker -> sender против локальной имитации Bot API.
+
+Нужен PostgreSQL из .env (например, из docker-compose) и RabbitMQ, если не указан
+--broker memory; Telegram заменяется bench.fake_bot_api. Результат пишется в JSON,
+чтобы сравнивать прогоны между коммитами.
+
+Запуск:
+    PYTHONPATH=.:app/worker_app:app/sender_app:app/poller_app python -m bench.bench_load
+    ... python -m bench.bench_load --cities 20 --groups 10 --players 4 --words 15 --latency 0.05
+    ... python -m bench.bench_load --broker memory
+    ... python -m bench.bench_load --compare bench/results/load-<commit>.json
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import statistics
+import subprocess
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+
+from aiohttp import web
+
+from app.poller_app.poller import Poller
+from app.sender_app.sender import Sender
+from app.store.database.database import DB_QUERY_SECONDS
+from app.store.rabbitMQ.memory import MemoryBroker
+from app.web.config import TgConfig, config
+from app.worker_app.worker import Worker
+from bench.bench_city_index import load_cities
+from bench.fake_bot_api import FakeBotApi, FakeBotApiConfig, group_game
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def chat_of(update: dict) -> int | None:
+    if message := update.get("message"):
+        return message["chat"]["id"]
+    if callback := update.get("callback_query"):
+        return callback["message"]["chat"]["id"]
+    return None
+
+
+class LoadBotApi(FakeBotApi):
+    """
+    Имитация Bot API, которая измеряет задержку ответа: время от появления обновления
+    в getUpdates до следующего сообщения бота в тот же чат. На опросы отвечают игроки чата.
+    """
+
+    def __init__(self, config: FakeBotApiConfig, seed: int | None, vote_delay: float):
+        super().__init__(config, seed)
+        self.vote_delay = vote_delay
+        self.waiting: dict[int, deque[float]] = defaultdict(deque)
+        self.latencies: list[float] = []
+        self.players: dict[int, list[int]] = {}
+        self.pushed = 0
+        self.last_sent = time.perf_counter()
+        self.votes: set[asyncio.Task] = set()
+
+    def push_update(self, update: dict) -> int:
+        if (chat_id := chat_of(update)) is not None:
+            self.waiting[chat_id].append(time.perf_counter())
+        self.pushed += 1
+        return super().push_update(update)
+
+    def record_sent(self, method: str, payload: dict) -> None:
+        super().record_sent(method, payload)
+        self.last_sent = now = time.perf_counter()
+        if (chat_id := payload.get("chat_id")) is not None:
+            waiting = self.waiting.get(int(chat_id))
+            while waiting:
+                self.latencies.append(now - waiting.popleft())
+
+    def send_poll(self, payload: dict) -> dict:
+        body = super().send_poll(payload)
+        players = self.players.get(int(payload["chat_id"]), [])
+        task = asyncio.create_task(self.vote(body["result"]["poll"]["id"], players))
+        self.votes.add(task)
+        task.add_done_callback(self.votes.discard)
+        return body
+
+    async def vote(self, poll_id: int, players: list[int]) -> None:
+        for player in players:
+            await asyncio.sleep(self.vote_delay)
+            answer = self.poll_answer(poll_id, player, self.random.choice((0, 0, 1)))
+            if self.polls[poll_id]["is_anonymous"]:
+                # по анонимным опросам Telegram присылает только состояние опроса
+                self.push_update({"poll": dict(self.polls[poll_id])})
+            else:
+                self.push_update(answer)
+
+
+def city_game(api: FakeBotApi, user_id: int, moves: int, pause: float, cities: list[str]):
+    script = [(0.0, api.message(user_id, user_id, "/play"))]
+    script += [(pause, api.message(user_id, user_id, api.random.choice(cities))) for _ in range(moves)]
+    script.append((pause, api.message(user_id, user_id, "/stop")))
+    return script
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def db_queries() -> int:
+    return sum(child.count for child in DB_QUERY_SECONDS.children.values())
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def drain(api: LoadBotApi, idle: float) -> None:
+    """
+    Ожидание, пока бот не перестанет отправлять сообщения в течение idle секунд.
+    """
+    while time.perf_counter() - api.last_sent < idle or api.votes:
+        await asyncio.sleep(0.1)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    api = LoadBotApi(
+        FakeBotApiConfig(latency=args.latency, retry_rate=args.retry_rate, chat_rate=args.chat_rate),
+        seed=args.seed,
+        vote_delay=args.pause / 2,
+    )
+    runner = web.AppRunner(api.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host="127.0.0.1", port=args.port).start()
+
+    cfg = dataclasses.replace(
+        config,
+        tg_token=TgConfig(tg_token=config.tg_token.tg_token, api_url=f"http://127.0.0.1:{args.port}"),
+    )
+    broker = MemoryBroker() if args.broker == "memory" else None
+    worker = Worker(cfg=cfg, concurrent_workers=args.workers, broker=broker)
+    sender = Sender(cfg, concurrent_workers=args.workers, broker=broker)
+    poller = Poller(cfg=cfg, timeout=1, broker=broker)
+
+    cities = [name for _, name in load_cities()]
+    scripts = [city_game(api, 10_000 + n, args.words, args.pause, cities) for n in range(args.cities)]
+    for n in range(args.groups):
+        chat_id = -10_000 - n
+        players = list(range(20_000 + n * args.players, 20_000 + (n + 1) * args.players))
+        api.players[chat_id] = players
+        scripts.append(group_game(chat_id, players, args.words, args.pause, api.random, args.slow))
+
+    await worker.start()
+    await sender.start()
+    await poller.start()
+    queries = db_queries()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(api.feed(script) for script in scripts))
+        await drain(api, args.drain)
+        elapsed = time.perf_counter() - started - args.drain
+    finally:
+        await poller.stop()
+        await sender.stop()
+        await worker.stop()
+        await runner.cleanup()
+
+    calls = sum(count for method, count in api.requests.items() if method != "getUpdates")
+    latencies = api.latencies
+    return {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "updates": api.pushed,
+        "updates_per_second": api.pushed / elapsed,
+        "replies": len(latencies),
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+        "latency_mean": statistics.mean(latencies) if latencies else None,
+        "db_queries_per_update": (db_queries() - queries) / max(api.pushed, 1),
+        "tg_calls_per_update": calls / max(api.pushed, 1),
+        "tg_429": sum(count for (_, status), count in api.responses.items() if status == 429),
+    }
+
+
+def compare(result: dict, previous: dict) -> None:
+    print(f"compared with {previous['commit']} ({previous['date']}):")
+    for key, value in result.items():
+        old = previous.get(key)
+        if isinstance(value, float) and isinstance(old, (int, float)) and old:
+            print(f"  {key:<24} {old:10.4f} -> {value:10.4f}  ({(value - old) / old * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=10, help="одиночных игр в города")
+    parser.add_argument("--groups", type=int, default=5, help="групповых игр в слова")
+    parser.add_argument("--players", type=int, default=3, help="игроков в группе")
+    parser.add_argument("--words", type=int, default=10, help="ходов в каждой игре")
+    parser.add_argument("--pause", type=float, default=1.0, help="пауза между ходами, секунды")
+    parser.add_argument("--slow", type=float, default=0.1, help="доля пропущенных ходов")
+    parser.add_argument("--latency", type=float, default=0.03, help="задержка Bot API, секунды")
+    parser.add_argument("--retry-rate", type=float, default=0.0)
+    parser.add_argument("--chat-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--broker", choices=("rabbitmq", "memory"), default="rabbitmq")
+    parser.add_argument("--drain", type=float, default=5.0, help="ожидание тишины в конце, секунды")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    for key in ("updates", "updates_per_second", "replies", "latency_p50", "latency_p95",
+                "latency_p99", "db_queries_per_update", "tg_calls_per_update", "tg_429"):
+        print(f"  {key:<24} {result[key]}")
+
+    output = args.output or RESULTS_DIR / f"load-{result['commit']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+    print(f"saved {output}")
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Бенчмарк накладных расходов метрик на горячем пути.
+
+Запуск:
+    python -m bench.bench_metrics
+    python -m bench.bench_metrics --iterations 500000
+"""
+import argparse
+import time
+
+from app.store.metrics import Counter, Histogram, Registry
+
+
+def measure(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = Counter("bench_total", "Bench", ("kind", "status"), registry=registry)
+    histogram = Histogram("bench_seconds", "Bench", ("kind",), registry=registry)
+    child = histogram.labels("message")
+
+    cases = (
+        ("empty call", lambda: None),
+        ("counter.labels().inc()", lambda: counter.labels("message", "ok").inc()),
+        ("histogram.labels().observe()", lambda: histogram.labels("message").observe(0.003)),
+        ("cached child observe()", lambda: child.observe(0.003)),
+        ("perf_counter + observe", lambda: child.observe(time.perf_counter())),
+    )
+    for label, func in cases:
+        print(f"  {label:<30} {measure(func, args.iterations) * 1e9:7.0f}ns")
+
+    started = time.perf_counter()
+    text = registry.expose()
+    print(f"  expose {len(text)} bytes in {(time.perf_counter() - started) * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Бенчмарк страниц списка игровых сессий: LIMIT/OFFSET и count(id) против курсора по id.
+
+По умолчанию SQLite в памяти, с --driver postgresql+asyncpg - PostgreSQL из .env
+(в game_sessions добавляются строки, --rows 0 - без заполнения).
+
+Запуск:
+    python -m bench.bench_pagination
+    python -m bench.bench_pagination --rows 1000000 --pages 1 100 10000 --driver postgresql+asyncpg
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert, select
+
+from app.store.database.database import Database
+from app.web.config import DatabaseConfig, config
+from app.web.pagination import ApproximateCount, encode_cursor, keyset_page
+from app.words_game.models import GameSession
+
+
+async def fill(database: Database, rows: int, batch: int = 50_000) -> None:
+    async with database.session() as session:
+        for start in range(0, rows, batch):
+            values = [
+                {"game_type": "group", "chat_id": -num, "is_active": False}
+                for num in range(start, min(start + batch, rows))
+            ]
+            await session.execute(insert(GameSession), values)
+        await session.commit()
+
+
+async def timed(coro_factory, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(args) -> None:
+    if args.driver.startswith("sqlite"):
+        db_config = DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver=args.driver
+        )
+    else:
+        db_config = config.database
+    database = Database(cfg=SimpleNamespace(database=db_config))
+    await database.connect()
+    try:
+        started = time.perf_counter()
+        await fill(database, args.rows)
+        total = (await database.execute_query(select(func.count(GameSession.id)))).scalar()
+        print(f"{args.driver}: {total} game sessions, fill {time.perf_counter() - started:.1f}s")
+
+        first_id = (await database.execute_query(select(func.min(GameSession.id)))).scalar()
+        totals = ApproximateCount()
+        per_page = args.per_page
+
+        async def offset_page(page: int):
+            query = (
+                select(GameSession)
+                .order_by(GameSession.id)
+                .limit(per_page)
+                .offset((page - 1) * per_page)
+            )
+            await database.execute_query(query)
+            await database.execute_query(select(func.count(GameSession.id)))
+
+        async def cursor_page(page: int):
+            # курсор, который клиент получил бы на предыдущей странице
+            after = encode_cursor(first_id + (page - 1) * per_page - 1) if page > 1 else None
+            await keyset_page(database, GameSession, per_page, after=after)
+            await totals.get(database, GameSession)
+
+        for page in args.pages:
+            for label, factory in (("offset+count", offset_page), ("cursor", cursor_page)):
+                values = sorted(await timed(lambda: factory(page), args.repeat))
+                print(
+                    f"  page {page:>6} {label:<12} mean {statistics.mean(values) * 1e3:8.2f}ms"
+                    f"  p50 {values[len(values) // 2] * 1e3:8.2f}ms"
+                    f"  max {values[-1] * 1e3:8.2f}ms"
+                )
+    finally:
+        await database.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--driver", default="sqlite+aiosqlite")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Бенчмарк разбора сообщений worker: CommandRouter против прежнего handle_message
+(вложенные функции на каждый вызов и match с условиями). Обработчики и хранилище -
+заглушки без работы, поэтому измеряется только сам разбор.
+
+Роутер дороже на время метрик и UpdateContext (около микросекунды), зато ход в игре
+в слова читает игру чата один раз вместо двух (get_session_by_id - два запроса к базе).
+
+Запуск (каталог app/worker_app должен быть в PYTHONPATH, как у worker):
+    PYTHONPATH=.:app/worker_app python -m bench.bench_router --iterations 100000
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from router import GROUP, PRIVATE, CommandRouter, UpdateContext
+
+from app.store.tg_api.schemes import UpdateObj
+
+TEXTS = (
+    ("/play", "private"),
+    ("/stop@words_bot", "group"),
+    ("/top all", "group"),
+    ("/level hard", "private"),
+    ("/faq", "private"),
+    ("Арбуз", "group"),
+    ("Москва", "private"),
+)
+
+
+class Stub:
+    """
+    Worker и хранилище без работы: любая корутина возвращает объект игры.
+    """
+
+    game = SimpleNamespace(id=1, next_letter="А")
+
+    def __getattr__(self, name):
+        async def method(*args, **kwargs):
+            return self.game
+
+        return method
+
+
+async def legacy(worker, upd: UpdateObj) -> None:
+    # копия handle_message до CommandRouter, обработчики команд - заглушки
+    async def handle_ping(self, upd):
+        await self.send(upd)
+
+    async def handle_help(self, upd):
+        await self.send(upd)
+
+    async def handle_last(self, upd):
+        await self.send(upd)
+
+    async def handle_faq(self, upd):
+        await self.send(upd)
+
+    match upd.message.text.split("@")[0]:
+        case "/play" if upd.message.chat.type == "private":
+            await worker.start_game(upd=upd)
+        case "/play" if upd.message.chat.type != "private":
+            await worker.chose_your_team(upd)
+        case "/stop" if upd.message.chat.type == "private":
+            await worker.stop_game(upd=upd)
+        case "/stop":
+            await worker.stop_game_group(upd=upd)
+        case "/ping":
+            await handle_ping(worker, upd)
+        case "/help" if upd.message.chat.type != "private":
+            await handle_help(worker, upd)
+        case "/last" if upd.message.chat.type == "private":
+            await handle_last(worker, upd)
+        case text if text.split()[0] == "/level" and upd.message.chat.type == "private":
+            await worker.set_level(upd=upd)
+        case "/stat":
+            await worker.statistics(upd=upd)
+        case text if text.split()[0] == "/top":
+            await worker.top(upd=upd)
+        case "/faq":
+            await handle_faq(worker, upd=upd)
+        case _ if upd.message.chat.type != "private" and await worker.get_session_by_id(
+            chat_id=upd.message.chat.id
+        ):
+            await worker.check_word(upd=upd)
+        case _ if await worker.get_state(upd.message.from_.id):
+            await worker.check_city(upd=upd)
+
+
+def build_router() -> CommandRouter:
+    router = CommandRouter()
+
+    async def handler(worker, context):
+        await worker.send(context.upd)
+
+    for name, chats, args in (
+        ("/play", (PRIVATE,), False),
+        ("/play", (GROUP,), False),
+        ("/stop", (PRIVATE,), False),
+        ("/stop", (GROUP,), False),
+        ("/ping", (PRIVATE, GROUP), False),
+        ("/help", (GROUP,), False),
+        ("/last", (PRIVATE,), False),
+        ("/level", (PRIVATE,), True),
+        ("/stat", (PRIVATE, GROUP), False),
+        ("/top", (PRIVATE, GROUP), True),
+        ("/faq", (PRIVATE, GROUP), False),
+    ):
+        router.command(name, chats=chats, args=args)(handler)
+    router.move("word", guard=UpdateContext.game, chats=(GROUP,))(handler)
+    router.move("city", guard=UpdateContext.city)(handler)
+    return router
+
+
+def update(text: str, chat_type: str) -> UpdateObj:
+    return UpdateObj.Schema().load(
+        {
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "text": text,
+                "chat": {"id": 5, "type": chat_type},
+                "from": {"id": 5, "username": "player", "first_name": "Player"},
+            }
+        }
+    )
+
+
+async def measure(dispatch, updates: list[UpdateObj], iterations: int) -> float:
+    started = time.perf_counter()
+    for num in range(iterations):
+        await dispatch(updates[num % len(updates)])
+    return (time.perf_counter() - started) / iterations
+
+
+async def run(iterations: int) -> None:
+    stub = Stub()
+    worker = SimpleNamespace(
+        words_game=stub, city_engine=stub, send=stub.send, **{
+            name: getattr(stub, name)
+            for name in (
+                "start_game", "chose_your_team", "stop_game", "stop_game_group", "set_level",
+                "statistics", "top", "get_session_by_id", "get_state", "check_word", "check_city",
+            )
+        }
+    )
+    router = build_router()
+    for text, chat_type in TEXTS:
+        updates = [update(text, chat_type)]
+        old = await measure(lambda upd: legacy(worker, upd), updates, iterations)
+        new = await measure(lambda upd: router.dispatch(worker, upd), updates, iterations)
+        print(f"  {text:<18} {chat_type:<8} match {old * 1e6:6.2f}us  router {new * 1e6:6.2f}us")
+    updates = [update(text, chat_type) for text, chat_type in TEXTS]
+    old = await measure(lambda upd: legacy(worker, upd), updates, iterations)
+    new = await measure(lambda upd: router.dispatch(worker, upd), updates, iterations)
+    print(f"  {'mix':<27} match {old * 1e6:6.2f}us  router {new * 1e6:6.2f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    asyncio.run(run(parser.parse_args().iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Бенчмарк горячих путей хранилища игр: MemoryGameStore против WGAccessor.
+
+WGAccessor по умолчанию работает с SQLite в памяти, с --driver postgresql+asyncpg -
+с PostgreSQL из .env (таблицы должны существовать).
+
+Запуск:
+    python -m bench.bench_store
+    python -m bench.bench_store --games 200 --players 5 --rounds 20 --driver postgresql+asyncpg
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from app.store.database.database import Database
+from app.store.words_game.accessor import WGAccessor
+from app.store.words_game.memory import MemoryGameStore, read_city_sql
+from app.store.words_game.store import GameStore
+from app.web.config import DatabaseConfig, config
+from app.words_game.models import City
+
+WORDS = ["слон", "нос", "сон", "норка", "арбуз", "зонт", "тигр", "рыба", "аист", "танк"]
+
+
+async def prepare(store: GameStore, games: int, players: int, base_id: int) -> list[tuple[int, int]]:
+    """
+    Групповые игры с командами, как после /play и входа игроков.
+
+    :return: список пар (id игры, id чата)
+    """
+    result = []
+    for num in range(games):
+        chat_id = -(base_id + num)
+        game = await store.create_game_session(user_id=None, chat_id=chat_id, chat_type="group")
+        for player in range(players):
+            user_id = base_id + num * players + player
+            await store.create_user(user_id=user_id, username=f"user{user_id}")
+            await store.add_user_to_team(user_id=user_id, game_id=game.id)
+        result.append((game.id, chat_id))
+    return result
+
+
+async def run(label: str, store: GameStore, args, base_id: int) -> None:
+    rnd = random.Random(args.seed)
+    games = await prepare(store, args.games, args.players, base_id)
+    city_ids = [city_id for city_id, _ in read_city_sql()]
+    timings: dict[str, list[float]] = {}
+
+    async def timed(name: str, coro):
+        started = time.perf_counter()
+        await coro
+        timings.setdefault(name, []).append(time.perf_counter() - started)
+
+    for round_ in range(args.rounds):
+        for num, (game_id, chat_id) in enumerate(games):
+            player_id = base_id + num * args.players + round_ % args.players
+            word = f"{rnd.choice(WORDS)}{round_}"
+            await timed("get_session_by_id", store.get_session_by_id(chat_id=chat_id))
+            await timed("get_team_by_game_id", store.get_team_by_game_id(game_session_id=game_id))
+            await timed("get_player", store.get_player(player_id=player_id, game_session_id=game_id))
+            await timed("get_word_verdict", store.get_word_verdict(word=word, chat_id=chat_id))
+            await timed("add_used_word", store.add_used_word(game_session_id=game_id, word=word))
+            await timed(
+                "update_team",
+                store.update_team(game_session_id=game_id, user_id=player_id, point=1, round_=1),
+            )
+            await timed(
+                "save_word_verdict", store.save_word_verdict(word=word, chat_id=chat_id, yes=2, no=1)
+            )
+            await timed(
+                "set_city_to_used",
+                store.set_city_to_used(city_id=rnd.choice(city_ids), game_session_id=game_id),
+            )
+
+    total = sum(sum(values) for values in timings.values())
+    calls = sum(len(values) for values in timings.values())
+    print(f"{label}: {calls} calls, {calls / total:,.0f} calls/s")
+    for name, values in timings.items():
+        values.sort()
+        print(
+            f"  {name:<20} mean {statistics.mean(values) * 1e6:9.1f}us"
+            f"  p50 {values[len(values) // 2] * 1e6:9.1f}us"
+            f"  p99 {values[int(len(values) * 0.99)] * 1e6:9.1f}us"
+        )
+
+
+async def run_all(args) -> None:
+    await run("memory", MemoryGameStore.from_city_sql(), args, base_id=args.base_id)
+
+    if args.driver.startswith("sqlite"):
+        db_config = DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver=args.driver
+        )
+    else:
+        db_config = config.database
+    database = Database(cfg=SimpleNamespace(database=db_config))
+    await database.connect()
+    try:
+        if args.driver.startswith("sqlite"):
+            await database.add_all_query(
+                [City(id=city_id, name=name) for city_id, name in read_city_sql()]
+            )
+        await run(args.driver, WGAccessor(database=database), args, base_id=args.base_id)
+    finally:
+        await database.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--driver", default="sqlite+aiosqlite")
+    parser.add_argument("--base-id", type=int, default=900_000_000, help="id чатов и игроков бенчмарка")
+    parser.add_argument("--seed", type=int, default=1)
+    # повтор слова в WGAccessor.add_used_word пишется в лог ошибкой
+    logging.getLogger("words_game").setLevel(logging.CRITICAL)
+    asyncio.run(run_all(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Локальная имитация Telegram Bot API для нагрузочного тестирования TgClient, Poller и Sender.
+
+Поддерживает getUpdates (long polling по сценарию обновлений), getMe, sendMessage, sendPoll,
+editMessageReplyMarkup, stopPoll и answerCallbackQuery, задержку ответов, ответы 429
+с retry_after и ограничение частоты сообщений в чат.
+
+Запуск:
+    python -m bench.fake_bot_api --port 8081 --latency 0.05 --retry-rate 0.01
+    python -m bench.fake_bot_api --port 8081 --chats 50 --players 4 --words 20
+    TG_API_URL=http://127.0.0.1:8081 python main.py
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from aiohttp import web
+
+BOT = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+WORDS = ("Арбуз", "Зебра", "Апельсин", "Носорог", "Гитара", "Алмаз", "Зонт", "Тигр", "Река", "Ананас")
+
+
+@dataclass
+class FakeBotApiConfig:
+    """
+    Настройки имитации.
+
+    :param latency: средняя задержка ответа, секунды
+    :param jitter: разброс задержки, доля от latency
+    :param retry_rate: доля запросов отправки, на которые отвечает 429
+    :param retry_after: retry_after в ответе 429, секунды
+    :param chat_rate: сообщений в секунду в один чат, 0 - без ограничения
+    :param chat_burst: сообщений в чат без ожидания
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.5
+    retry_rate: float = 0.0
+    retry_after: int = 1
+    chat_rate: float = 0.0
+    chat_burst: int = 20
+
+
+@dataclass(slots=True)
+class ChatBucket:
+    tokens: float
+    updated: float = field(default_factory=time.monotonic)
+
+
+class FakeBotApi:
+    """
+    Имитация Bot API.
+
+    Методы:
+    push_update - добавление обновления в очередь getUpdates.
+    message, callback_query, poll_answer - обновления от игроков (без update_id).
+    feed - добавление обновлений по сценарию [(пауза, обновление)].
+    app - aiohttp-приложение с методами Bot API.
+    """
+
+    SEND_METHODS = ("sendMessage", "sendPoll", "editMessageReplyMarkup", "stopPoll")
+
+    def __init__(self, config: FakeBotApiConfig | None = None, seed: int | None = None):
+        self.config = config or FakeBotApiConfig()
+        self.random = random.Random(seed)
+        self.updates: list[dict] = []
+        self.update_ids = itertools.count(1)
+        self.message_ids: dict[int, itertools.count] = {}
+        self.poll_ids = itertools.count(1)
+        self.polls: dict[int, dict] = {}
+        self.poll_messages: dict[tuple[int, int], int] = {}
+        self.buckets: dict[int, ChatBucket] = {}
+        self.sent: list[tuple[str, dict]] = []
+        self.requests: Counter = Counter()
+        self.responses: Counter = Counter()
+        self.new_updates = asyncio.Event()
+
+    def push_update(self, update: dict) -> int:
+        """
+        Добавление обновления, ожидающие getUpdates получат его сразу.
+
+        :param update: обновление без update_id
+        :return: update_id
+        """
+        update["update_id"] = next(self.update_ids)
+        self.updates.append(update)
+        self.new_updates.set()
+        return update["update_id"]
+
+    def next_message_id(self, chat_id: int) -> int:
+        return next(self.message_ids.setdefault(chat_id, itertools.count(1)))
+
+    @staticmethod
+    def user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"Player{user_id}", "username": f"player{user_id}"}
+
+    @staticmethod
+    def chat(chat_id: int) -> dict:
+        if chat_id > 0:
+            return {"id": chat_id, "type": "private", "first_name": f"Player{chat_id}"}
+        return {"id": chat_id, "type": "group", "title": f"Chat{chat_id}"}
+
+    def message(self, chat_id: int, user_id: int, text: str) -> dict:
+        return {
+            "message": {
+                "message_id": self.next_message_id(chat_id),
+                "from": self.user(user_id),
+                "chat": self.chat(chat_id),
+                "date": int(time.time()),
+                "text": text,
+            }
+        }
+
+    def callback_query(self, chat_id: int, user_id: int, data: str, message_id: int = 1) -> dict:
+        return {
+            "callback_query": {
+                "id": str(self.random.getrandbits(48)),
+                "from": self.user(user_id),
+                "message": {
+                    "message_id": message_id,
+                    "from": BOT,
+                    "chat": self.chat(chat_id),
+                    "date": int(time.time()),
+                    "text": "Pick on me",
+                },
+                "data": data,
+            }
+        }
+
+    def poll_answer(self, poll_id: int, user_id: int, option: int) -> dict:
+        if (poll := self.polls.get(poll_id)) is not None and not poll["is_closed"]:
+            poll["options"][option]["voter_count"] += 1
+            poll["total_voter_count"] += 1
+        return {"poll_answer": {"poll_id": poll_id, "user": self.user(user_id), "option_ids": [option]}}
+
+    async def feed(self, script: Iterable[tuple[float, dict]]) -> None:
+        """
+        Добавление обновлений по сценарию.
+
+        :param script: пары (пауза перед обновлением в секундах, обновление)
+        """
+        for delay, update in script:
+            if delay:
+                await asyncio.sleep(delay)
+            self.push_update(update)
+
+    def record_sent(self, method: str, payload: dict) -> None:
+        self.sent.append((method, payload))
+
+    async def delay(self) -> None:
+        if self.config.latency:
+            spread = self.config.latency * self.config.jitter
+            await asyncio.sleep(max(self.random.uniform(-spread, spread) + self.config.latency, 0))
+
+    def throttle(self, chat_id: int | None) -> int | None:
+        """
+        Проверка ограничения частоты: случайный 429 и ведро токенов на чат.
+
+        :param chat_id: id чата
+        :return: retry_after, если запрос надо отклонить
+        """
+        if self.config.retry_rate and self.random.random() < self.config.retry_rate:
+            return self.config.retry_after
+        if not self.config.chat_rate or chat_id is None:
+            return None
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(chat_id, ChatBucket(tokens=self.config.chat_burst))
+        bucket.tokens = min(
+            bucket.tokens + (now - bucket.updated) * self.config.chat_rate, self.config.chat_burst
+        )
+        bucket.updated = now
+        if bucket.tokens < 1:
+            return max(math.ceil((1 - bucket.tokens) / self.config.chat_rate), 1)
+        bucket.tokens -= 1
+        return None
+
+    def bot_message(self, chat_id: int, **fields) -> dict:
+        return {
+            "message_id": self.next_message_id(chat_id),
+            "from": BOT,
+            "chat": self.chat(chat_id),
+            "date": int(time.time()),
+            **fields,
+        }
+
+    async def get_updates(self, params: dict) -> dict:
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        if offset:
+            self.updates = [u for u in self.updates if u["update_id"] >= offset]
+        deadline = time.monotonic() + timeout
+        while not self.updates and (left := deadline - time.monotonic()) > 0:
+            self.new_updates.clear()
+            try:
+                await asyncio.wait_for(self.new_updates.wait(), left)
+            except asyncio.TimeoutError:
+                break
+        limit = int(params.get("limit") or 100)
+        return {"ok": True, "result": self.updates[:limit]}
+
+    def send_message(self, payload: dict) -> dict:
+        fields = {"text": payload.get("text", "")}
+        if payload.get("reply_markup"):
+            fields["reply_markup"] = payload["reply_markup"]
+        return {"ok": True, "result": self.bot_message(int(payload["chat_id"]), **fields)}
+
+    def send_poll(self, payload: dict) -> dict:
+        poll = {
+            "id": next(self.poll_ids),
+            "question": payload["question"],
+            "options": [{"text": text, "voter_count": 0} for text in payload["options"]],
+            "total_voter_count": 0,
+            "is_closed": False,
+            "is_anonymous": payload.get("is_anonymous", True),
+            "type": "regular",
+            "allow_multiple_answers": False,
+        }
+        message = self.bot_message(int(payload["chat_id"]), poll=poll)
+        self.polls[poll["id"]] = poll
+        self.poll_messages[message["chat"]["id"], message["message_id"]] = poll["id"]
+        return {"ok": True, "result": message}
+
+    def edit_message_reply_markup(self, payload: dict) -> dict:
+        return {
+            "ok": True,
+            "result": {
+                **self.bot_message(int(payload["chat_id"]), text="Pick on me"),
+                "message_id": payload["message_id"],
+            },
+        }
+
+    def stop_poll(self, payload: dict) -> dict:
+        poll_id = self.poll_messages.get((int(payload["chat_id"]), int(payload["message_id"])))
+        if poll_id is None:
+            return {"ok": False, "error_code": 400, "description": "Bad Request: poll not found"}
+        poll = self.polls[poll_id]
+        poll["is_closed"] = True
+        return {"ok": True, "result": poll}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.requests[method] += 1
+        params = dict(request.query)
+        payload = await request.json() if request.can_read_body else {}
+        await self.delay()
+
+        if method in self.SEND_METHODS or method == "answerCallbackQuery":
+            chat_id = payload.get("chat_id")
+            retry_after = self.throttle(int(chat_id) if chat_id is not None else None)
+            if retry_after is not None:
+                self.responses[method, 429] += 1
+                return web.json_response(
+                    {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": f"Too Many Requests: retry after {retry_after}",
+                        "parameters": {"retry_after": retry_after},
+                    },
+                    status=429,
+                )
+            self.record_sent(method, payload)
+
+        match method:
+            case "getUpdates":
+                body = await self.get_updates({**params, **payload})
+            case "getMe":
+                body = {"ok": True, "result": BOT}
+            case "sendMessage":
+                body = self.send_message(payload)
+            case "sendPoll":
+                body = self.send_poll(payload)
+            case "editMessageReplyMarkup":
+                body = self.edit_message_reply_markup(payload)
+            case "stopPoll":
+                body = self.stop_poll(payload)
+            case "answerCallbackQuery":
+                body = {"ok": True, "result": True}
+            case _:
+                self.responses[method, 404] += 1
+                return web.json_response(
+                    {"ok": False, "error_code": 404, "description": "Not Found"}, status=404
+                )
+        status = 200 if body["ok"] else body["error_code"]
+        self.responses[method, status] += 1
+        return web.json_response(body, status=status)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        return app
+
+
+def group_game(
+    chat_id: int,
+    players: Iterable[int],
+    words: int,
+    pause: float,
+    rnd: random.Random,
+    slow: float = 0.0,
+) -> list[tuple[float, dict]]:
+    """
+    Сценарий игры в слова в группе: /play, вход игроков, слова по очереди.
+
+    :param chat_id: id чата
+    :param players: id игроков
+    :param words: число слов
+    :param pause: пауза между сообщениями, секунды
+    :param rnd: генератор случайных чисел
+    :param slow: доля ходов, которые игрок пропускает (срабатывает таймер медленного игрока)
+    :return: [(пауза, обновление)]
+    """
+    api = FakeBotApi()
+    players = list(players)
+    script = [(0.0, api.message(chat_id, players[0], "/play"))]
+    script += [(pause, api.callback_query(chat_id, player, "/yes")) for player in players]
+    skipped = 0.0
+    for n in range(words):
+        if slow and rnd.random() < slow:
+            skipped += pause
+            continue
+        word = api.message(chat_id, players[n % len(players)], rnd.choice(WORDS))
+        script.append((pause + skipped, word))
+        skipped = 0.0
+    return script
+
+
+async def scenario(api: FakeBotApi, chats: int, players: int, words: int, pause: float) -> None:
+    rnd = api.random
+    games = [
+        group_game(-1000 - n, range(n * players + 1, (n + 1) * players + 1), words, pause, rnd)
+        for n in range(chats)
+    ]
+    await asyncio.gather(*(api.feed(game) for game in games))
+
+
+async def serve(args: argparse.Namespace) -> None:
+    config = FakeBotApiConfig(
+        latency=args.latency,
+        retry_rate=args.retry_rate,
+        retry_after=args.retry_after,
+        chat_rate=args.chat_rate,
+    )
+    api = FakeBotApi(config, seed=args.seed)
+    runner = web.AppRunner(api.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=args.host, port=args.port).start()
+    print(f"fake Bot API on http://{args.host}:{args.port}")
+    try:
+        if args.chats:
+            await scenario(api, args.chats, args.players, args.words, args.pause)
+            print(f"scenario done: {dict(api.requests)}")
+        await asyncio.Future()
+    finally:
+        print(f"responses: {dict(api.responses)}")
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--retry-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--chat-rate", type=float, default=0.0)
+    parser.add_argument("--chats", type=int, default=0)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--words", type=int, default=10)
+    parser.add_argument("--pause", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
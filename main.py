@@ -1,6 +1,8 @@
 from aiohttp.web_runner import AppRunner, TCPSite
 
 from app.sender_app.sender import Sender
+from app.store.rabbitMQ.memory import MemoryBroker
+from app.store.words_game.memory import MemoryGameStore
 from app.worker_app.worker import Worker
 from app.poller_app.poller import Poller
 from app.web.config import config
@@ -26,8 +28,16 @@ class CustomAppRunner:
 if __name__ == "__main__":
 
     runner = CustomAppRunner(app)
-    poller = Poller(cfg=config)
-    worker = Worker(cfg=config)
-    sender = Sender(cfg=config)
+    # в монолите один worker читает все чаты, шарды нужны только app/worker_app/main.py
+    config.worker.processes = 1
+    # BROKER=memory: все сущности в одном процессе общаются без RabbitMQ
+    broker = MemoryBroker() if config.broker.kind == "memory" else None
+    if broker is not None:
+        app.rabbitMQ = broker
+    poller = Poller(cfg=config, broker=broker)
+    # GAME_STORE=memory: игры хранятся в памяти worker, база нужна только админке
+    store = MemoryGameStore.from_city_sql() if config.store.kind == "memory" else None
+    worker = Worker(cfg=config, broker=broker, store=store)
+    sender = Sender(cfg=config, broker=broker)
     starter(start_tasks=[poller.start, worker.start, sender.start, runner.start],
             stop_tasks=[poller.stop, worker.stop, sender.stop, runner.stop])
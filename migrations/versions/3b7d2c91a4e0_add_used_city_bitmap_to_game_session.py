@@ -0,0 +1,24 @@
+"""add_used_city_bitmap_to_game_session
+
+Revision ID: 3b7d2c91a4e0
+Revises: e58e24333578
+Create Date: 2026-10-19 10:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d2c91a4e0'
+down_revision = 'e58e24333578'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('game_sessions', sa.Column('used_city_bitmap', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('game_sessions', 'used_city_bitmap')
@@ -1,4 +1,6 @@
 import asyncio
+import tempfile
+from pathlib import Path
 from typing import Dict, Any
 from unittest.mock import AsyncMock
 import pytest
@@ -12,15 +14,15 @@ from app.web.config import config as cfg
 from app.words_game.models import GameSession, User, City
 from app.worker_app.worker import Worker
 from app.store.database import DB
+from app.store.database.database import database_url
 
-url = URL.create(
-    drivername="postgresql+psycopg2",
-    host=cfg.database.host,
-    database=cfg.database.database,
-    username=cfg.database.user,
-    password=cfg.database.password,
-    port=cfg.database.port,
-)
+if cfg.database.driver.startswith("sqlite"):
+    # DATABASE_DRIVER=sqlite+aiosqlite: тесты без PostgreSQL, фикстуры и воркер видят один файл
+    if not cfg.database.database:
+        cfg.database.database = str(Path(tempfile.mkdtemp()) / "test.db")
+    url = database_url(cfg.database, driver="sqlite")
+else:
+    url = database_url(cfg.database, driver="postgresql+psycopg2")
 
 
 @pytest.fixture(autouse=True)
@@ -174,7 +176,7 @@ async def game(session, user, user1):
         creator=user,
         next_user_id=user1.id,
         next_user=user1,
-        words=[]
+        words=None
     )
     session.add(game)
     session.commit()
@@ -198,9 +200,10 @@ class IncomingMessage(AbstractIncomingMessage):
     def info(self) -> Dict[str, Any]:
         pass
 
-    def __init__(self, body, routing_key):
+    def __init__(self, body, routing_key, headers=None):
         self.body = body
         self.routing_key = routing_key
+        self._headers = headers or {}
 
     def __iter__(self):
         yield self.body
@@ -211,8 +214,9 @@ class IncomingMessage(AbstractIncomingMessage):
     def channel(self):
         pass
 
+    @property
     def headers(self):
-        pass
+        return self._headers
 
     def lock(self):
         pass
@@ -0,0 +1,55 @@
+import pytest
+
+from app.store.lexicon.dawg import Lexicon, build_dawg, read_word_list
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    path = tmp_path / "lexicon.dawg"
+    path.write_bytes(
+        build_dawg(
+            [
+                ("Кот", True),
+                ("коты", True),
+                ("рот", True),
+                ("роты", True),
+                ("бегать", False),
+                ("ёж", True),
+                ("стекло", False),
+                ("стекло", True),
+            ]
+        )
+    )
+    lexicon = Lexicon.open(path)
+    yield lexicon
+    lexicon.close()
+
+
+def test_lookup(lexicon):
+    assert len(lexicon) == 7
+    assert lexicon.get("КОТ") is True
+    assert lexicon.get("Еж") is True
+    assert lexicon.get("бегать") is False
+    assert lexicon.get("ко") is None
+    assert lexicon.get("котик") is None
+    assert "стекло" in lexicon
+    assert "бегать" not in lexicon
+
+
+def test_suffixes_are_shared():
+    trie_nodes = 1 + len("кот") + 1 + len("рот") + 1
+    data = build_dawg([("кот", True), ("коты", True), ("рот", True), ("роты", True)])
+    lexicon = Lexicon(data)
+    assert len(lexicon.nodes) // 3 < trie_nodes
+    assert lexicon.get("роты") is True
+
+
+def test_read_word_list(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("# comment\nкот\nбегать\tverb\n\nдом\tnoun\n", encoding="utf-8")
+    assert list(read_word_list(path)) == [("кот", True), ("бегать", False), ("дом", True)]
+
+
+def test_wrong_file():
+    with pytest.raises(ValueError):
+        Lexicon(b"\x00" * 32)
@@ -0,0 +1,90 @@
+import aiohttp
+import pytest
+
+from app.store.metrics import Counter, Gauge, Histogram, MetricsServer, Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_and_gauge(registry):
+    requests = Counter("requests_total", "Requests", ("method", "status"), registry=registry)
+    requests.labels("sendMessage", "200").inc()
+    requests.labels("sendMessage", "200").inc(2)
+    requests.labels("getUpdates", "502").inc()
+    polls = Gauge("open_polls", "Open polls", registry=registry)
+    polls.inc(3)
+    polls.dec()
+
+    text = registry.expose()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="sendMessage",status="200"} 3' in text
+    assert 'requests_total{method="getUpdates",status="502"} 1' in text
+    assert "open_polls 2" in text
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = Histogram("latency_seconds", "Latency", ("kind",), buckets=(0.1, 1), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.labels("message").observe(value)
+
+    lines = registry.expose().splitlines()
+    assert 'latency_seconds_bucket{kind="message",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{kind="message",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{kind="message",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{kind="message"} 3.65' in lines
+    assert 'latency_seconds_count{kind="message"} 4' in lines
+
+
+def test_labels_are_checked(registry):
+    counter = Counter("errors_total", "Errors", ("method",), registry=registry)
+    assert counter.labels("execute") is counter.labels("execute")
+    with pytest.raises(ValueError):
+        counter.labels("execute", "extra")
+    with pytest.raises(ValueError):
+        Counter("errors_total", "Errors", registry=registry)
+
+
+async def test_metrics_server(registry, unused_tcp_port):
+    Counter("served_total", "Served", registry=registry).inc()
+    server = MetricsServer(port=unused_tcp_port, host="127.0.0.1", registry=registry)
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{unused_tcp_port}/metrics") as resp:
+                assert resp.status == 200
+                assert "served_total 1" in await resp.text()
+    finally:
+        await server.stop()
+
+
+async def test_metrics_server_upstreams(registry, unused_tcp_port_factory):
+    child_port, dead_port, port = (unused_tcp_port_factory() for _ in range(3))
+    child_registry = Registry()
+    Counter("served_total", "Served", ("kind",), registry=child_registry).labels("poll").inc(2)
+    Counter("served_total", "Served", ("kind",), registry=registry)
+    Counter("restarts_total", "Restarts", registry=registry).inc()
+    child = MetricsServer(port=child_port, host="127.0.0.1", registry=child_registry)
+    upstreams = {
+        "0": f"http://127.0.0.1:{child_port}/metrics",
+        "1": f"http://127.0.0.1:{dead_port}/metrics",
+    }
+    server = MetricsServer(
+        port=port, host="127.0.0.1", registry=registry, upstreams=lambda: upstreams
+    )
+    await child.start()
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as resp:
+                lines = (await resp.text()).splitlines()
+    finally:
+        await server.stop()
+        await child.stop()
+
+    assert lines.count("# TYPE served_total counter") == 1
+    assert 'served_total{shard="0",kind="poll"} 2' in lines
+    assert "restarts_total 1" in lines
+    assert not any('shard="1"' in line for line in lines)
@@ -0,0 +1,71 @@
+import logging
+from unittest.mock import AsyncMock
+
+from pamqp import decode, encode
+
+from app.store.metrics.tracing import (
+    TRACE_HEADER,
+    TRACE_REPLY_SECONDS,
+    TRACE_TOTAL_SECONDS,
+    TraceContext,
+    current_trace,
+)
+from app.store.rabbitMQ.rabbitMQ import RabbitMQ
+
+
+def test_headers_survive_amqp_encoding():
+    trace = TraceContext(update_id=42, received=1_700_000_000_000_000, stage="poll_publish")
+    trace.add_db(0.0125)
+    headers = trace.to_headers()
+
+    _, decoded = decode.field_table(encode.field_table(headers))
+    restored = TraceContext.from_headers(decoded)
+    assert restored.update_id == 42
+    assert restored.received == trace.received
+    assert restored.db == 12500
+    assert [stage for stage, _ in restored.spans] == ["poll_publish"]
+    assert restored.spans[0][1] == headers[TRACE_HEADER]["spans"][0][1]
+    assert TraceContext.from_headers({"x-delay": 0}) is None
+
+
+def test_breakdown_and_slow_log(caplog):
+    trace = TraceContext(update_id=1, received=0)
+    trace.spans = [("poll_publish", 1_000), ("worker_queue", 3_000), ("worker", 2_503_000), ("send", 2_600_000)]
+    assert trace.breakdown() == [
+        ("poll_publish", 0.001), ("worker_queue", 0.002), ("worker", 2.5), ("send", 0.097)
+    ]
+    with caplog.at_level(logging.WARNING, logger="trace"):
+        assert trace.finish(slow=2.0) == 2.6
+    assert "slow update 1" in caplog.text
+    assert "worker=2500.0ms" in caplog.text
+
+
+async def test_send_event_carries_current_trace():
+    rabbit = RabbitMQ(host="localhost", port="5672", user="guest", password="guest")
+    rabbit.exchange = AsyncMock()
+    trace = TraceContext(update_id=7, stage="worker")
+    token = current_trace.set(trace)
+    try:
+        await rabbit.send_event(message={"type_": "message"}, routing_key="sender")
+        await rabbit.send_event(message={"type_": "slow_player"}, routing_key="worker", delay=15000)
+    finally:
+        current_trace.reset(token)
+
+    (now,), (delayed,) = (call.args for call in rabbit.exchange.publish.await_args_list)
+    assert now.headers[TRACE_HEADER]["update_id"] == 7
+    assert now.headers[TRACE_HEADER]["spans"][-1][0] == "worker"
+    assert now.headers[TRACE_HEADER]["reply"] == 0
+    assert TRACE_HEADER not in delayed.headers
+
+
+def test_update_is_finished_once_for_several_replies():
+    trace = TraceContext(update_id=3, received=0, stage="worker")
+    replies = [TraceContext.from_headers(trace.to_headers()) for _ in range(3)]
+    assert [reply.reply for reply in replies] == [0, 1, 2]
+
+    totals, further = TRACE_TOTAL_SECONDS.labels().count, TRACE_REPLY_SECONDS.labels().count
+    for reply in replies:
+        reply.mark("send")
+        reply.finish(slow=float("inf"))
+    assert TRACE_TOTAL_SECONDS.labels().count == totals + 1
+    assert TRACE_REPLY_SECONDS.labels().count == further + 2
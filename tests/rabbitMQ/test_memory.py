@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.store.metrics.tracing import TRACE_HEADER, TraceContext, current_trace
+from app.store.rabbitMQ.broker import load_message
+from app.store.rabbitMQ.memory import MemoryBroker
+
+
+@pytest.fixture
+async def broker():
+    broker = MemoryBroker()
+    tasks = []
+
+    def listen(routing_key, queue_name):
+        received = []
+
+        async def on_message(message):
+            received.append(message)
+            await message.ack()
+
+        tasks.append(asyncio.create_task(broker.listen_events(routing_key, queue_name, on_message)))
+        return received
+
+    broker.listen = listen
+    yield broker
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await broker.disconnect()
+
+
+async def test_routing_and_early_messages(broker):
+    await broker.send_event({"type_": "update"}, routing_key="poller")
+    worker = broker.listen(["poller", "worker"], "tg_bot")
+    sender = broker.listen(["sender"], "tg_bot_sender")
+    await broker.send_event({"type_": "pick_leader"}, routing_key="worker")
+    await broker.send_event({"type_": "message"}, routing_key="sender")
+    await asyncio.sleep(0)
+
+    assert [load_message(m)["type_"] for m in worker] == ["update", "pick_leader"]
+    assert [m.routing_key for m in sender] == ["sender"]
+    assert all(m.acked for m in worker + sender)
+
+
+async def test_delayed_delivery(broker):
+    received = broker.listen(["worker"], "tg_bot")
+    await broker.send_event({"type_": "slow_player"}, routing_key="worker", delay=30)
+    await broker.send_event({"type_": "later"}, routing_key="worker", delay=5000)
+    await asyncio.sleep(0.01)
+    assert received == []
+    await asyncio.sleep(0.05)
+    assert [m.data["type_"] for m in received] == ["slow_player"]
+    assert len(broker.timers) == 1
+    await broker.disconnect()
+    assert broker.timers == {}
+
+
+async def test_failed_handler_is_redelivered_once(broker):
+    calls = []
+
+    async def on_message(message):
+        calls.append(message.redelivered)
+        raise RuntimeError("boom")
+
+    task = asyncio.create_task(broker.listen_events(["worker"], "tg_bot", on_message))
+    await broker.send_event({"type_": "pick_leader"}, routing_key="worker")
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert calls == [False, True]
+
+
+async def test_trace_headers(broker):
+    received = broker.listen(["sender"], "tg_bot_sender")
+    token = current_trace.set(TraceContext(update_id=3, stage="worker"))
+    try:
+        await broker.send_event({"type_": "message"}, routing_key="sender")
+    finally:
+        current_trace.reset(token)
+    await asyncio.sleep(0)
+    assert TraceContext.from_headers(received[0].headers).update_id == 3
+    assert TRACE_HEADER in received[0].headers
+
+
+async def test_unrouted_messages_are_bounded():
+    broker = MemoryBroker(max_unrouted=2)
+    for index in range(3):
+        await broker.send_event({"index": index}, routing_key="worker.7")
+    assert [m.data["index"] for m in broker.unrouted["worker.7"]] == [1, 2]
+
+
+async def test_cancelled_listener_is_cancelled(broker):
+    task = asyncio.create_task(broker.listen_events(["worker"], "tg_bot_x", exclusive=True))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert task.cancelled()
+    assert "tg_bot_x" not in broker.queues
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.store.rabbitMQ.broker import load_message
+from app.store.rabbitMQ.memory import MemoryBroker
+from app.store.rabbitMQ.shards import Shard, shard_routing_key
+
+
+def test_shard_routing_key():
+    assert shard_routing_key("poller", 5, 1) == "poller"
+    assert shard_routing_key("poller", 5, 3) == "poller.2"
+    assert shard_routing_key("poller", -1001, 3) == "poller.1"
+    assert shard_routing_key("poller", None, 3) == "poller.all"
+
+
+def test_shard_owns_every_chat_once():
+    shards = [Shard(index=i, count=3) for i in range(3)]
+    for chat_id in (-1001, -1, 0, 5, 7, 10**12):
+        assert sum(shard.owns(chat_id) for shard in shards) == 1
+    assert Shard().owns(-1001)
+    assert Shard().routing_keys("worker", "poller") == ["worker", "poller"]
+    assert Shard().queue_name("tg_bot") == "tg_bot"
+    assert shards[1].queue_name("tg_bot") == "tg_bot_1"
+
+
+@pytest.fixture
+async def broker():
+    broker = MemoryBroker()
+    yield broker
+    await broker.disconnect()
+
+
+async def test_shard_queues(broker):
+    received = {0: [], 1: []}
+    tasks = []
+    for index in received:
+        shard = Shard(index=index, count=2)
+
+        async def on_message(message, index=index):
+            received[index].append(load_message(message)["n"])
+            await message.ack()
+
+        keys, queue_name = shard.routing_keys("poller"), shard.queue_name("tg_bot")
+        tasks.append(asyncio.create_task(broker.listen_events(keys, queue_name, on_message)))
+    await asyncio.sleep(0)
+
+    for n, chat_id in enumerate((4, 5, None, 7)):
+        await broker.send_event({"n": n}, routing_key=shard_routing_key("poller", chat_id, 2))
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert received == {0: [0, 2], 1: [1, 2, 3]}
@@ -6,6 +6,7 @@ import pytest
 
 from app.sender_app.messages import keyboards
 from app.sender_app.sender import Sender
+from app.store.tg_api.schemes import StopPollResponse
 from app.web.config import config as cfg
 
 
@@ -18,6 +19,7 @@ def sender():
 async def message():
     message = MagicMock()
     message.ack = AsyncMock()
+    message.headers = {}
     return message
 
 
@@ -103,8 +105,11 @@ async def test_send_poll(sender):
             await sender.handle_update(message)
             assert mock_send.called
             mock_send.assert_called_once_with(**{'chat_id': chat_id, 'question': question, 'options': options, 'anonymous': anonymous, 'period': 10})
-            mock_send_event.called
-            assert mock_send_event.call_args[1]["delay"] == 12000
+            assert mock_send_event.call_count == 1
+            poll_id_message = mock_send_event.call_args[1]["message"]
+            assert poll_id_message["type_"] == "poll_id"
+            assert poll_id_message["period"] == 10
+            assert "delay" not in mock_send_event.call_args[1]
 
 @pytest.mark.asyncio
 async def test_check_poll(sender):
@@ -115,3 +120,40 @@ async def test_check_poll(sender):
         await sender.handle_update(message)
         assert mock_check.called
         mock_check.assert_called_once_with(message)
+
+
+@pytest.mark.asyncio
+async def test_check_poll_result_counts(sender):
+    from types import SimpleNamespace
+
+    poll = SimpleNamespace(
+        question="Граждане примем ли мы Слон как допустимое слово?",
+        options=[SimpleNamespace(text="Yes", voter_count=3), SimpleNamespace(text="No", voter_count=1)],
+        is_anonymous=True,
+    )
+    message = {"type_": "send_poll_answer", "chat_id": 123456, "poll_id": "12345", "poll_message_id": 1}
+    with patch.object(sender.tg_client, 'remove_inline_keyboard',
+                      return_value=SimpleNamespace(result=SimpleNamespace(poll=poll))), \
+            patch.object(sender.rabbitMQ, 'send_event') as mock_send_event:
+        await sender.check_poll(message)
+        result = mock_send_event.call_args[1]["message"]
+        assert result["poll_result"] == "yes"
+        assert result["word"] == "Слон"
+        assert (result["yes"], result["no"]) == (3, 1)
+
+
+@pytest.mark.asyncio
+async def test_stop_poll(sender):
+    message = {"type_": "stop_poll", "chat_id": 123456, "message_id": 3}
+    with patch.object(sender.tg_client, 'stop_poll') as mock_stop:
+        await sender.handle_update(message)
+        mock_stop.assert_called_once_with(chat_id=123456, message_id=3)
+
+
+@pytest.mark.asyncio
+async def test_stop_poll_error_is_logged(sender, caplog):
+    message = {"type_": "stop_poll", "chat_id": 123456, "message_id": 3}
+    response = StopPollResponse(ok=False, error_code=429, description="Too Many Requests")
+    with patch.object(sender.tg_client, 'stop_poll', return_value=response):
+        await sender.handle_update(message)
+    assert "stop_poll chat_id=123456 error=429 Too Many Requests" in caplog.text
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from app.store.tg_api.client import TgClient
+from bench.fake_bot_api import FakeBotApi, FakeBotApiConfig, group_game
+
+
+@pytest.fixture
+async def fake_api():
+    api = FakeBotApi(FakeBotApiConfig(chat_rate=1, chat_burst=2), seed=1)
+    server = TestServer(api.app(), host="127.0.0.1")
+    await server.start_server()
+    try:
+        yield api, TgClient(token="test_token", base_url=str(server.make_url("")))
+    finally:
+        await server.close()
+
+
+def test_base_url():
+    assert TgClient(token="t").get_url("getMe") == "https://api.telegram.org/bott/getMe"
+    assert TgClient(token="t", base_url="http://127.0.0.1:8081/").get_url("getMe") == (
+        "http://127.0.0.1:8081/bott/getMe"
+    )
+
+
+async def test_long_poll_gets_pushed_update(fake_api):
+    api, tg_client = fake_api
+    poll = asyncio.create_task(tg_client.get_updates_in_objects(timeout=5))
+    await asyncio.sleep(0.05)
+    assert not poll.done()
+    api.push_update(api.message(-100, 7, "Арбуз"))
+    res = await asyncio.wait_for(poll, 1)
+    assert [u.message.text for u in res.result] == ["Арбуз"]
+
+    offset = res.result[-1].update_id + 1
+    res = await tg_client.get_updates_in_objects(offset=offset, timeout=0)
+    assert res.result == []
+
+
+async def test_send_and_stop_poll(fake_api):
+    api, tg_client = fake_api
+    sent = await tg_client.send_poll(chat_id=-100, question="Слон?", options=["Yes", "No"])
+    assert sent.result.poll.is_closed is False
+    api.push_update(api.poll_answer(sent.result.poll.id, 7, 0))
+
+    status, body = await tg_client._request(
+        "stopPoll", payload={"chat_id": -100, "message_id": sent.result.message_id}
+    )
+    assert status == 200
+    assert body["result"]["is_closed"] is True
+    assert body["result"]["options"][0]["voter_count"] == 1
+    assert await tg_client.send_callback_alert(callback_id="1", text="ok") == 200
+
+
+async def test_chat_rate_limit(fake_api):
+    api, tg_client = fake_api
+    for _ in range(2):
+        await tg_client.send_message(chat_id=-100, text="ok")
+    status, body = await tg_client._request("sendMessage", payload={"chat_id": -100, "text": "late"})
+    assert status == 429
+    assert body["parameters"]["retry_after"] >= 1
+    await tg_client.send_message(chat_id=-200, text="other chat")
+    assert api.responses["sendMessage", 429] == 1
+
+
+def test_group_game_script():
+    api = FakeBotApi(seed=1)
+    script = group_game(-100, [1, 2], words=3, pause=0.5, rnd=api.random)
+    assert script[0][1]["message"]["text"] == "/play"
+    assert [update["callback_query"]["data"] for _, update in script[1:3]] == ["/yes", "/yes"]
+    assert len(script) == 6
@@ -121,21 +121,34 @@ async def test_remove_inline_keyboard(tg_client, mock_response, get_updates_resp
 
 
 @pytest.mark.asyncio
-async def test_stop_poll(tg_client, mock_response, get_updates_response, get_updates_response_dict):
-    result = get_updates_response_dict["result"][0]["message"]
-    options = [{'text': 'Option 1', 'voter_count': 0},
-               {'text': 'Option 2', 'voter_count': 2}]
-    result["poll"]["options"] = options
-    result["poll"]["question"] = "test question"
+async def test_stop_poll(tg_client, mock_response, get_updates_response_dict):
+    poll = dict(get_updates_response_dict["result"][0]["message"]["poll"])
+    poll["options"] = [{'text': 'Option 1', 'voter_count': 0},
+                       {'text': 'Option 2', 'voter_count': 2}]
+    poll.update(question="test question", total_voter_count=2, is_closed=True)
+    # stopPoll возвращает Poll, а не Message
     mock_response.post(
             f"{tg_client.get_url('stopPoll')}",
-            payload={"ok": True, "result": result},
+            payload={"ok": True, "result": poll},
             status=200,
         )
-    result["poll"]["total_voter_count"] = 10
-    response = await tg_client.stop_poll(chat_id=get_updates_response.result[0].message.chat.id,
-                                         message_id=get_updates_response.result[0].message.message_id)
-    assert response.result.poll.total_voter_count == 10
+    response = await tg_client.stop_poll(chat_id=1, message_id=2)
+    assert response.ok
+    assert response.result.is_closed
+    assert response.result.options[1].voter_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_poll_error(tg_client, mock_response):
+    mock_response.post(
+            f"{tg_client.get_url('stopPoll')}",
+            payload={"ok": False, "error_code": 400, "description": "Bad Request: poll is closed"},
+            status=400,
+        )
+    response = await tg_client.stop_poll(chat_id=1, message_id=2)
+    assert not response.ok
+    assert response.result is None
+    assert response.error_code == 400
 
 
 @pytest.mark.asyncio
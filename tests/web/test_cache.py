@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from sqlalchemy import insert, select
+
+from app.store.database.database import Database
+from app.web.cache import HTTP_CACHE_REQUESTS, RESPONSE_CACHE, cached_response, setup_cache
+from app.web.config import DatabaseConfig
+from app.web.utils import json_response
+from app.words_game.models import City
+
+
+@pytest.fixture
+async def database():
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    setup_cache(None)
+    RESPONSE_CACHE.entries.clear()
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+@pytest.fixture
+async def client(aiohttp_client, database):
+    calls = []
+
+    class CityView(web.View):
+        @cached_response("city")
+        async def get(self):
+            calls.append(self.request.query.get("page"))
+            cities = (await database.execute_query(select(City.name))).scalars().all()
+            return json_response(data={"cities": list(cities)})
+
+    app = web.Application()
+    app.router.add_view("/cities", CityView)
+    client = await aiohttp_client(app)
+    client.calls = calls
+    return client
+
+
+def cache_count(result: str) -> float:
+    return HTTP_CACHE_REQUESTS.labels("/cities", result).value
+
+
+async def test_etag_and_invalidation(client, database):
+    hits, not_modified = cache_count("hit"), cache_count("not_modified")
+    first = await client.get("/cities")
+    etag = first.headers["ETag"]
+    assert (await first.json())["data"]["cities"] == []
+
+    again = await client.get("/cities")
+    assert again.headers["ETag"] == etag and (await again.json())["data"]["cities"] == []
+    assert (await client.get("/cities", headers={"If-None-Match": etag})).status == 304
+    await client.get("/cities", params={"page": "2"})
+    assert client.calls == [None, "2"]
+    assert (cache_count("hit"), cache_count("not_modified")) == (hits + 1, not_modified + 1)
+
+    await database.execute_query(insert(City).values(name="Москва"))
+    changed = await client.get("/cities", headers={"If-None-Match": etag})
+    assert changed.status == 200 and changed.headers["ETag"] != etag
+    assert (await changed.json())["data"]["cities"] == ["Москва"]
+    assert client.calls == [None, "2", None]
+
+
+async def test_if_none_match_list(client):
+    etag = (await client.get("/cities")).headers["ETag"]
+    for header in (f'"other", {etag}', f"W/{etag}", "*"):
+        assert (await client.get("/cities", headers={"If-None-Match": header})).status == 304
+    # часть ETag или ETag без кавычек не совпадает с ним
+    for header in (etag[:-3] + '"', etag[1:-1], f'"x{etag[1:]}'):
+        assert (await client.get("/cities", headers={"If-None-Match": header})).status == 200
+
+
+async def test_version_changes_after_commit(client, database):
+    etag = (await client.get("/cities")).headers["ETag"]
+    async with database.session() as session:
+        await session.execute(insert(City).values(name="Москва"))
+        # до commit другие запросы читают старые строки: ETag тот же
+        assert (await client.get("/cities")).headers["ETag"] == etag
+        await session.rollback()
+    assert (await client.get("/cities")).headers["ETag"] == etag
+
+    async with database.session() as session:
+        await session.execute(insert(City).values(name="Москва"))
+        await session.commit()
+    changed = await client.get("/cities")
+    assert changed.headers["ETag"] != etag
+    assert (await changed.json())["data"]["cities"] == ["Москва"]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.store.database.database import Database
+from app.store.words_game.archive import GameArchiver
+from app.web.config import DatabaseConfig
+from app.web.pagination import keyset_page
+from app.words_game.export import export_rows, game_sessions_query
+from app.words_game.models import (
+    City,
+    GameSession,
+    UsedCity,
+    User,
+    UserGameSession,
+    WordsInGame,
+    Words,
+    game_sessions_archive,
+    used_cities_archive,
+    user_game_sessions_archive,
+    words_in_game_archive,
+)
+
+OLD = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def database():
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    await database.add_all_query([User(id=1, username="user1"), City(id=1, name="Москва")])
+    await database.add_all_query([Words(id=1, word="Слон")])
+    # 1-5 завершены давно, 6 завершена недавно, 7 активна
+    games = [
+        {"id": game_id, "game_type": "group", "chat_id": -game_id, "is_active": False, "created_at": OLD}
+        for game_id in range(1, 6)
+    ]
+    games.append(
+        {"id": 6, "game_type": "group", "chat_id": -6, "is_active": False, "created_at": datetime.now(timezone.utc)}
+    )
+    games.append({"id": 7, "game_type": "group", "chat_id": -7, "is_active": True, "created_at": OLD})
+    await database.execute_query(insert(GameSession).values(games))
+    for game_id in range(1, 8):
+        await database.execute_query(
+            insert(UserGameSession).values(game_sessions_id=game_id, player_id=1, point=game_id)
+        )
+        await database.execute_query(insert(WordsInGame).values(game_session_id=game_id, word_id=1))
+        await database.execute_query(insert(UsedCity).values(game_session_id=game_id, city_id=1))
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+async def count(database: Database, table) -> int:
+    return (await database.execute_query(select(func.count()).select_from(table))).scalar()
+
+
+async def test_archive_in_batches(database: Database):
+    archiver = GameArchiver(database, after=timedelta(days=30), batch_size=2)
+    assert await archiver.archive_batch() == 2
+    assert await count(database, game_sessions_archive) == 2
+
+    assert await archiver.archive_all() == 3
+    hot = (await database.execute_query(select(GameSession.id).order_by(GameSession.id))).scalars()
+    assert list(hot) == [6, 7]
+    for hot_model, archive in (
+        (UserGameSession, user_game_sessions_archive),
+        (WordsInGame, words_in_game_archive),
+        (UsedCity, used_cities_archive),
+    ):
+        assert await count(database, hot_model) == 2
+        assert await count(database, archive) == 5
+
+    points = select(user_game_sessions_archive.c.point).order_by(user_game_sessions_archive.c.point)
+    assert list((await database.execute_query(points)).scalars()) == [1, 2, 3, 4, 5]
+    assert await archiver.archive_batch() == 0
+
+
+async def test_archive_stays_queryable(database: Database):
+    await GameArchiver(database, after=timedelta(days=30)).archive_all()
+
+    rows, next_ = await keyset_page(database, game_sessions_archive, per_page=3)
+    assert [row.id for row in rows] == [1, 2, 3] and next_ is not None
+    rows, next_ = await keyset_page(database, game_sessions_archive, per_page=3, after=next_)
+    assert [row.id for row in rows] == [4, 5] and next_ is None
+    assert rows[0].archived_at is not None
+
+    query = game_sessions_query(date_from=OLD, archived=True)
+    chunks = [chunk async for chunk in export_rows(database, query, "ndjson")]
+    assert b"".join(chunks).count(b"\n") == 5
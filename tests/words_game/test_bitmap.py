@@ -0,0 +1,30 @@
+from app.store.words_game.bitmap import CityBitmap
+
+
+def test_empty_bitmap():
+    bitmap = CityBitmap()
+    assert 1 not in bitmap
+    assert len(bitmap) == 0
+    assert list(bitmap) == []
+    assert bitmap.to_bytes() == b""
+
+
+def test_add_and_contains():
+    bitmap = CityBitmap()
+    for city_id in (17285, 0, 9, 8):
+        bitmap.add(city_id)
+    assert 17285 in bitmap
+    assert 8 in bitmap
+    assert 10 not in bitmap
+    assert 100000 not in bitmap
+    assert len(bitmap) == 4
+    assert list(bitmap) == [0, 8, 9, 17285]
+
+
+def test_round_trip_bytes():
+    bitmap = CityBitmap()
+    bitmap.add(3)
+    bitmap.add(700)
+    restored = CityBitmap(bitmap.to_bytes())
+    assert list(restored) == [3, 700]
+    assert len(restored.to_bytes()) == 700 // 8 + 1
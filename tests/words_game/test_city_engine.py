@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.store.words_game.bitmap import CityBitmap
+from app.store.words_game.city_engine import CityGameEngine
+
+
+@pytest.fixture
+def words_game():
+    return SimpleNamespace(
+        get_city_names=AsyncMock(
+            return_value=[(1, "Москва"), (2, "Анапа"), (3, "Абакан"), (4, "Орёл"), (5, "Омск")]
+        ),
+        get_session_by_id=AsyncMock(
+            return_value=SimpleNamespace(id=10, next_start_letter="А", game_type="private")
+        ),
+        get_used_cities=AsyncMock(return_value=CityBitmap(b"\x04")),
+        save_city_move=AsyncMock(),
+    )
+
+
+@pytest.fixture
+async def engine(words_game):
+    engine = CityGameEngine(words_game=words_game)
+    await engine.load()
+    return engine
+
+
+async def test_cold_state_is_loaded_once(engine, words_game):
+    state = await engine.get_state(chat_id=7)
+    assert state.game_id == 10
+    assert state.next_letter == "А"
+    assert 2 in state.used
+    assert state.usage.starts["А"] == 1
+    assert await engine.get_state(chat_id=7) is state
+    assert words_game.get_session_by_id.call_count == 1
+    assert words_game.get_used_cities.call_count == 1
+
+
+async def test_pick_skips_used(engine):
+    state = engine.new_game(game_id=1, chat_id=7)
+    engine.play(state, city_id=2, next_letter="А")
+    for _ in range(10):
+        assert await engine.pick(state, letter="А") == (3, "Абакан")
+    engine.play(state, city_id=3, next_letter="Н")
+    assert await engine.pick(state, letter="А") is None
+    assert await engine.pick(state, letter="Я") is None
+
+
+async def test_moves_are_coalesced(engine, words_game):
+    state = engine.new_game(game_id=1, chat_id=7)
+    engine.play(state, city_id=1, next_letter="А")
+    engine.play(state, city_id=2, next_letter="А")
+    assert words_game.save_city_move.call_count == 0
+
+    await engine.flush()
+    assert words_game.save_city_move.call_count == 1
+    kwargs = words_game.save_city_move.call_args.kwargs
+    assert kwargs["game_session_id"] == 1
+    assert kwargs["next_letter"] == "А"
+    assert kwargs["city_ids"] == [1, 2]
+
+    await engine.flush()
+    assert words_game.save_city_move.call_count == 1
+
+
+async def test_finish_saves_pending(engine, words_game):
+    state = engine.new_game(game_id=1, chat_id=7)
+    engine.play(state, city_id=4, next_letter="Л")
+    assert await engine.finish(chat_id=7) is state
+    assert words_game.save_city_move.call_count == 1
+    assert 7 not in engine.states
+
+
+async def test_hard_level_leaves_fewest_cities(engine):
+    state = engine.new_game(game_id=1, chat_id=7)
+    assert engine.set_level(chat_id=7, level="hard")
+    assert not engine.set_level(chat_id=7, level="impossible")
+    # Анапа ведет на А (останется Абакан), Абакан - на Н (городов нет)
+    for _ in range(10):
+        assert await engine.pick(state, letter="А") == (3, "Абакан")
@@ -0,0 +1,62 @@
+import pytest
+
+from app.store.words_game.city_index import CityIndex, levenshtein, normalize_name
+
+
+@pytest.fixture
+def city_index():
+    return CityIndex.build(
+        [
+            (1, "Москва"),
+            (2, "Мосальск"),
+            (3, "Санкт-Петербург"),
+            (4, "Новосибирск"),
+            (5, "Калининград"),
+            (6, "Орёл"),
+            (7, "Омск"),
+            (8, "Москва"),
+        ]
+    )
+
+
+def test_normalize_name():
+    assert normalize_name(" Санкт-Петербург ") == "санкт петербург"
+    assert normalize_name("Орёл") == "орел"
+
+
+@pytest.mark.parametrize(
+    "a, b, distance",
+    [("", "омск", 4), ("москва", "москва", 0), ("масква", "москва", 1), ("калиниград", "калининград", 1)],
+)
+def test_levenshtein(a, b, distance):
+    assert levenshtein(a, b) == distance
+    assert levenshtein(b, a) == distance
+
+
+def test_duplicates_keep_first_id(city_index):
+    assert len(city_index) == 7
+    assert city_index.get("Москва") == (1, "Москва")
+
+
+def test_get_exact(city_index):
+    assert city_index.get("орел") == (6, "Орёл")
+    assert city_index.get("Масква") is None
+
+
+@pytest.mark.parametrize(
+    "name, city",
+    [
+        ("Масква", (1, "Москва")),
+        ("Санкт Петербур", (3, "Санкт-Петербург")),
+        ("Навосибирк", (4, "Новосибирск")),
+        ("Калиниград", (5, "Калининград")),
+    ],
+)
+def test_suggest(city_index, name, city):
+    assert city_index.suggest(name) == city
+
+
+def test_suggest_too_far(city_index):
+    assert city_index.suggest("Владивосток") is None
+    assert city_index.suggest("Омк") is None
+    assert city_index.suggest("Мскв", max_distance=1) is None
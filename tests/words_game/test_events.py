@@ -0,0 +1,67 @@
+from app.store.words_game.events import GameEventLog, GameEventRecord, GameReplay
+from app.store.words_game.memory import MemoryGameStore
+
+
+def test_replay_group_game():
+    events = [
+        GameEventRecord(game_id=1, kind="game_started", user_id=10, data={"life": 2}),
+        GameEventRecord(game_id=1, kind="player_joined", user_id=10, data={"life": 2}),
+        GameEventRecord(game_id=1, kind="player_joined", user_id=11, data={"life": 2}),
+        GameEventRecord(game_id=1, kind="next_player", user_id=10, data={"letter": None}),
+        GameEventRecord(game_id=1, kind="word", user_id=10, data={"word": "Арбуз", "next_letter": "З"}),
+        GameEventRecord(game_id=1, kind="next_player", user_id=11, data={"letter": "З"}),
+        GameEventRecord(game_id=1, kind="word_rejected", user_id=11, data={"word": "Кот"}),
+        GameEventRecord(game_id=1, kind="life_lost", user_id=11, data={"reason": "word"}),
+        GameEventRecord(game_id=1, kind="game_finished"),
+    ]
+    replay = GameReplay.fold(1, events)
+    assert replay.words == ["Арбуз"]
+    assert (replay.next_user_id, replay.next_letter) == (11, "З")
+    assert {player.user_id: (player.points, player.life) for player in replay.players.values()} == {
+        10: (1, 2),
+        11: (0, 1),
+    }
+    assert replay.finished
+    assert replay.events == len(events)
+
+
+class FlakyStore(MemoryGameStore):
+    def __init__(self, fail: int = 0):
+        super().__init__()
+        self.fail = fail
+        self.batches = []
+
+    async def add_game_events(self, events):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("database is down")
+        self.batches.append(len(events))
+        await super().add_game_events(events)
+
+
+async def test_event_log_writes_batches():
+    store = FlakyStore()
+    log = GameEventLog(words_game=store, batch_size=3)
+    for city_id in range(7):
+        log.append(1, "city", city_id=city_id, next_letter="А")
+    await log.flush()
+    assert store.batches == [3, 3, 1]
+    assert len(log) == 0
+
+    replay = await log.replay(1)
+    assert replay.cities == list(range(7))
+    assert replay.players == {}
+
+
+async def test_event_log_keeps_events_until_written():
+    store = FlakyStore(fail=1)
+    log = GameEventLog(words_game=store, batch_size=2, max_buffer=3)
+    for city_id in range(4):
+        log.append(1, "city", city_id=city_id)
+    await log.flush()
+    assert store.batches == []
+    # в буфере остаются самые новые события
+    assert len(log) == 3
+
+    await log.flush()
+    assert [event.data["city_id"] for event in store.events[1]] == [1, 2, 3]
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.store.database.database import Database
+from app.web.config import DatabaseConfig
+from app.words_game.export import export_rows, game_sessions_query, players_query
+from app.words_game.models import GameSession, User
+
+
+@pytest.fixture
+async def database():
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    await database.add_all_query(
+        [User(id=user_id, username=f"user{user_id}") for user_id in range(1, 6)]
+    )
+    games = ["private", "group", "group", "private"]
+    await database.execute_query(
+        insert(GameSession).values(
+            [
+                {"id": game_id, "game_type": game_type, "chat_id": -game_id, "is_active": False}
+                for game_id, game_type in enumerate(games, start=1)
+            ]
+        )
+    )
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+async def collect(database: Database, query, fmt: str) -> list[bytes]:
+    return [chunk async for chunk in export_rows(database, query, fmt, chunk_size=2)]
+
+
+async def test_players_ndjson(database: Database):
+    chunks = await collect(database, players_query(), "ndjson")
+    assert len(chunks) == 3
+    players = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [player["username"] for player in players] == [f"user{num}" for num in range(1, 6)]
+    assert datetime.fromisoformat(players[0]["created_at"])
+
+
+async def test_game_sessions_csv_filters(database: Database):
+    chunks = await collect(database, game_sessions_query(game_type="group"), "csv")
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0][:3] == ["id", "game_type", "chat_id"]
+    assert [row[0] for row in rows[1:]] == ["2", "3"]
+
+    old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    await database.execute_query(
+        update(GameSession).where(GameSession.id == 1).values(created_at=old)
+    )
+    query = game_sessions_query(date_from=old, date_to=old + timedelta(days=1))
+    chunks = await collect(database, query, "ndjson")
+    assert [json.loads(line)["id"] for line in b"".join(chunks).decode().splitlines()] == [1]
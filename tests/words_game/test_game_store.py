@@ -0,0 +1,162 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.store.database.database import Database
+from app.store.words_game.accessor import WGAccessor
+from app.store.words_game.events import GameEventRecord
+from app.store.words_game.leaderboard import GLOBAL_CHAT, LeaderEntry, PlayerResult
+from app.store.words_game.memory import MemoryGameStore, read_city_sql
+from app.store.words_game.store import GameStore
+from app.web.config import DatabaseConfig
+from app.words_game.models import City
+
+CITIES = [(1, "Москва"), (2, "Анапа"), (3, "Абакан")]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def store(request) -> GameStore:
+    if request.param == "memory":
+        yield MemoryGameStore(cities=CITIES)
+        return
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    await database.add_all_query([City(id=city_id, name=name) for city_id, name in CITIES])
+    try:
+        yield WGAccessor(database=database)
+    finally:
+        await database.disconnect()
+
+
+async def test_game_lookup(store: GameStore):
+    user = await store.create_user(user_id=10, username="first")
+    old = await store.create_game_session(user_id=user.id, chat_id=-5, chat_type="group")
+    await store.update_game_session(game_id=old.id, status=False)
+    game = await store.create_game_session(user_id=user.id, chat_id=-5, chat_type="group", life=2)
+
+    assert (await store.get_session_by_id(chat_id=-5)).id == game.id
+    assert (await store.get_session_by_id(chat_id=-5, is_active=False)).id == old.id
+    assert await store.get_session_by_id(chat_id=-6) is None
+
+    await store.update_game_session(game_id=game.id, poll_id=77, next_letter="А")
+    found = await store.get_game_session_by_poll_id(poll_id=77)
+    assert (found.id, found.next_start_letter) == (game.id, "А")
+    await store.update_game_session(game_id=game.id)
+    assert await store.get_game_session_by_poll_id(poll_id=77) is None
+
+
+async def test_team_and_polls(store: GameStore):
+    game = await store.create_game_session(user_id=None, chat_id=-7, chat_type="group")
+    for user_id in (1, 2):
+        await store.create_user(user_id=user_id, username=f"user{user_id}")
+        await store.add_user_to_team(user_id=user_id, game_id=game.id, life=2)
+
+    await store.update_team(game_session_id=game.id, user_id=1, point=3, round_=1)
+    await store.remove_life_from_player(game_id=game.id, player_id=2, round_=1)
+    await store.remove_life_from_player(game_id=game.id, player_id=2)
+    player = await store.get_player(player_id=1, game_session_id=game.id)
+    assert (player.point, player.round_, player.life) == (3, 1, 2)
+    assert await store.get_team_by_game_id(game_session_id=game.id) == [1]
+    players = await store.get_player_list(game_session_id=game.id)
+    assert sorted(players) == [("user1", 3), ("user2", 0)]
+
+    await store.set_player_poll_answer(game_session_id=game.id, player_id=1, answer=True)
+    assert await store.check_not_anonim_poll(game_session_id=game.id) is True
+    assert await store.check_not_anonim_poll(game_session_id=game.id) is False
+
+    await store.update_total_points_to_user(game.id)
+    assert (await store.select_user_by_id(1)).total_point == 3
+
+
+async def test_words_and_cities(store: GameStore):
+    game = await store.create_game_session(user_id=None, chat_id=-8, chat_type="private")
+    await store.add_used_word(game_session_id=game.id, word="слон")
+    await store.add_used_word(game_session_id=game.id, word="Слон")
+    assert await store.get_list_words_by_game_id(game_session_id=game.id) == ["Слон", "Слон"]
+
+    await store.set_city_to_used(city_id=2, game_session_id=game.id)
+    assert await store.check_city_in_used(city_id=2, game_session_id=game.id)
+    assert (await store.get_city_by_name("Анапа")).id == 2
+    assert [city.name for city in await store.get_city_list_by_session_id(game.id)] == ["Анапа"]
+
+
+def test_city_sql_is_readable():
+    cities = read_city_sql()
+    assert cities[0] == (1, "Москва")
+    assert len({name for _, name in cities}) > 1000
+
+
+async def test_player_stats(store: GameStore):
+    await store.create_user(user_id=10, username="first")
+    await store.create_user(user_id=11, username="second")
+    results = [
+        PlayerResult(user_id=10, words=3, won=True, response_time=4.5, answers=3),
+        PlayerResult(user_id=11, words=1),
+    ]
+    await store.save_player_stats(chat_id=-5, results=results)
+    await store.save_player_stats(chat_id=-6, results=results[:1])
+
+    chat = sorted(await store.get_leaderboard(chat_id=-5), key=lambda entry: entry.user_id)
+    assert chat == [
+        LeaderEntry(user_id=10, username="first", words=3, wins=1, games=1),
+        LeaderEntry(user_id=11, username="second", words=1, wins=0, games=1),
+    ]
+    overall = {entry.user_id: entry for entry in await store.get_leaderboard(chat_id=GLOBAL_CHAT)}
+    assert (overall[10].words, overall[10].wins, overall[10].games) == (6, 2, 2)
+
+
+async def test_game_results(store: GameStore):
+    await store.create_user(user_id=10, username="first")
+    game = await store.create_game_session(user_id=10, chat_id=-9, chat_type="group")
+    await store.add_user_to_team(user_id=10, game_id=game.id)
+    await store.update_team(game_session_id=game.id, user_id=10, point=2, round_=1)
+    assert await store.get_game_results(game_session_id=game.id) == [
+        PlayerResult(user_id=10, username="first", words=2)
+    ]
+
+
+async def test_game_events(store: GameStore):
+    await store.create_user(user_id=10, username="first")
+    game = await store.create_game_session(user_id=10, chat_id=-9, chat_type="group")
+    await store.add_game_events(
+        [
+            GameEventRecord(game_id=game.id, kind="player_joined", user_id=10, data={"life": 3}),
+            GameEventRecord(game_id=game.id, kind="word", user_id=10, data={"word": "Арбуз"}),
+            GameEventRecord(game_id=game.id + 1, kind="game_finished"),
+        ]
+    )
+    events = await store.get_game_events(game_session_id=game.id)
+    assert [(event.kind, event.user_id, event.data) for event in events] == [
+        ("player_joined", 10, {"life": 3}),
+        ("word", 10, {"word": "Арбуз"}),
+    ]
+
+    await store.change_next_user_to_game_session(game_id=game.id, user_id=10, next_letter="З")
+    game = await store.get_session_by_id(chat_id=-9)
+    assert (game.next_user_id, game.next_start_letter) == (10, "З")
+    await store.change_next_user_to_game_session(game_id=game.id, user_id=10)
+    assert (await store.get_session_by_id(chat_id=-9)).next_start_letter == "З"
+
+
+async def test_used_words_and_total_points(store: GameStore):
+    await store.create_user(user_id=10, username="first")
+    await store.create_user(user_id=11, username="second")
+    game = await store.create_game_session(user_id=10, chat_id=-9, chat_type="group")
+    other = await store.create_game_session(user_id=11, chat_id=-8, chat_type="group")
+    await store.add_used_word(game_session_id=game.id, word="арбуз")
+    await store.add_used_word(game_session_id=other.id, word="Арбуз")
+    assert await store.get_list_words_by_game_id(game_session_id=game.id) == ["Арбуз"]
+    assert await store.get_list_words_by_game_id(game_session_id=other.id) == ["Арбуз"]
+
+    for user_id in (10, 11):
+        await store.add_user_to_team(user_id=user_id, game_id=game.id)
+    await store.update_team(game_session_id=game.id, user_id=10, point=2, round_=1)
+    await store.update_total_points_to_user(game_id=game.id)
+    await store.flush()
+    assert (await store.select_user_by_id(10)).total_point == 2
+    assert (await store.select_user_by_id(11)).total_point == 0
@@ -0,0 +1,58 @@
+from app.store.words_game.leaderboard import (
+    GLOBAL_CHAT,
+    LeaderEntry,
+    Leaderboard,
+    PlayerResult,
+    PlayerStatsEngine,
+    mark_winner,
+)
+from app.store.words_game.memory import MemoryGameStore, UserRecord
+
+
+def test_leaderboard_order_and_rank():
+    board = Leaderboard.build(
+        [
+            LeaderEntry(user_id=1, username="a", words=5, wins=1, games=2),
+            LeaderEntry(user_id=2, username="b", words=9, wins=0, games=3),
+            LeaderEntry(user_id=3, username="c", words=5, wins=2, games=2),
+        ]
+    )
+    assert [entry.user_id for entry in board.top(2)] == [2, 3]
+    assert board.rank(1) == 3
+    assert board.rank(4) is None
+
+    entry = board.add(PlayerResult(user_id=1, words=6, won=True))
+    assert (entry.words, entry.wins, entry.games, entry.username) == (11, 2, 3, "a")
+    assert [entry.user_id for entry in board.top()] == [1, 2, 3]
+    assert len(board) == 3
+
+    board.add(PlayerResult(user_id=4, username="d", words=1))
+    assert board.rank(4) == 4
+
+
+def test_mark_winner():
+    results = [PlayerResult(user_id=1, words=3), PlayerResult(user_id=2, words=1)]
+    mark_winner(results)
+    assert [result.won for result in results] == [True, False]
+
+    tie = [PlayerResult(user_id=1, words=2), PlayerResult(user_id=2, words=2)]
+    mark_winner(tie)
+    assert not any(result.won for result in tie)
+
+
+async def test_engine_updates_loaded_boards():
+    store = MemoryGameStore()
+    store.users[1] = UserRecord(id=1, username="a")
+    engine = PlayerStatsEngine(words_game=store)
+    board = await engine.board(-10)
+    assert len(board) == 0
+
+    engine.prompt(game_id=7)
+    engine.answered(game_id=7, user_id=1)
+    engine.answered(game_id=7, user_id=1)
+    await engine.finish(-10, 7, [PlayerResult(user_id=1, username="a", words=4, won=True)])
+
+    assert board.top() == [LeaderEntry(user_id=1, username="a", words=4, wins=1, games=1)]
+    record = store.stats[GLOBAL_CHAT][1]
+    assert (record.games, record.words, record.answers) == (1, 4, 1)
+    assert engine.prompts == {} and engine.timings == {}
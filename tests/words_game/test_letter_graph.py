@@ -0,0 +1,72 @@
+import pytest
+
+from app.store.words_game.bitmap import CityBitmap
+from app.store.words_game.letter_graph import LetterGraph, exit_letter
+
+
+@pytest.fixture
+def graph():
+    return LetterGraph.build(
+        [
+            (1, "Анапа"),
+            (2, "Абакан"),
+            (3, "Адлер"),
+            (4, "Архангельск"),
+            (5, "Нальчик"),
+            (6, "Рязань"),
+            (7, "Ростов"),
+            (8, "Ржев"),
+            (9, "Калуга"),
+            (10, "Ь"),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "name, letter", [("Москва", "А"), ("Омск", "К"), ("Грозный", "Н"), ("Орёл", "Л"), ("Ь", None)]
+)
+def test_exit_letter(name, letter):
+    assert exit_letter(name) == letter
+
+
+def test_build(graph):
+    assert graph.starts["А"] == 4
+    assert graph.pairs["А", "Р"] == 1
+    assert graph.pairs["Р", "В"] == 2
+    assert sorted(graph.edges["А"]) == ["А", "К", "Н", "Р"]
+    assert graph.city_letters[4] == ("А", "К")
+    assert 10 not in graph.city_letters
+
+
+def test_usage_from_bitmap(graph):
+    used = CityBitmap()
+    for city_id in (1, 7):
+        used.add(city_id)
+    usage = graph.usage_from(used)
+    assert graph.left(usage, "А") == 3
+    assert graph.left(usage, "Р") == 2
+    assert usage.pairs["Р", "В"] == 1
+
+
+@pytest.mark.parametrize("level, exits", [("hard", {"К", "Н"}), ("easy", {"А", "Р"})])
+def test_choose_exit(graph, level, exits):
+    # с А: на А после хода останется 3 города, на Р - 3, на Н и К - по одному
+    usage = graph.usage_from(CityBitmap())
+    assert {graph.choose_exit(usage, "А", level) for _ in range(50)} == exits
+
+
+def test_choose_exit_prefers_exhausted(graph):
+    usage = graph.usage_from(CityBitmap())
+    graph.use(usage, 5)
+    # после Нальчика на Н городов нет - игроку нечем ответить
+    assert graph.choose_exit(usage, "А", "hard") == "Н"
+
+
+def test_exhausted_letter(graph):
+    used = CityBitmap()
+    usage = graph.usage_from(used)
+    graph.use(usage, 9)
+    used.add(9)
+    assert graph.choose_exit(usage, "К", "hard") is None
+    assert graph.pick(usage, used, "К", "А") is None
+    assert graph.pick(usage, used, "А", "Р") == 3
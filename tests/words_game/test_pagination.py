@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+from aiohttp.web_exceptions import HTTPBadRequest
+from marshmallow import ValidationError
+
+from app.store.database.database import Database
+from app.web.config import DatabaseConfig
+from app.web.pagination import ApproximateCount, decode_cursor, encode_cursor, keyset_page
+from app.words_game.models import City
+from app.words_game.schemes import PaginationSchema, PaginationSchemaGames
+
+
+@pytest.fixture
+async def database():
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    await database.add_all_query(
+        [City(id=city_id, name=f"Город {city_id}") for city_id in range(1, 26)]
+    )
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(123456789)) == 123456789
+    with pytest.raises(HTTPBadRequest):
+        decode_cursor("не курсор")
+
+
+async def test_keyset_pages(database: Database):
+    ids, after = [], None
+    while True:
+        rows, after = await keyset_page(database, City, 10, after=after, descending=True)
+        ids.extend(city.id for city in rows)
+        if after is None:
+            break
+    assert ids == list(range(25, 0, -1))
+
+    rows, after = await keyset_page(database, City, 10, offset=20)
+    assert [city.id for city in rows] == [21, 22, 23, 24, 25] and after is None
+
+
+async def test_approximate_count_is_cached(database: Database):
+    totals = ApproximateCount(ttl=60)
+    assert await totals.get(database, City) == 25
+    await database.add_query(City(id=26, name="Город 26"))
+    assert await totals.get(database, City) == 25
+    totals.clear()
+    assert await totals.get(database, City) == 26
+
+
+async def test_approximate_count_without_statistics(database: Database, monkeypatch):
+    execute_query = database.execute_query
+
+    async def execute(query):
+        if "reltuples" in str(query):
+            # таблица без ANALYZE: оценка планировщика 0
+            return SimpleNamespace(scalar=lambda: 0)
+        return await execute_query(query)
+
+    monkeypatch.setattr(database, "execute_query", execute)
+    monkeypatch.setattr(database, "dialect", "postgresql")
+    assert await ApproximateCount().get(database, City) == 25
+
+
+def test_pagination_schema():
+    assert PaginationSchema().load({}) == {"page": 1, "per_page": 20, "total": False}
+    assert PaginationSchemaGames().load({"per_page": "5", "archived": "true"})["archived"] is True
+    for params in ({"per_page": "0"}, {"per_page": "-1"}, {"page": "0"}):
+        with pytest.raises(ValidationError):
+            PaginationSchema().load(params)
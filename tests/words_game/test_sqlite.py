@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.store.database.database import Database
+from app.store.words_game.accessor import WGAccessor
+from app.web.config import DatabaseConfig
+
+
+@pytest.fixture
+async def accessor():
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    try:
+        yield WGAccessor(database=database)
+    finally:
+        await database.disconnect()
+
+
+async def test_create_user_is_idempotent(accessor: WGAccessor):
+    assert accessor.database.dialect == "sqlite"
+    user = await accessor.create_user(user_id=7, username="test")
+    again = await accessor.create_user(user_id=7, username="other")
+    assert (user.id, again.id, again.username) == (7, 7, "test")
+
+
+async def test_word_verdicts_accumulate(accessor: WGAccessor):
+    await accessor.save_word_verdict(word="слон", chat_id=5, yes=2, no=1)
+    assert await accessor.get_word_verdict(word="Слон", chat_id=5) is True
+    await accessor.save_word_verdict(word="Слон", chat_id=5, yes=0, no=3)
+    # 2 за и 4 против: слово отклонено с уверенностью 4/6
+    assert await accessor.get_word_verdict(word="Слон", chat_id=5) is False
+    assert await accessor.get_word_verdict(word="Слон", chat_id=6) is None
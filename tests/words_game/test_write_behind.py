@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.store.database.database import Database
+from app.store.words_game.accessor import WGAccessor
+from app.store.words_game.write_behind import WriteBehind
+from app.web.config import DatabaseConfig
+
+
+@pytest.fixture
+async def database() -> Database:
+    cfg = SimpleNamespace(
+        database=DatabaseConfig(
+            host=None, port=None, user=None, password=None, database=None, driver="sqlite+aiosqlite"
+        )
+    )
+    database = Database(cfg=cfg)
+    await database.connect()
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+async def test_reads_see_deferred_writes(database: Database):
+    write_behind = WriteBehind(database=database, interval=60)
+    store = WGAccessor(database=database, write_behind=write_behind)
+    await store.create_user(user_id=10, username="first")
+    game = await store.create_game_session(user_id=10, chat_id=-9, chat_type="group")
+    await store.add_user_to_team(user_id=10, game_id=game.id)
+
+    await store.update_team(game_session_id=game.id, user_id=10, point=1, round_=1)
+    await store.add_used_word(game_session_id=game.id, word="Арбуз")
+    assert len(write_behind) == 3
+
+    # чтение игры не выполняет накопленные записи, а добавляет их к строкам базы
+    player = await store.get_player(player_id=10, game_session_id=game.id)
+    assert (player.point, player.round_) == (1, 1)
+    assert await store.get_player_list(game_session_id=game.id) == [("first", 1)]
+    assert await store.get_list_words_by_game_id(game_session_id=game.id) == ["Арбуз"]
+    assert len(write_behind) == 3
+    # другая игра не видит изменений этой
+    assert await store.get_list_words_by_game_id(game_session_id=game.id + 1) == []
+
+    await write_behind.flush()
+    assert len(write_behind) == 0
+    player = await store.get_player(player_id=10, game_session_id=game.id)
+    assert (player.point, player.round_) == (1, 1)
+    assert await store.get_list_words_by_game_id(game_session_id=game.id) == ["Арбуз"]
+
+    await store.update_total_points_to_user(game_id=game.id)
+    # пользователи читаются без ожидания отложенных записей
+    assert (await store.select_user_by_id(10)).total_point == 0
+    await store.flush()
+    assert (await store.select_user_by_id(10)).total_point == 1
+    assert write_behind._task is None
+
+
+async def test_flush_by_batch_size(database: Database):
+    write_behind = WriteBehind(database=database, interval=60, batch_size=2)
+    store = WGAccessor(database=database, write_behind=write_behind)
+    await store.create_user(user_id=10, username="first")
+    game = await store.create_game_session(user_id=10, chat_id=-9, chat_type="group")
+
+    await store.add_used_word(game_session_id=game.id, word="Арбуз")
+    for _ in range(10):
+        if not write_behind:
+            break
+        await asyncio.sleep(0.01)
+    assert len(write_behind) == 0
+    assert await WGAccessor(database=database).get_list_words_by_game_id(game.id) == ["Арбуз"]
+    await store.flush()
+
+
+async def test_failed_batch_is_retried(database: Database, monkeypatch):
+    write_behind = WriteBehind(database=database, interval=60)
+    store = WGAccessor(database=database, write_behind=write_behind)
+    await store.create_user(user_id=10, username="first")
+    game = await store.create_game_session(user_id=10, chat_id=-9, chat_type="group")
+    await store.add_used_word(game_session_id=game.id, word="Арбуз")
+
+    execute_transaction = database.execute_transaction
+
+    async def unavailable(queries):
+        raise ConnectionError("database is unavailable")
+
+    monkeypatch.setattr(database, "execute_transaction", unavailable)
+    await write_behind.flush()
+    await store.add_used_word(game_session_id=game.id, word="Дыня")
+    # пачка вернулась в начало очереди и по-прежнему видна чтению игры
+    assert len(write_behind) == 4
+    assert await store.get_list_words_by_game_id(game_session_id=game.id) == ["Арбуз", "Дыня"]
+
+    monkeypatch.setattr(database, "execute_transaction", execute_transaction)
+    await store.flush()
+    assert len(write_behind) == 0
+    words = await WGAccessor(database=database).get_list_words_by_game_id(game.id)
+    assert words == ["Арбуз", "Дыня"]
+
+
+async def test_failed_write_is_dropped_after_attempts(database: Database):
+    write_behind = WriteBehind(database=database, interval=60, max_attempts=2)
+    store = WGAccessor(database=database, write_behind=write_behind)
+    # игры 404 нет: внешний ключ words_in_game -> game_sessions не дает записать пачку
+    await store.add_used_word(game_session_id=404, word="Арбуз")
+    await write_behind.flush()
+    assert len(write_behind) == 2
+    await store.flush()
+    assert len(write_behind) == 0
+    assert await store.get_list_words_by_game_id(game_session_id=404) == []
+
+
+async def test_failed_batch_is_bounded(database: Database, monkeypatch):
+    write_behind = WriteBehind(database=database, interval=60, max_pending=3)
+
+    async def unavailable(queries):
+        raise ConnectionError("database is unavailable")
+
+    monkeypatch.setattr(database, "execute_transaction", unavailable)
+    store = WGAccessor(database=database, write_behind=write_behind)
+    await store.add_used_word(game_session_id=1, word="Арбуз")
+    await store.add_used_word(game_session_id=1, word="Дыня")
+    await write_behind.flush()
+    # самая старая запись теряется, очередь не больше max_pending запросов
+    assert len(write_behind) == 2
+    assert await store.get_list_words_by_game_id(game_session_id=1) == ["Дыня"]
+    await store.flush()
+    assert write_behind._task is None
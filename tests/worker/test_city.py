@@ -2,12 +2,19 @@
 from unittest.mock import patch
 
 import bson
+import pytest
 
 from app.worker_app.worker import Worker
 from tests.conftest import IncomingMessage
 from tests.poller.fixtures import *
 
 
+@pytest.fixture(autouse=True)
+def reset_city_engine(worker: Worker):
+    worker.city_engine.states.clear()
+    worker.city_engine._pending.clear()
+
+
 class TestCity:
 
     async def test_get_city(self, worker: Worker, city):
@@ -33,7 +40,9 @@ class TestCity:
 
         with patch.object(target=worker.words_game,
                           attribute="get_session_by_id",
-                          return_value=game) as mock:
+                          return_value=game) as mock, \
+                patch.object(target=worker.city_engine, attribute="find",
+                             return_value=(city.id, "Москва")):
             upd = UpdateObj.Schema().load({
                                            "message": {"text": "Москва",
                                                        "message_id": 1,
@@ -80,9 +89,9 @@ class TestCity:
         with patch.object(target=worker.words_game,
                           attribute="get_session_by_id",
                           return_value=game) as mock:
-            with patch.object(target=worker.words_game,
-                              attribute="get_city_by_name",
-                              return_value=city) as mock_city:
+            with patch.object(target=worker.city_engine,
+                              attribute="find",
+                              return_value=(city.id, city.name)) as mock_city:
                 upd = UpdateObj.Schema().load({
                     "message": {"text": "Москва",
                                 "message_id": 1,
@@ -162,6 +171,29 @@ class TestWorker:
         assert mock_update_game_session.call_count == 1
         assert mock_right_word.call_count == 1
 
+    async def test_on_message_poll_result_saves_verdict(self, worker: Worker, game, mocker):
+        mocker.patch.object(target=worker.words_game, attribute="get_session_by_id", return_value=game)
+        mocker.patch.object(target=worker.words_game, attribute="update_game_session")
+        mock_save_word_verdict = mocker.patch.object(
+            target=worker.words_game, attribute="save_word_verdict"
+        )
+        mocker.patch.object(target=worker, attribute="right_word")
+        message = IncomingMessage(
+            body=bson.dumps({
+                "type_": "poll_result",
+                "chat_id": game.chat_id,
+                "poll_id": 123,
+                "poll_result": "yes",
+                "poll_type": True,
+                "word": "Слон",
+                "yes": 3,
+                "no": 1,
+            }),
+            routing_key=worker.routing_key_worker
+        )
+        await worker.on_message(message=message)
+        mock_save_word_verdict.assert_called_once_with(word="Слон", chat_id=game.chat_id, yes=3, no=1)
+
     async def test_on_message_poll_result_no(self, worker: Worker, game, mocker):
         mock_get_session_by_id = mocker.patch.object(
             target=worker.words_game,
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from app.store.rabbitMQ.broker import load_message
+from app.store.rabbitMQ.memory import MemoryBroker
+from app.store.rabbitMQ.shards import Shard, shard_routing_key
+from app.store.words_game.memory import MemoryGameStore
+from app.web.config import config as cfg
+from app.worker_app.worker import Worker
+
+CITIES = [(1, "Москва"), (2, "Анапа"), (3, "Абакан"), (4, "Нальчик")]
+
+
+def shard_key(chat_id: int) -> str:
+    return shard_routing_key("poller", chat_id, 2)
+
+
+def update(update_id: int, text: str, chat_id: int = 5) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1,
+            "text": text,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "username": "player", "first_name": "Player"},
+        },
+    }
+
+
+@pytest.fixture
+async def stateless_worker():
+    broker = MemoryBroker()
+    worker = Worker(cfg=cfg, broker=broker, store=MemoryGameStore(cities=CITIES))
+    sent = []
+
+    async def on_message(message):
+        sent.append(load_message(message))
+        await message.ack()
+
+    await worker.start()
+    task = asyncio.create_task(broker.listen_events(["sender"], "tg_bot_sender", on_message))
+    try:
+        yield worker, broker, sent
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await worker.stop()
+
+
+async def wait_sent(sent: list, count: int):
+    for _ in range(100):
+        if len(sent) >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(sent)
+
+
+async def test_city_game_without_database(stateless_worker):
+    worker, broker, sent = stateless_worker
+    assert worker.database is None
+
+    await broker.send_event(update(1, "/play"), routing_key="poller")
+    await wait_sent(sent, 2)
+    assert sent[0]["text"] == "player let's play"
+    game = await worker.words_game.get_session_by_id(chat_id=5)
+    assert game.game_type == "private"
+
+    await broker.send_event(update(2, "/stop"), routing_key="poller")
+    await wait_sent(sent, 3)
+    assert sent[2]["text"].startswith("В этой игре участвовали: ")
+    assert await worker.words_game.get_session_by_id(chat_id=5) is None
+
+
+async def test_top_after_city_game(stateless_worker):
+    worker, broker, sent = stateless_worker
+
+    await broker.send_event(update(1, "/play"), routing_key="poller")
+    await wait_sent(sent, 2)
+    await broker.send_event(update(2, "/stop"), routing_key="poller")
+    await wait_sent(sent, 3)
+
+    await broker.send_event(update(3, "/top"), routing_key="poller")
+    await wait_sent(sent, 4)
+    assert sent[3]["text"] == "Общий рейтинг:\n1. @player - 0, побед 0"
+    assert worker.words_game.stats[5][5].games == 1
+
+
+async def test_city_game_event_log(stateless_worker):
+    worker, broker, sent = stateless_worker
+
+    await broker.send_event(update(1, "/play"), routing_key="poller")
+    await wait_sent(sent, 2)
+    await broker.send_event(update(2, "/stop"), routing_key="poller")
+    await wait_sent(sent, 3)
+
+    game = await worker.words_game.get_session_by_id(chat_id=5, is_active=False)
+    replay = await worker.event_log.replay(game.id)
+    assert replay.game_type == "private"
+    assert len(replay.cities) == 1
+    assert replay.finished
+
+
+async def test_sharded_workers():
+    broker = MemoryBroker()
+    workers = [
+        Worker(cfg=cfg, broker=broker, store=MemoryGameStore(cities=CITIES), shard=Shard(i, 2))
+        for i in range(2)
+    ]
+    sent = []
+
+    async def on_message(message):
+        sent.append(load_message(message))
+        await message.ack()
+
+    for worker in workers:
+        await worker.start()
+    task = asyncio.create_task(broker.listen_events(["sender"], "tg_bot_sender", on_message))
+    try:
+        await broker.send_event(update(1, "/play", chat_id=4), routing_key=shard_key(4))
+        await broker.send_event(update(2, "/play", chat_id=5), routing_key=shard_key(5))
+        await wait_sent(sent, 4)
+        # сообщение не своему шарду не обрабатывается
+        await broker.send_event(update(3, "/stop", chat_id=5), routing_key="poller.0")
+        await asyncio.sleep(0.05)
+        assert len(sent) == 4
+
+        assert await workers[0].words_game.get_session_by_id(chat_id=4) is not None
+        assert await workers[0].words_game.get_session_by_id(chat_id=5) is None
+        assert await workers[1].words_game.get_session_by_id(chat_id=5) is not None
+        assert workers[1].queue_name == "tg_bot_1"
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        for worker in workers:
+            await worker.stop()
+
+
+async def test_city_game_stays_on_its_shard():
+    # игрок 5 играет в города в личном чате (шард 1) и пишет город в группе -4 (шард 0)
+    broker, store = MemoryBroker(), MemoryGameStore(cities=CITIES)
+    workers = [Worker(cfg=cfg, broker=broker, store=store, shard=Shard(i, 2)) for i in range(2)]
+    sent = []
+
+    async def on_message(message):
+        sent.append(load_message(message))
+        await message.ack()
+
+    def group_update(update_id: int, text: str) -> dict:
+        upd = update(update_id, text)
+        upd["message"]["chat"] = {"id": -4, "type": "group"}
+        return upd
+
+    for worker in workers:
+        await worker.start()
+    task = asyncio.create_task(broker.listen_events(["sender"], "tg_bot_sender", on_message))
+    try:
+        await broker.send_event(update(1, "/play"), routing_key=shard_key(5))
+        await wait_sent(sent, 2)
+        await broker.send_event(group_update(2, "Москва"), routing_key=shard_key(-4))
+        await asyncio.sleep(0.05)
+        assert len(sent) == 2
+        assert 5 not in workers[0].city_engine.states
+        assert await workers[0].city_engine.get_state(5) is None
+        assert 5 in workers[1].city_engine.states
+
+        await broker.send_event(update(3, "/stop"), routing_key=shard_key(5))
+        await wait_sent(sent, 3)
+        await broker.send_event(group_update(4, "Москва"), routing_key=shard_key(-4))
+        await asyncio.sleep(0.05)
+        assert len(sent) == 3
+        assert not workers[0].city_engine.states and not workers[1].city_engine.states
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        for worker in workers:
+            await worker.stop()
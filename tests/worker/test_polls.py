@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.store.tg_api.schemes import Poll, PollOption, UpdateObj
+from app.worker_app.polls import PollTally
+from app.worker_app.worker import Worker
+
+
+def make_poll(yes: int, no: int, is_closed: bool = False, poll_id: int = 77) -> Poll:
+    return Poll(
+        id=poll_id,
+        question="Граждане примем ли мы Слон как допустимое слово?",
+        options=[
+            PollOption(text="Yes", voter_count=yes),
+            PollOption(text="No", voter_count=no),
+            PollOption(text="Слово?", voter_count=0),
+        ],
+        total_voter_count=yes + no,
+        is_closed=is_closed,
+        is_anonymous=True,
+        type="regular",
+        allow_multiple_answers=False,
+        correct_option_id=None,
+    )
+
+
+@pytest.fixture
+def game():
+    return SimpleNamespace(id=5, chat_id=-100, current_poll_id=77)
+
+
+@pytest.fixture
+def poll_mocks(worker: Worker, game, mocker):
+    worker.polls.clear()
+    mocker.patch.object(worker.words_game, "get_session_by_id", return_value=game)
+    mocker.patch.object(worker.words_game, "get_game_session_by_poll_id", return_value=game)
+    mocker.patch.object(worker.words_game, "update_game_session")
+    mocker.patch.object(worker.words_game, "get_team_by_game_id", return_value=[1, 2, 3, 4, 5])
+    mocker.patch.object(worker.words_game, "set_player_poll_answer")
+    mocker.patch.object(worker.words_game, "check_not_anonim_poll", return_value=False)
+    worker.rabbitMQ.send_event.reset_mock()
+    mocker.patch.object(worker.words_game, "save_word_verdict")
+    return SimpleNamespace(
+        right_word=mocker.patch.object(worker, "right_word"),
+        pick_leader=mocker.patch.object(worker, "pick_leader"),
+    )
+
+
+async def open_poll(worker: Worker, game, period: int = 10):
+    await worker.open_poll(
+        {"type_": "poll_id", "poll_id": 77, "chat_id": game.chat_id, "message_id": 3,
+         "period": period, "anonymous": True, "word": "Слон"}
+    )
+    return worker.polls[77]
+
+
+async def test_poll_updates_are_tallied(worker: Worker, game, poll_mocks):
+    tally = await open_poll(worker, game)
+    await worker.handle_poll(make_poll(yes=2, no=1))
+    assert (tally.yes, tally.no) == (2, 1)
+    assert poll_mocks.right_word.call_count == 0
+
+    await worker.handle_poll(make_poll(yes=2, no=1, is_closed=True))
+    await asyncio.sleep(0)
+    assert 77 not in worker.polls
+    assert tally.timer.cancelled()
+    poll_mocks.right_word.assert_called_once_with(game=game, word="Слон")
+    worker.words_game.save_word_verdict.assert_called_once_with(
+        word="Слон", chat_id=game.chat_id, yes=2, no=1
+    )
+
+
+async def test_poll_timer_closes_poll(worker: Worker, game, poll_mocks, mocker):
+    mocker.patch("asyncio.sleep")
+    tally = await open_poll(worker, game)
+    await worker.handle_poll(make_poll(yes=0, no=1))
+    await tally.timer
+    assert 77 not in worker.polls
+    assert poll_mocks.pick_leader.call_count == 1
+    assert poll_mocks.right_word.call_count == 0
+
+
+async def test_closed_poll_without_tally(worker: Worker, game, poll_mocks):
+    await worker.handle_poll(make_poll(yes=3, no=0, is_closed=True))
+    poll_mocks.right_word.assert_called_once_with(game=game, word="Слон")
+
+
+async def test_poll_stops_when_decided(worker: Worker, game, poll_mocks):
+    tally = await open_poll(worker, game)
+    assert tally.voters == 5
+    await worker.handle_poll(make_poll(yes=2, no=0))
+    assert 77 in worker.polls
+    await worker.handle_poll(make_poll(yes=3, no=0))
+    await asyncio.sleep(0)
+    assert 77 not in worker.polls
+    assert tally.timer.cancelled()
+    worker.rabbitMQ.send_event.assert_any_call(
+        message={"type_": "stop_poll", "chat_id": game.chat_id, "message_id": 3},
+        routing_key=worker.routing_key_sender,
+    )
+    poll_mocks.right_word.assert_called_once_with(game=game, word="Слон")
+
+
+async def test_poll_answers_decide_rejection(worker: Worker, game, poll_mocks):
+    tally = await open_poll(worker, game)
+    tally.anonymous = False
+    for user_id, option in ((1, 1), (2, 0), (2, 1), (3, 1)):
+        upd = UpdateObj.Schema().load({"poll_answer": {
+            "poll_id": 77,
+            "user": {"id": user_id, "first_name": "Test", "username": "test"},
+            "option_ids": [option],
+        }})
+        await worker.handle_poll_answer(upd)
+    assert (tally.yes, tally.no) == (0, 3)
+    assert 77 not in worker.polls
+    assert poll_mocks.pick_leader.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "voters, yes, no, result",
+    [(3, 2, 0, True), (3, 1, 1, None), (3, 0, 2, False), (4, 1, 2, False), (4, 2, 1, None), (None, 5, 0, None)],
+)
+def test_decided(voters, yes, no, result):
+    tally = PollTally(poll_id=1, chat_id=1, word="Слон", voters=voters, yes=yes, no=no)
+    assert tally.decided() is result
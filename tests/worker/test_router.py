@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+from router import COMMANDS, GROUP, PRIVATE, CommandRouter, UpdateContext
+
+from app.store.tg_api.schemes import UpdateObj
+
+
+def update(text: str, chat_type: str = "group") -> UpdateObj:
+    return UpdateObj.Schema().load(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "text": text,
+                "chat": {"id": -5, "type": chat_type},
+                "from": {"id": 7, "username": "player", "first_name": "Player"},
+            },
+        }
+    )
+
+
+class Store:
+    def __init__(self, game=None):
+        self.game = game
+        self.calls = 0
+
+    async def get_session_by_id(self, chat_id: int):
+        self.calls += 1
+        return self.game
+
+
+@pytest.fixture
+def router():
+    router = CommandRouter()
+    calls = []
+
+    @router.command("/play", chats=(PRIVATE,))
+    async def play_private(worker, context):
+        calls.append("play_private")
+
+    @router.command("/play", chats=(GROUP,))
+    async def play_group(worker, context):
+        calls.append("play_group")
+
+    @router.command("/top", args=True)
+    async def top(worker, context):
+        calls.append("top")
+
+    @router.move("word", guard=UpdateContext.game, chats=(GROUP,))
+    async def word(worker, context):
+        calls.append(("word", (await context.game()).id))
+
+    router.calls = calls
+    return router
+
+
+def test_resolve(router: CommandRouter):
+    assert router.resolve("/play", PRIVATE).name == "/play"
+    assert router.resolve("/play@words_bot", GROUP).handler.__name__ == "play_group"
+    assert router.resolve("/top all", GROUP).name == "/top"
+    assert router.resolve("/play now", GROUP) is None
+    assert router.resolve("/ping", GROUP) is None
+    assert router.resolve("", GROUP) is None
+
+    with pytest.raises(ValueError):
+        router.command("/top", chats=(GROUP,))(lambda worker, context: None)
+
+
+async def test_move_reads_game_once(router: CommandRouter):
+    store = Store(game=SimpleNamespace(id=3))
+    worker = SimpleNamespace(words_game=store)
+    before = COMMANDS.labels("word", "ok").value
+
+    await router.dispatch(worker, update("Арбуз"))
+    assert router.calls == [("word", 3)]
+    assert store.calls == 1
+    assert COMMANDS.labels("word", "ok").value == before + 1
+
+    await router.dispatch(worker, update("/play@words_bot", chat_type="private"))
+    assert router.calls[-1] == "play_private"
+
+
+async def test_text_without_game_is_ignored(router: CommandRouter):
+    store = Store()
+    await router.dispatch(SimpleNamespace(words_game=store), update("Арбуз"))
+    assert router.calls == []
+    assert store.calls == 1
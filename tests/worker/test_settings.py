@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.store.rabbitMQ.memory import MemoryBroker
+from app.store.words_game.memory import MemoryGameStore
+from app.web.config import config as cfg
+from app.words_game.settings import SETTINGS_ROUTING_KEY, SettingsSnapshot
+from app.worker_app.worker import Worker
+
+
+@pytest.fixture
+async def workers():
+    broker = MemoryBroker()
+    store = MemoryGameStore(cities=[(1, "Москва")])
+    workers = [
+        Worker(cfg=cfg, broker=broker, store=store, settings_check_interval=0.05)
+        for _ in range(2)
+    ]
+    for worker in workers:
+        await worker.start()
+    await asyncio.sleep(0)
+    try:
+        yield workers, broker, store
+    finally:
+        for worker in workers:
+            await worker.stop()
+
+
+async def wait_version(workers: list[Worker], version: int):
+    for _ in range(100):
+        if all(worker.game_settings.version == version for worker in workers):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError([worker.game_settings for worker in workers])
+
+
+async def test_settings_event_reaches_every_worker(workers):
+    workers, broker, store = workers
+    assert all(worker.game_settings == SettingsSnapshot() for worker in workers)
+
+    snapshot = SettingsSnapshot(version=2, response_time=30, life=5)
+    await broker.send_event(snapshot.to_message(), routing_key=SETTINGS_ROUTING_KEY)
+    await wait_version(workers, 2)
+    assert all(worker.game_settings == snapshot for worker in workers)
+
+    # устаревшее событие не откатывает настройки
+    await broker.send_event(SettingsSnapshot(version=1).to_message(), routing_key=SETTINGS_ROUTING_KEY)
+    await asyncio.sleep(0.02)
+    assert all(worker.game_settings == snapshot for worker in workers)
+
+
+async def test_missed_event_caught_by_version_check(workers):
+    workers, broker, store = workers
+    store.settings.version = 3
+    store.settings.poll_time = 40
+    await wait_version(workers, 3)
+    assert all(worker.game_settings.poll_time == 40 for worker in workers)
+
+
+async def test_settings_queue_removed_on_stop(workers):
+    workers, broker, store = workers
+    await workers[0].stop()
+    await asyncio.sleep(0)
+    assert len(broker.bindings[SETTINGS_ROUTING_KEY]) == 1
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import time
+
+from supervisor import WORKER_RESTARTS, Supervisor
+
+
+def crash(shard, metrics_port):
+    # первый запуск процесса шарда 1 падает, перезапуск работает до SIGTERM
+    marker = os.environ["SUPERVISOR_TEST_DIR"] + f"/{shard.index}"
+    if shard.index == 1 and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(3)
+    time.sleep(60)
+
+
+async def wait_for(condition, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.05)
+
+
+async def test_supervisor_restarts_and_stops(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUPERVISOR_TEST_DIR", str(tmp_path))
+    restarts = WORKER_RESTARTS.labels("1").value
+    supervisor = Supervisor(target=crash, processes=2, metrics_port=9100, restart_delay=0.1)
+    await supervisor.start()
+    try:
+        await wait_for(lambda: WORKER_RESTARTS.labels("1").value == restarts + 1)
+        await wait_for(lambda: all(p.is_alive() for p in supervisor.children.values()))
+        assert sorted(supervisor.metrics_urls()) == ["0", "1"]
+        assert supervisor.metrics_urls()["1"] == "http://127.0.0.1:9102/metrics"
+        children = list(supervisor.children.values())
+    finally:
+        await supervisor.stop()
+
+    assert supervisor.children == {}
+    assert all(not p.is_alive() for p in children)
+    assert WORKER_RESTARTS.labels("0").value == 0